@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.constraints import basic, schedule
+
+
+class TestSchedule(unittest.TestCase):
+
+    def test__steps(self):
+        calls = []
+
+        def func(solution, **kwargs):
+            calls.append(len(calls))
+            return solution
+        mod = Model(solution=np.zeros(3))
+        c = schedule.Schedule(basic.ApplyFunction(func, alpha=1), every=3, start=2, stop=9)
+        state = c.init(mod, 12)
+        for i in range(12):
+            c.step(mod, i, state)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual([i for i in range(12) if c.active(i)], [2, 5, 8])
+
+    def test__decay(self):
+        mod = Model(solution=np.ones(3))
+        c = schedule.Schedule(basic.ApplyFunction(np.zeros_like, alpha=0.5), decay=0.5)
+        state = c.init(mod, 2)
+        for i in range(2):
+            c.step(mod, i, state)
+        np.testing.assert_allclose(mod.solution, 0.5 * 0.75)
+
+    def test__positive_in_place(self):
+        initial = np.array([-1, 2, -3])
+        mod = Model(solution=initial)
+        c = basic.Positive()
+        c.init(mod, 1)
+        solution = mod.solution
+        c.step(mod, 0)
+        self.assertIs(mod.solution, solution)
+        np.testing.assert_equal(mod.solution, [0, 2, 0])
+        np.testing.assert_equal(initial, [-1, 2, -3])
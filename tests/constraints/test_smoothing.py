@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import scipy.ndimage
+import scipy.signal
+from tomomak.model import Model
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.constraints import smoothing, basic
+
+
+def _apply(constraint, solution, steps=1):
+    mesh = Mesh([Axis1d(size=s, upper_limit=s) for s in solution.shape])
+    mod = Model(mesh=mesh, solution=solution)
+    state = constraint.init(mod, steps)
+    for i in range(steps):
+        constraint.step(mod, i, state)
+    return mod.solution
+
+
+class TestSmoothing(unittest.TestCase):
+
+    def setUp(self):
+        self.solution = np.random.default_rng(0).random((6, 7, 8))
+
+    def test__savitzky_golay_equals_apply_along_axis(self):
+        res = _apply(smoothing.SavitzkyGolay(5, 2, axis=1, alpha=0.5), self.solution.copy())
+        expected = _apply(basic.ApplyAlongAxis(scipy.signal.savgol_filter, axis=1, alpha=0.5, window_length=5,
+                                               polyorder=2, mode='nearest'), self.solution.copy())
+        np.testing.assert_allclose(res, expected, atol=1e-12)
+
+    def test__gaussian_blending(self):
+        res = _apply(smoothing.GaussianFilter(1, alpha=0.3), self.solution.copy())
+        filtered = scipy.ndimage.gaussian_filter(self.solution, 1, mode='nearest')
+        np.testing.assert_allclose(res, self.solution + 0.3 * (filtered - self.solution))
+
+    def test__laplacian_diffusion(self):
+        """Test that diffusion conserves total value, smooths solution and converts integer solution to float.
+        """
+        solution = np.zeros((5, 5), dtype=int)
+        solution[2, 2] = 1
+        res = _apply(smoothing.LaplacianDiffusion(n_iter=3), solution, steps=2)
+        self.assertEqual(solution[2, 2], 1)
+        self.assertAlmostEqual(np.sum(res), 1)
+        self.assertTrue(0 < res[2, 2] < 1)
+        self.assertTrue(np.all(res >= 0))
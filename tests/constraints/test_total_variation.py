@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.constraints import proximal, TotalVariation
+
+
+class TestTotalVariation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.mesh = Mesh([Axis1d(size=12, upper_limit=12), Axis1d(size=9, upper_limit=9)])
+        self.solution = rng.random(self.mesh.shape)
+        self.solution[3:8, 2:6] += 2
+
+    def test__prox_duality_gap(self):
+        """Test that denoised solution is optimal: gap between primal and dual objectives is small.
+        """
+        lam = 0.3
+        tv = TotalVariation(1, n_iter=3000)
+        op = tv._operator(self.mesh)
+        f = self.solution.ravel()
+        dual = np.zeros(op.matrix.shape[0])
+        x = tv._denoise(f, lam, op, dual)
+        grad = (op.matrix @ x).reshape(op.n_axes, -1)
+        primal = np.sum((x - f) ** 2) / 2 + lam * np.sum(np.sqrt(np.sum(grad ** 2, axis=0)))
+        dual_value = np.sum(f ** 2) / 2 - np.sum((f - op.transposed @ dual) ** 2) / 2
+        self.assertLess(primal - dual_value, 1e-6 * primal)
+        np.testing.assert_allclose(tv.prox(self.solution, lam, Model(mesh=self.mesh)), x.reshape(self.mesh.shape))
+        # proximal.TotalVariation is the same implementation
+        self.assertIs(proximal.TotalVariation, TotalVariation)
+        np.testing.assert_allclose(tv.prox(self.solution, lam, None), x.reshape(self.mesh.shape))
+
+    def test__warm_start(self):
+        """Test that repeated steps with few iterations converge to the exact denoised solution.
+        """
+        expected = TotalVariation(1, n_iter=3000).prox(self.solution, 0.3, Model(mesh=self.mesh))
+        tv = TotalVariation(0.3, n_iter=5)
+        mod = Model(mesh=self.mesh, solution=self.solution)
+        state = tv.init(mod, 40)
+        errors = []
+        for i in range(40):
+            mod.solution = self.solution.copy()
+            tv.step(mod, i, state)
+            errors.append(np.max(np.abs(mod.solution - expected)))
+        self.assertLess(errors[-1], errors[0] / 100)
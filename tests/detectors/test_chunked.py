@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic
+from tomomak.detectors import signal
+from tomomak.detectors.chunked import ChunkedGeometry
+
+
+class TestChunkedGeometry(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((23, 6, 5)) * (rng.random((23, 6, 5)) > 0.5)
+        self.signal = signal.get_signal(rng.random((6, 5)), self.geometry)
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'geometry.npy')
+        np.save(self.filename, self.geometry)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test__projections(self):
+        # 3 detectors per block
+        op = ChunkedGeometry.open(self.filename, memory_budget=6 * 30 * 8)
+        self.assertEqual(op.chunk_size, 3)
+        x, v = np.random.default_rng(1).random((6, 5)), np.arange(23.)
+        np.testing.assert_allclose(op.project(x), signal.get_signal(x, self.geometry))
+        np.testing.assert_allclose(op.back_project(v), signal.back_project(v, self.geometry))
+        np.testing.assert_allclose(op.row_square_sum(), np.sum(np.square(self.geometry), axis=(1, 2)))
+        np.testing.assert_allclose(np.asarray(op[[5, 1]]), self.geometry[[5, 1]])
+        np.testing.assert_allclose(op[4:20].project(x), signal.get_signal(x, self.geometry[4:20]))
+        # block size follows dtype of the stored geometry
+        self.assertEqual(ChunkedGeometry(self.geometry.astype(np.float32), memory_budget=6 * 30 * 8).chunk_size, 6)
+
+    def test__iterators(self):
+        for iterator in (ml.ML, lambda: algebraic.SIRT(alpha=1, n_slices=2)):
+            models = [Model(detector_geometry=g, detector_signal=self.signal)
+                      for g in (self.geometry, ChunkedGeometry.open(self.filename, memory_budget=2000))]
+            for mod in models:
+                Solver(iterator()).solve(mod, 5, verbose=False)
+            np.testing.assert_allclose(models[1].solution, models[0].solution)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic, krylov
+from tomomak.detectors import detectors, signal
+from tomomak.detectors.operators import FactorizedGeometry, KroneckerOperator, RowSubset
+
+
+class TestFactorizedGeometry(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh([Axis1d(size=8, upper_limit=10), Axis1d(size=4, upper_limit=2),
+                          Axis1d(size=9, upper_limit=10)])
+        self.dense = detectors.parallel_detector(self.mesh, (-1, 0.5), (11, 9.5), 1, 6, 1, index=(0, 2))
+        self.factorized = detectors.parallel_detector(self.mesh, (-1, 0.5), (11, 9.5), 1, 6, 1, index=(0, 2),
+                                                      factorized=True)
+
+    def test__equals_dense(self):
+        op = self.factorized
+        self.assertEqual(op.kernel.shape, (6, 8, 9))
+        np.testing.assert_allclose(np.asarray(op), self.dense)
+        np.testing.assert_allclose(op[4], self.dense[4])
+        np.testing.assert_allclose(np.asarray(op[1:3]), self.dense[1:3])
+        np.testing.assert_allclose(np.sum(op, axis=0), np.sum(self.dense, axis=0))
+        rng = np.random.default_rng(0)
+        x, v = rng.random(self.mesh.shape), rng.random(6)
+        w = rng.random(4)
+        weighted = FactorizedGeometry(op.kernel, op.index, self.mesh.shape, {1: w})
+        dense_weighted = self.dense * w[:, np.newaxis]
+        for g, d in ((op, self.dense), (weighted, dense_weighted)):
+            np.testing.assert_allclose(signal.get_signal(x, g), signal.get_signal(x, d))
+            np.testing.assert_allclose(signal.back_project(v, g), signal.back_project(v, d))
+
+    def test__positional_args(self):
+        # extra positional arguments are still forwarded to line_intersect
+        divergent = detectors.parallel_detector(self.mesh, (-1, 0.5), (11, 9.5), 1, 6, 1, (0, 2), 0.05)
+        expected = detectors.parallel_detector(self.mesh, (-1, 0.5), (11, 9.5), 1, 6, 1, index=(0, 2),
+                                               divergence=0.05)
+        np.testing.assert_allclose(divergent, expected)
+        self.assertFalse(np.allclose(divergent, self.dense))
+        factorized = detectors.parallel_detector(self.mesh, (-1, 0.5), (11, 9.5), 1, 6, 1, (0, 2), 0.05,
+                                                 factorized=True)
+        np.testing.assert_allclose(np.asarray(factorized), expected)
+
+    def test__ml(self):
+        real = np.random.default_rng(1).random(self.mesh.shape)
+        models = [Model(mesh=self.mesh, detector_geometry=g, detector_signal=signal.get_signal(real, self.dense))
+                  for g in (self.dense, self.factorized)]
+        for mod in models:
+            Solver(ml.ML()).solve(mod, 5, verbose=False)
+        np.testing.assert_allclose(models[1].solution, models[0].solution)
+
+
+class TestKroneckerOperator(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh([Axis1d(size=5, upper_limit=5), Axis1d(size=7, upper_limit=1),
+                          Axis1d(size=4, upper_limit=4)])
+        rng = np.random.default_rng(0)
+        self.spatial = rng.random((6, 5, 4))
+        self.op = detectors.kronecker_detector(
+            self.mesh, [self.spatial, lambda e: np.exp(-np.subtract.outer(np.arange(3) / 3, e) ** 2 * 10)],
+            [(0, 2), 1])
+        energy = self.op.factors[1]
+        self.dense = np.einsum('axz,by->abxyz', self.spatial, energy).reshape(18, 5, 7, 4)
+
+    def test__equals_dense(self):
+        op = self.op
+        self.assertEqual(op.shape, (18, 5, 7, 4))
+        np.testing.assert_allclose(np.asarray(op), self.dense)
+        rng = np.random.default_rng(1)
+        x, v = rng.random(self.mesh.shape), rng.random(18)
+        np.testing.assert_allclose(signal.get_signal(x, op), signal.get_signal(x, self.dense))
+        np.testing.assert_allclose(signal.back_project(v, op), signal.back_project(v, self.dense))
+        np.testing.assert_allclose(op.row_square_sum(), np.sum(np.square(self.dense), axis=(1, 2, 3)))
+        np.testing.assert_allclose(op[[2, 5]].project(x), signal.get_signal(x, self.dense[[2, 5]]))
+        np.testing.assert_allclose(op[7], self.dense[7])
+        np.testing.assert_allclose(op[-1], self.dense[-1])
+        # detector blocks keep Kronecker structure
+        self.assertIsInstance(op[3:9], KroneckerOperator)
+        self.assertEqual(op[3:9].factors[0].shape[0], 2)
+        for rows in (slice(3, 9), slice(4, 11), [13, 2, 5]):
+            sub, w = op[rows], v[rows]
+            np.testing.assert_allclose(np.asarray(sub), self.dense[rows])
+            np.testing.assert_allclose(sub.project(x), signal.get_signal(x, self.dense[rows]))
+            np.testing.assert_allclose(sub.back_project(w), signal.back_project(w, self.dense[rows]))
+        with self.assertRaises(ValueError):
+            KroneckerOperator([self.spatial], [(0, 2)], self.mesh.shape)
+
+    def test__iterators(self):
+        real = np.random.default_rng(2).random(self.mesh.shape)
+        y = signal.get_signal(real, self.dense)
+        for iterator in (ml.ML, lambda: algebraic.SIRT(alpha=1, n_slices=2), lambda: krylov.CGLS(lam=1e-3)):
+            models = [Model(mesh=self.mesh, detector_geometry=g, detector_signal=y) for g in (self.dense, self.op)]
+            for mod in models:
+                Solver(iterator()).solve(mod, 5, verbose=False)
+            np.testing.assert_allclose(models[1].solution, models[0].solution, rtol=1e-8, atol=1e-12)
+        # blocks of the generic operator use full projection
+        mod = Model(mesh=self.mesh, detector_geometry=RowSubset(self.op, np.arange(18)), detector_signal=y)
+        with self.assertWarns(UserWarning):
+            Solver(algebraic.SIRT(n_slices=2)).solve(mod, 1, verbose=False)
+
+    def test__cgls(self):
+        """Test that CGLS converges to the solution of the regularized normal equations.
+        """
+        real = np.random.default_rng(3).random(self.mesh.shape)
+        mod = Model(mesh=self.mesh, detector_geometry=self.op, detector_signal=signal.get_signal(real, self.op))
+        lam = 0.1
+        Solver(krylov.CGLS(lam)).solve(mod, 60, verbose=False)
+        g = self.dense.reshape(18, -1)
+        expected = np.linalg.solve(g.T @ g + lam * np.eye(g.shape[1]), g.T @ mod.detector_signal)
+        np.testing.assert_allclose(mod.solution.ravel(), expected, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
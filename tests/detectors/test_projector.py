@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.detectors import detectors
+from tomomak.detectors.projector import LineProjector
+from tomomak.util import precision
+
+
+class TestLineProjector(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh([Axis1d(size=10, upper_limit=10), Axis1d(size=3, upper_limit=3),
+                          Axis1d(size=8, upper_limit=8)])
+        y = np.linspace(0.5, 7.5, 6)
+        x = np.linspace(0.5, 9.5, 6)
+        self.p1 = np.array([(-1, v) for v in y] + [(v, -1) for v in x])
+        self.p2 = np.array([(11, 8 - v) for v in y] + [(10 - v, 9) for v in x])
+
+    def test__equals_line_intersect(self):
+        for divergence in (0, 0.05):
+            dense = np.array([detectors.line_intersect(self.mesh, a, b, 0.3, divergence, index=(0, 2))
+                              for a, b in zip(self.p1, self.p2)])
+            op = LineProjector(self.mesh, self.p1, self.p2, 0.3, divergence, index=(0, 2), n_rays=20, chunk_size=5,
+                               n_threads=2)
+            res = np.asarray(op)
+            self.assertLess(np.linalg.norm(res - dense) / np.linalg.norm(dense), 1e-2)
+
+    def test__projections(self):
+        op = LineProjector(self.mesh, self.p1, self.p2, 0.5, index=(2, 0), chunk_size=4, n_threads=3)
+        dense = np.asarray(op)
+        rng = np.random.default_rng(0)
+        x, v = rng.random(self.mesh.shape), rng.random(len(op))
+        np.testing.assert_allclose(op.project(x), np.tensordot(dense, x, axes=3))
+        np.testing.assert_allclose(op.back_project(v), np.tensordot(v, dense, axes=1))
+        np.testing.assert_allclose(op.row_square_sum(), np.sum(np.square(dense), axis=(1, 2, 3)))
+        np.testing.assert_allclose(op[[1, 7]].project(x), np.tensordot(dense[[1, 7]], x, axes=3))
+
+    def test__dtype(self):
+        precision.set_default_dtype(np.float32)
+        try:
+            op = LineProjector(self.mesh, self.p1, self.p2, 0.5, index=(2, 0), chunk_size=4, n_threads=3)
+        finally:
+            precision.set_default_dtype(np.float64)
+        self.assertEqual(op.dtype, np.float32)
+        self.assertEqual(op.chunk_matrix(np.arange(4)).dtype, np.float32)
+        self.assertEqual(op[[1, 7]].dtype, np.float32)
+        double = LineProjector(self.mesh, self.p1, self.p2, 0.5, index=(2, 0), chunk_size=4, n_threads=3)
+        self.assertEqual(double.dtype, np.float64)
+        x, v = np.ones(self.mesh.shape, dtype=np.float32), np.ones(len(op), dtype=np.float32)
+        self.assertEqual(op.project(x).dtype, np.float32)
+        self.assertEqual(op.back_project(v).dtype, np.float32)
+        np.testing.assert_allclose(op.back_project(v), double.back_project(v), rtol=1e-5)
+        self.assertEqual(op.row_square_sum().dtype, np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import Accelerated, algebraic, ml, statistics
+
+
+class TestAccelerated(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((30, 8, 6)) * (rng.random((30, 8, 6)) > 0.7)
+        self.signal = np.tensordot(self.geometry, rng.random((8, 6)), axes=2)
+
+    def _solve(self, iterator, steps=50):
+        mod = Model(detector_geometry=self.geometry, detector_signal=self.signal, solution=np.ones((8, 6)))
+        solver = Solver(iterator=iterator, statistics=[statistics.RN()])
+        solver.solve(mod, steps=steps, verbose=False)
+        return mod, solver.statistics[0].data[-1]
+
+    def test__anderson_sirt(self):
+        _, plain = self._solve(algebraic.SIRT(alpha=1))
+        _, accelerated = self._solve(Accelerated(algebraic.SIRT(alpha=1), memory=5))
+        self.assertLess(accelerated, plain / 10)
+
+    def test__rre_sirt(self):
+        _, plain = self._solve(algebraic.SIRT(alpha=1))
+        _, accelerated = self._solve(Accelerated(algebraic.SIRT(alpha=1), method='rre'))
+        self.assertLess(accelerated, plain)
+
+    def test__ml_stays_positive(self):
+        mod, accelerated = self._solve(Accelerated(ml.ML(), memory=3))
+        _, plain = self._solve(ml.ML())
+        self.assertLess(accelerated, plain)
+        self.assertTrue(np.all(mod.solution >= 0))
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import algebraic, statistics
+
+
+class TestSIRT(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((23, 10, 8)) * (rng.random((23, 10, 8)) > 0.8)
+        self.signal = np.tensordot(self.geometry, rng.random((10, 8)), axes=2)
+
+    def _solve(self, iterator, steps):
+        mod = Model(detector_geometry=self.geometry, detector_signal=self.signal, solution=np.zeros((10, 8)))
+        solver = Solver(iterator=iterator, statistics=[statistics.RN()])
+        solver.solve(mod, steps=steps, verbose=False)
+        return mod.solution, solver.statistics[0].data[-1]
+
+    def test__sirt_slices(self):
+        """Test block SIRT against straightforward calculation of the averaged correction.
+        """
+        n_slices, alpha = 3, 0.5
+        x = np.zeros((10, 8))
+        wi = np.sum(np.square(self.geometry), axis=(1, 2))
+        size = int(np.ceil(23 / n_slices))
+        for _ in range(4):
+            for i1 in range(0, 23, size):
+                i2 = min(i1 + size, 23)
+                correction = np.zeros((10, 8))
+                for i in range(i1, i2):
+                    dp = self.signal[i] - np.sum(self.geometry[i] * x)
+                    if wi[i]:
+                        correction += self.geometry[i] * dp / wi[i]
+                x = x + alpha / (i2 - i1) * correction
+        for sparse in (False, True):
+            solution, _ = self._solve(algebraic.SIRT(alpha=alpha, n_slices=n_slices, sparse=sparse), 4)
+            np.testing.assert_allclose(solution, x, atol=1e-12)
+
+    def test__cav_faster_than_sirt(self):
+        _, sirt = self._solve(algebraic.SIRT(alpha=1, n_slices=4), 30)
+        _, bicav = self._solve(algebraic.CAV(n_slices=4), 30)
+        self.assertLess(bicav, sirt)
+
+
+class TestRandomizedKaczmarz(unittest.TestCase):
+
+    def test__reproducible_convergence(self):
+        rng = np.random.default_rng(0)
+        geometry = rng.random((1, 6, 5)) + 0.05 * rng.random((40, 6, 5))
+        signal = np.tensordot(geometry, rng.random((6, 5)), axes=2)
+        residuals = []
+        for batch_size in (1, 1, 4):
+            mod = Model(detector_geometry=geometry, detector_signal=signal, solution=np.zeros((6, 5)))
+            solver = Solver(iterator=algebraic.RandomizedKaczmarz(seed=3, batch_size=batch_size),
+                            statistics=[statistics.RN()])
+            solver.solve(mod, steps=20, verbose=False)
+            residuals.append(solver.statistics[0].data)
+            self.assertLess(solver.statistics[0].data[-1], np.linalg.norm(signal) / 10)
+        self.assertEqual(residuals[0], residuals[1])
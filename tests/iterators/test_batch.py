@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import scipy.sparse
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic, fista, krylov, statistics
+from tomomak.detectors import signal
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((12, 5, 4))
+        solution = rng.random((5, 4))
+        # noisy realizations of the signal
+        self.signals = np.tensordot(self.geometry, solution, axes=2) * rng.uniform(0.9, 1.1, (3, 12))
+        self.guesses = rng.uniform(0.5, 1.5, (3, 5, 4))
+
+    def _iterators(self):
+        return (ml.ML, lambda: algebraic.SIRT(alpha=1, n_slices=2), lambda: algebraic.CAV(n_slices=2))
+
+    def test__projections(self):
+        res = signal.get_signal(self.guesses, self.geometry)
+        self.assertEqual(res.shape, (3, 12))
+        for k in range(3):
+            np.testing.assert_allclose(res[k], signal.get_signal(self.guesses[k], self.geometry))
+        back = signal.back_project(res, self.geometry)
+        np.testing.assert_allclose(back[1], signal.back_project(res[1], self.geometry))
+        sparse = scipy.sparse.csr_matrix(self.geometry.reshape(12, -1))
+        np.testing.assert_allclose(signal.get_signal(self.guesses.reshape(3, -1), sparse), res)
+
+    def test__batch_equals_loop(self):
+        for iterator in self._iterators():
+            model = Model(detector_geometry=self.geometry, detector_signal=self.signals, solution=self.guesses)
+            self.assertEqual(model.batch_size, 3)
+            solver = Solver(iterator=iterator(), statistics=[statistics.RN(), statistics.Convergence()])
+            solver.solve(model, steps=5, verbose=False)
+            self.assertEqual(solver.statistics[0].data[-1].shape, (3,))
+            for k in range(3):
+                single = Model(detector_geometry=self.geometry, detector_signal=self.signals[k],
+                               solution=self.guesses[k].copy())
+                single_solver = Solver(iterator=iterator(), statistics=[statistics.RN(), statistics.Convergence()])
+                single_solver.solve(single, steps=5, verbose=False)
+                np.testing.assert_allclose(model.solution[k], single.solution, rtol=1e-10)
+                for s, single_s in zip(solver.statistics, single_solver.statistics):
+                    self.assertAlmostEqual(s.data[-1][k], single_s.data[-1])
+
+    def test__unsupported_iterators(self):
+        for iterator in (krylov.CGLS(), fista.FISTA(), algebraic.ART(), algebraic.RandomizedKaczmarz()):
+            self.assertFalse(iterator.supports_batch)
+            model = Model(detector_geometry=self.geometry, detector_signal=self.signals)
+            with self.assertRaises(ValueError):
+                Solver(iterator=iterator).solve(model, steps=1, verbose=False)
+
+    def test__shared_initial_solution(self):
+        model = Model(detector_geometry=self.geometry, detector_signal=self.signals)
+        Solver(iterator=ml.ML()).solve(model, steps=3, verbose=False)
+        self.assertEqual(model.solution.shape, (3, 5, 4))
+        single = Model(detector_geometry=self.geometry, detector_signal=self.signals[2])
+        Solver(iterator=ml.ML()).solve(single, steps=3, verbose=False)
+        np.testing.assert_allclose(model.solution[2], single.solution, rtol=1e-10)
+        with self.assertRaises(Exception):
+            Model(detector_geometry=self.geometry, detector_signal=self.signals, solution=self.guesses[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
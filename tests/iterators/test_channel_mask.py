@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.solver.direct import DirectSolver
+from tomomak.iterators import ml, algebraic, statistics
+
+
+class TestChannelMask(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((20, 6, 5))
+        self.signal = np.tensordot(self.geometry, rng.random((6, 5)), axes=2)
+        # broken channels
+        self.signal[[3, 11]] = 1e3
+        self.mask = np.ones(20, dtype=bool)
+        self.mask[[3, 11]] = False
+
+    def _models(self):
+        masked = Model(detector_geometry=self.geometry, detector_signal=self.signal)
+        masked.channel_mask = self.mask
+        sliced = Model(detector_geometry=self.geometry[self.mask], detector_signal=self.signal[self.mask])
+        return masked, sliced
+
+    def test__incremental_normalization(self):
+        masked, _ = self._models()
+        np.testing.assert_allclose(ml.ML().precompute(masked), np.sum(self.geometry[self.mask], axis=0))
+        masked.channel_mask = None
+        np.testing.assert_allclose(ml.ML().precompute(masked), np.sum(self.geometry, axis=0))
+        with self.assertRaises(Exception):
+            masked.channel_mask = self.mask[1:]
+
+    def test__masked_equals_sliced(self):
+        for iterator in (ml.ML, lambda: algebraic.SIRT(alpha=1), lambda: algebraic.ART(alpha=0.5)):
+            masked, sliced = self._models()
+            solver = Solver(iterator=iterator(), statistics=[statistics.RN()])
+            solver.solve(masked, steps=5, verbose=False)
+            Solver(iterator=iterator()).solve(sliced, steps=5, verbose=False)
+            np.testing.assert_allclose(masked.solution, sliced.solution, rtol=1e-10)
+            residual = np.linalg.norm(sliced.detector_signal - np.tensordot(self.geometry[self.mask],
+                                                                            sliced.solution, axes=2))
+            self.assertAlmostEqual(solver.statistics[0].data[-1], residual)
+        for method in ('dense', 'sparse', 'dual'):
+            masked, sliced = self._models()
+            DirectSolver(0.1, 'tikhonov', method).solve(masked)
+            DirectSolver(0.1, 'tikhonov', method).solve(sliced)
+            np.testing.assert_allclose(masked.solution, sliced.solution, rtol=1e-8)
+        masked, sliced = self._models()
+        self.assertEqual(masked.reduced().detector_geometry.shape, (18, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
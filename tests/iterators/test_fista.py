@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.iterators import fista, algebraic, statistics
+from tomomak.constraints import proximal
+from tomomak.constraints.basic import Positive
+
+
+class TestFISTA(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.mesh = Mesh([Axis1d(size=8, upper_limit=10), Axis1d(size=6, upper_limit=10)])
+        self.geometry = rng.random((30, 8, 6)) * (rng.random((30, 8, 6)) > 0.7)
+        self.real_solution = rng.random((8, 6))
+        self.signal = np.tensordot(self.geometry, self.real_solution, axes=2)
+
+    def _residual(self, iterator, steps):
+        mod = Model(mesh=self.mesh, detector_geometry=self.geometry, detector_signal=self.signal)
+        solver = Solver(iterator=iterator, statistics=[statistics.RN()])
+        solver.solve(mod, steps=steps, verbose=False)
+        return solver.statistics[0].data[-1]
+
+    def test__faster_than_sirt(self):
+        self.assertLess(self._residual(fista.FISTA(prox=[Positive()]), 50),
+                        self._residual(algebraic.SIRT(alpha=1), 50))
+
+    def test__restart_after_in_place_constraint(self):
+        mod = Model(mesh=self.mesh, detector_geometry=self.geometry, detector_signal=self.signal)
+        iterator, constraint = fista.FISTA(), Positive()
+        state = iterator.init(mod, 10)
+        constraint.init(mod, 10)
+        for i in range(5):
+            iterator.step(mod, i, state)
+        mod.solution[:4] = -1
+        constraint.step(mod, 5)
+        clipped = mod.solution.copy()
+        iterator.step(mod, 5, state)
+        # momentum is restarted, so step is the gradient step from the clipped solution
+        residual = np.tensordot(self.geometry, clipped, axes=2) - mod.detector_signal
+        expected = clipped - np.tensordot(residual, self.geometry, axes=1) / state.lipschitz
+        np.testing.assert_allclose(mod.solution, expected)
+
+    def test__prox(self):
+        x = np.array([-2., -0.5, 0.5, 3.])
+        np.testing.assert_allclose(proximal.L1(1).prox(x, 1, None), [-1, 0, 0, 2])
+        np.testing.assert_allclose(proximal.Box(0, 1).prox(x, 1, None), [0, 0, 0.5, 1])
+        tv = proximal.TotalVariation(1, n_iter=200).prox(x, 0.25, None)
+        self.assertLess(np.sum(np.abs(np.diff(tv))), np.sum(np.abs(np.diff(x))))
+        self.assertAlmostEqual(np.sum(tv), np.sum(x))
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.iterators import krylov
+from tomomak.constraints.basic import Positive
+from tomomak.detectors import signal
+
+
+class TestCGLS(unittest.TestCase):
+
+    def test__restart_after_in_place_constraint(self):
+        rng = np.random.default_rng(0)
+        geometry = rng.random((15, 6, 5))
+        solution = rng.random((6, 5)) - 0.3
+        mod = Model(detector_geometry=geometry, detector_signal=np.tensordot(geometry, solution, axes=2))
+        iterator, constraint = krylov.CGLS(), Positive()
+        state = iterator.init(mod, 20)
+        constraint.init(mod, 20)
+        for i in range(20):
+            iterator.step(mod, i, state)
+            constraint.step(mod, i)
+            self.assertTrue(np.all(mod.solution >= 0))
+        self.assertGreater(state.restarts, 1)
+        # stored residual describes current solution after restart
+        iterator.step(mod, 20, state)
+        residual = mod.detector_signal - signal.get_signal(mod.solution, geometry)
+        np.testing.assert_allclose(state.r, residual, atol=1e-10)
+        self.assertGreater(np.linalg.norm(residual), 1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.mesh.spiderweb_axes import SpiderWeb2dAxis
+from tomomak.mesh import operators
+
+
+class TestOperators(unittest.TestCase):
+
+    def test__difference_matrix_1d(self):
+        ax = Axis1d(edges=[0, 1, 3, 6])
+        np.testing.assert_allclose(operators.difference_matrix(ax).toarray(),
+                                   [[-2 / 3, 2 / 3, 0], [0, -0.4, 0.4]])
+
+    def test__spiderweb_adjacency(self):
+        """Test that every cell of the inner rings has 4 neighbours and cells of outer and central rings have 3.
+        """
+        t = np.linspace(0, 2 * np.pi, 41)[:-1]
+        border = np.stack([2 * np.cos(t), 3 * np.sin(t)], axis=1)
+        border[np.abs(border[:, 1]) < 1e-9, 1] = 0
+        ax = SpiderWeb2dAxis(border, (0, 0), radials_size=2, angle_size=1)
+        pairs, dist = operators.adjacency(ax)
+        np.testing.assert_equal(np.bincount(pairs.ravel()), [3] * 20 + [4] * 20 + [3] * 20)
+        self.assertTrue(np.all(dist > 0))
+        lap = operators.laplacian(Mesh([ax]))
+        np.testing.assert_allclose(lap @ np.ones(ax.size), 0, atol=1e-12)
+
+    def test__adjacency_graph(self):
+        mesh = Mesh([Axis1d(size=3, upper_limit=3), Axis1d(size=4, upper_limit=8)])
+        graph = mesh.adjacency_graph()
+        self.assertIs(graph, mesh.adjacency_graph())
+        np.testing.assert_equal((graph != 0).sum(axis=1).A.ravel().reshape(3, 4),
+                                [[2, 3, 3, 2], [3, 4, 4, 3], [2, 3, 3, 2]])
+        self.assertEqual(graph[0, 1], 2)
+        self.assertEqual(graph[0, 4], 1)
+        mesh.add_axis(Axis1d(size=2, upper_limit=2))
+        self.assertEqual(mesh.adjacency_graph().shape, (24, 24))
+
+    def test__volume_weighted_laplacian(self):
+        """Test that x^T L x is equal to the integral of |grad(x)|^2 for linear x.
+        """
+        mesh = Mesh([Axis1d(size=5, upper_limit=10), Axis1d(size=4, upper_limit=2)])
+        x, y = np.meshgrid(mesh.axes[0].coordinates, mesh.axes[1].coordinates, indexing='ij')
+        u = (3 * x + 2 * y).ravel()
+        lap = mesh.laplacian(volume_weighted=True)
+        # internal area between cell centers is 8 x 1.5
+        self.assertAlmostEqual(u @ lap @ u, 9 * 8 * 2 + 4 * 10 * 1.5)
+        lap = mesh.laplacian(coefficients=(1, 0))
+        np.testing.assert_allclose(lap @ (2 * y).ravel(), 0, atol=1e-12)
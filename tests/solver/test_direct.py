@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver import direct
+from tomomak.solver.direct import DirectSolver
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.mesh import operators
+from tomomak.test_objects import objects2d
+from tomomak.detectors import detectors, signal
+
+
+def _model():
+    mesh = Mesh([Axis1d(size=10, upper_limit=10), Axis1d(size=10, upper_limit=10)])
+    geometry = np.array([detectors.line_intersect(mesh, (-1, y), (11, 10 - y), 1) for y in range(11)]
+                        + [detectors.line_intersect(mesh, (x, -1), (10 - x, 11), 1) for x in range(11)])
+    real_solution = objects2d.ellipse(mesh, center=(4, 5), ax_len=(2, 3))
+    return Model(mesh=mesh, detector_geometry=geometry, detector_signal=signal.get_signal(real_solution, geometry))
+
+
+class TestDirectSolver(unittest.TestCase):
+
+    def test__methods_equal_normal_equations(self):
+        """Test that all methods give solution of the regularized normal equations.
+        """
+        mod = _model()
+        g = mod.detector_geometry.reshape(mod.detector_geometry.shape[0], -1)
+        lam = 0.1
+        for regularization in DirectSolver.regularizations:
+            if regularization == 'tikhonov':
+                reg = np.eye(g.shape[1])
+            else:
+                lap = operators.laplacian(mod.mesh).toarray()
+                reg = lap.T @ lap
+            expected = np.linalg.solve(g.T @ g + lam * reg, g.T @ mod.detector_signal)
+            methods = ['dense', 'sparse'] + (['dual'] if regularization == 'tikhonov' else [])
+            for method in methods:
+                sol = DirectSolver(lam, regularization, method).solve(mod)
+                np.testing.assert_allclose(sol.ravel(), expected, atol=1e-9)
+
+    def test__factorization_reused(self):
+        """Test that factorization is reused for the new signal and calculated again for the new lambda.
+        """
+        mod = _model()
+        solver = DirectSolver(0.1, method='dense')
+        solver.solve(mod)
+        misses = direct.factor_cache.misses
+        mod.detector_signal = mod.detector_signal * 2
+        solver.solve(mod)
+        self.assertEqual(direct.factor_cache.misses, misses)
+        solver.solve(mod, lam=0.2)
+        self.assertGreater(direct.factor_cache.misses, misses)
+        # n_cells^2 matrices are not stored in the geometry cache
+        self.assertFalse(any(name.startswith('gram') for name in mod._derived))
+        self.assertIn((mod.geometry_fingerprint, 'gram_dense'), direct.factor_cache)
+
+    def test__factorization_depends_on_mesh(self):
+        """Test that factorization for the same geometry is not reused for the other mesh.
+        """
+        mod = _model()
+        solver = DirectSolver(0.1, method='dense')
+        solver.solve(mod)
+        other = Model(mesh=Mesh([Axis1d(size=10, upper_limit=10), Axis1d(size=10, upper_limit=20)]),
+                      detector_geometry=mod.detector_geometry, detector_signal=mod.detector_signal)
+        g = mod.detector_geometry.reshape(mod.detector_geometry.shape[0], -1)
+        lap = operators.laplacian(other.mesh).toarray()
+        expected = np.linalg.solve(g.T @ g + 0.1 * lap.T @ lap, g.T @ mod.detector_signal)
+        np.testing.assert_allclose(solver.solve(other).ravel(), expected, atol=1e-9)
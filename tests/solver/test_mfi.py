@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from tomomak.solver.mfi import MFISolver
+from tomomak.mesh import operators
+from tests.solver.test_direct import _model
+
+
+class TestMFISolver(unittest.TestCase):
+
+    def test__equals_reweighted_normal_equations(self):
+        """Test that solution is equal to the sequence of dense solutions with reweighted smoothing.
+        """
+        mod = _model()
+        lam = 0.1
+        sol, changes = MFISolver(lam, max_iter=20, tol=1e-6).solve(mod)
+        self.assertLess(changes[-1], 1e-6)
+        g = mod.detector_geometry.reshape(mod.detector_geometry.shape[0], -1)
+        grads = [d.toarray() for d in operators.gradient_operators(mod.mesh)]
+        weights = np.ones(g.shape[1])
+        for _ in range(len(changes) + 1):
+            smooth = sum(d.T @ np.diag(np.abs(d) @ weights / np.sum(np.abs(d), axis=1)) @ d for d in grads)
+            x = np.linalg.solve(g.T @ g + lam * smooth, g.T @ mod.detector_signal)
+            weights = 1 / np.maximum(x, 1e-3 * np.max(x))
+        np.testing.assert_allclose(sol.ravel(), x, atol=1e-9)
+
+    def test__other_mesh_and_mask(self):
+        """Test that ordering of the previous solve is not reused for the other mesh and channel mask.
+        """
+        mod = _model()
+        MFISolver(0.1).solve(mod)
+        self.assertNotIn('mfi_ordering', mod._derived)
+        mod.channel_mask = np.arange(mod.detector_geometry.shape[0]) % 3 != 0
+        sol, _ = MFISolver(0.1, max_iter=1).solve(mod)
+        g = mod.detector_geometry.reshape(mod.detector_geometry.shape[0], -1)[mod.channel_mask]
+        smooth = sum(d.T @ d for d in operators.gradient_operators(mod.mesh)).toarray()
+        x = np.linalg.solve(g.T @ g + 0.1 * smooth, g.T @ mod.detector_signal[mod.channel_mask])
+        np.testing.assert_allclose(sol.ravel(), x, atol=1e-9)
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from tomomak.solver import parameter_choice
+from tomomak.solver.direct import DirectSolver
+from tomomak.detectors import signal
+from tests.solver.test_direct import _model
+
+
+def _noisy_model(sigma):
+    mod = _model()
+    rng = np.random.default_rng(0)
+    mod.detector_signal = mod.detector_signal + rng.normal(0, sigma, mod.detector_signal.shape)
+    return mod
+
+
+class TestParameterChoice(unittest.TestCase):
+
+    def test__solution_equals_tikhonov(self):
+        """Test that returned solution is Tikhonov solution with the chosen lambda.
+        """
+        mod = _noisy_model(0.01)
+        for method in parameter_choice.methods:
+            lam, sol, values = parameter_choice.choose_lambda(mod, method, sigma=0.01)
+            self.assertEqual(values.shape, (200,))
+            expected = DirectSolver(lam, 'tikhonov', 'dense').solve(mod)
+            np.testing.assert_allclose(sol, expected, atol=1e-9)
+
+    def test__discrepancy(self):
+        mod = _noisy_model(0.01)
+        lam, sol, _ = parameter_choice.choose_lambda(mod, 'discrepancy', sigma=0.01)
+        residual = np.linalg.norm(signal.get_signal(sol, mod.detector_geometry) - mod.detector_signal)
+        self.assertLessEqual(residual, 0.01 * np.sqrt(mod.detector_signal.size) + 1e-12)
+
+    def test__randomized_svd(self):
+        mod = _model()
+        _, s, _ = parameter_choice.svd(mod)
+        _, s_rand, _ = parameter_choice.svd(mod, rank=10)
+        np.testing.assert_allclose(s_rand, s[:10], rtol=1e-6)
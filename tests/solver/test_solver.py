@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.test_objects import objects2d
+from tomomak.detectors import detectors, signal
+from tomomak.iterators import ml, algebraic, statistics
+import tomomak.constraints.basic
+
+
+def _models(number):
+    mesh = Mesh([Axis1d(size=10, upper_limit=10), Axis1d(size=10, upper_limit=10)])
+    geometry = np.array([detectors.line_intersect(mesh, (-1, y), (11, 10 - y), 1) for y in range(11)]
+                        + [detectors.line_intersect(mesh, (x, -1), (10 - x, 11), 1) for x in range(11)])
+    res = []
+    for i in range(number):
+        real_solution = objects2d.ellipse(mesh, center=(3 + i, 5), ax_len=(2, 3))
+        res.append(Model(mesh=mesh, detector_geometry=geometry,
+                         detector_signal=signal.get_signal(real_solution, geometry)))
+    return res
+
+
+class _DecreasingAlpha:
+    """Alpha calculator, which keeps step counter in its attributes.
+    """
+
+    def __init__(self):
+        self.count = None
+
+    def init(self, model, steps, *args, **kwargs):
+        self.count = 0
+
+    def step(self, model):
+        self.count += 1
+        return 1 / self.count
+
+
+class TestSolver(unittest.TestCase):
+
+    def test__solve_many_equals_solve(self):
+        """Test that concurrent reconstructions with shared iterator give same results as sequential ones.
+        """
+        for iterator in (ml.ML(), algebraic.SIRT(n_slices=2)):
+            models = _models(4)
+            expected = _models(4)
+            constraints = [tomomak.constraints.basic.Positive()]
+            for mod in expected:
+                Solver(iterator=iterator, constraints=constraints).solve(mod, steps=10, verbose=False)
+            solver = Solver(iterator=iterator, constraints=constraints, statistics=[statistics.RN()])
+            stats = solver.solve_many(models, steps=10, max_workers=4)
+            for mod, exp, st in zip(models, expected, stats):
+                np.testing.assert_allclose(mod.solution, exp.solution)
+                self.assertEqual(len(st[0].data), 10)
+
+    def test__solve_many_alpha_calc(self):
+        """Test that concurrent reconstructions don't share state of the alpha calculator.
+        """
+        alpha_calc = _DecreasingAlpha()
+        iterator = algebraic.SIRT(alpha=None, alpha_calc=alpha_calc)
+        models = _models(8)
+        expected = _models(8)
+        for mod in expected:
+            Solver(iterator=iterator).solve(mod, steps=10, verbose=False)
+        Solver(iterator=iterator).solve_many(models, steps=10, max_workers=8)
+        self.assertIsNone(alpha_calc.count)
+        for mod, exp in zip(models, expected):
+            np.testing.assert_allclose(mod.solution, exp.solution)
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.solver import uncertainty
+from tomomak.iterators import ml
+from tomomak.constraints import basic
+from tomomak.detectors import signal
+
+
+class TestUncertainty(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        geometry = rng.random((12, 5, 4))
+        self.model = Model(detector_geometry=geometry,
+                           detector_signal=np.tensordot(geometry, rng.random((5, 4)), axes=2))
+
+    def test__noisy_signals(self):
+        y = self.model.detector_signal
+        res = uncertainty.noisy_signals(y, 2000, st_div=10, rng=1)
+        self.assertEqual(res.shape, (2000, 12))
+        np.testing.assert_allclose(np.std(res, axis=0) / y, 0.1, rtol=0.1)
+        np.testing.assert_array_equal(res, uncertainty.noisy_signals(y, 2000, st_div=10, rng=1))
+        counts = uncertainty.noisy_signals(y * 100, 2000, noise='poisson', rng=1)
+        np.testing.assert_allclose(np.mean(counts, axis=0), y * 100, rtol=0.1)
+        with self.assertRaises(ValueError):
+            uncertainty.noisy_signals(y, 2, noise='uniform')
+        noisy = y.copy()
+        np.random.seed(3)
+        signal.add_noise(noisy, 5)
+        np.random.seed(3)
+        np.testing.assert_array_equal(signal.add_noise(y.copy(), 5), noisy)
+
+    def test__welford(self):
+        samples = np.random.default_rng(2).random((25, 3, 2))
+        stats = uncertainty.Welford()
+        stats.update(samples[:10])
+        for s in samples[10:13]:
+            stats.add(s)
+        stats.update(samples[13:])
+        self.assertEqual(stats.count, 25)
+        np.testing.assert_allclose(stats.mean, np.mean(samples, axis=0))
+        np.testing.assert_allclose(stats.variance, np.var(samples, axis=0, ddof=1))
+
+    def test__monte_carlo(self):
+        solver = Solver(iterator=ml.ML(), constraints=[basic.Positive()])
+        batch = uncertainty.monte_carlo(self.model, solver, n_samples=10, steps=5, seed=0, batch_size=4)
+        single = uncertainty.monte_carlo(self.model, solver, n_samples=10, steps=5, seed=0, batch_size=1)
+        self.assertEqual(batch.count, 10)
+        self.assertIsNone(self.model.solution)
+        np.testing.assert_allclose(batch.mean, single.mean, rtol=1e-10)
+        np.testing.assert_allclose(batch.std, single.std, rtol=1e-8)
+        self.assertTrue(np.all(batch.std > 0))
+        pool = uncertainty.monte_carlo(self.model, solver, n_samples=10, steps=5, seed=0, batch_size=4,
+                                       max_workers=2)
+        np.testing.assert_allclose(pool.mean, batch.mean, rtol=1e-10)
+        np.testing.assert_allclose(pool.std, batch.std, rtol=1e-8)
+
+
+if __name__ == '__main__':
+    unittest.main()
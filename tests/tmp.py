@@ -7,7 +7,7 @@ from tomomak.transform import rescale
 from tomomak.transform import pipeline
 from tomomak.detectors import detectors2d, signal
 from tomomak import iterators
-from tomomak.iterators import ml, algebraic#, gpu
+from tomomak.iterators import ml, algebraic
 from tomomak.iterators import statistics
 import tomomak.constraints.basic
 from mpl_toolkits.mplot3d import Axes3D
@@ -104,7 +104,7 @@ solver.real_solution = solution
 import cupy as cp
 solver.iterator = ml.ML()
 # solver.alpha = cp.linspace(1, 1, steps)
-#solver.iterator = gpu.MLCuda()
+#mod.detector_geometry = cp.asarray(mod.detector_geometry)
 #solver.iterator.alpha = cp.linspace(1, 1, steps)
 solver.statistics = [statistics.rms]
 # solver.alpha = np.linspace(1, 1, steps)
@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import scipy.sparse
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic, krylov, statistics
+from tomomak.constraints import basic
+from tomomak.detectors import signal
+from tomomak.util import backend
+
+try:
+    import array_api_strict
+except ImportError:
+    array_api_strict = None
+
+
+class TestBackend(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.geometry = rng.random((15, 4, 5))
+        self.signal = np.tensordot(self.geometry, rng.random((4, 5)), axes=2)
+
+    def _solve(self, geometry, iterator, steps=5):
+        model = Model(detector_geometry=geometry, detector_signal=self.signal)
+        solver = Solver(iterator=iterator, constraints=[basic.Positive()],
+                        statistics=[statistics.RN(), statistics.Convergence()])
+        solver.solve(model, steps=steps, verbose=False)
+        return model, solver
+
+    def _iterators(self):
+        return (ml.ML, lambda: algebraic.SIRT(alpha=1, n_slices=3), lambda: algebraic.CAV(n_slices=2),
+                lambda: krylov.CGLS(lam=1e-3))
+
+    def test__namespace(self):
+        self.assertIs(backend.namespace(np.ones(2), None, 1., scipy.sparse.eye(2)), np)
+        res = backend.divide(np.array([1., 2.]), np.array([0., 4.]))
+        np.testing.assert_allclose(res, [0, 0.5])
+
+    def test__sparse_geometry(self):
+        sparse = scipy.sparse.csr_matrix(self.geometry.reshape(15, -1))
+        for iterator in self._iterators():
+            dense, dense_solver = self._solve(self.geometry, iterator())
+            model, solver = self._solve(sparse, iterator())
+            np.testing.assert_allclose(model.solution, dense.solution.ravel(), rtol=1e-6, atol=1e-10)
+            np.testing.assert_allclose(solver.statistics[0].data, dense_solver.statistics[0].data, rtol=1e-6)
+
+    @unittest.skipIf(array_api_strict is None, "array_api_strict is not installed")
+    def test__array_api_namespace(self):
+        xp = array_api_strict
+        geometry = xp.asarray(self.geometry)
+        for iterator in self._iterators():
+            dense, dense_solver = self._solve(self.geometry, iterator())
+            model, solver = self._solve(geometry, iterator())
+            self.assertIs(backend.namespace(model.solution), xp)
+            np.testing.assert_allclose(backend.to_numpy(model.solution), dense.solution, rtol=1e-6, atol=1e-10)
+            np.testing.assert_allclose(solver.statistics[0].data, dense_solver.statistics[0].data, rtol=1e-6)
+        values = signal.back_project(self.signal, geometry)
+        np.testing.assert_allclose(backend.to_numpy(values), signal.back_project(self.signal, self.geometry))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic
+from tomomak.util import cache
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.geometry = np.random.default_rng(1).random((20, 6, 7))
+        cache.geometry_cache.clear()
+
+    def _model(self, geometry):
+        return Model(detector_geometry=geometry, detector_signal=np.ones(20), solution=np.ones((6, 7)))
+
+    def test__shared_between_models_and_iterators(self):
+        solver = Solver(iterator=ml.ML())
+        solver.solve(self._model(self.geometry), steps=1, verbose=False)
+        misses = cache.geometry_cache.misses
+        solver.iterator = ml.ML()
+        solver.solve(self._model(self.geometry), steps=1, verbose=False)
+        self.assertEqual(cache.geometry_cache.misses, misses)
+        self.assertEqual(cache.geometry_cache.hits, 1)
+
+    def test__content_hash(self):
+        first = self._model(self.geometry)
+        second = self._model(self.geometry.copy())
+        self.assertNotEqual(first.geometry_fingerprint, second.geometry_fingerprint)
+        first.hash_geometry()
+        second.hash_geometry()
+        self.assertEqual(first.geometry_fingerprint, second.geometry_fingerprint)
+        wi = algebraic.ART().precompute(first)
+        self.assertIs(algebraic.ART().precompute(second), wi)
+
+    def test__geometry_changed(self):
+        mod = self._model(self.geometry)
+        wi = ml.ML().precompute(mod)
+        mod.detector_geometry[0] *= 2
+        mod.geometry_changed()
+        new_wi = ml.ML().precompute(mod)
+        np.testing.assert_allclose(new_wi - wi, self.geometry[0] / 2)
+
+    def test__maxbytes(self):
+        lru = cache.LRUCache(maxsize=10, maxbytes=3000)
+        for k in range(3):
+            lru.put(k, np.zeros(125))
+        self.assertEqual(len(lru), 3)
+        lru.put(3, (np.zeros(125), np.zeros(125)))
+        self.assertNotIn(0, lru)
+        self.assertNotIn(1, lru)
+        self.assertEqual(lru.nbytes, 3000)
+        # the most recent entry is kept even if it is too large
+        lru.put(4, np.zeros(1000))
+        self.assertEqual(len(lru), 1)
+        self.assertIn(4, lru)
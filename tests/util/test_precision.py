@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic, fista, krylov
+from tomomak.detectors import detectors, signal
+from tomomak.test_objects import objects2d
+from tomomak.util import precision
+
+
+class TestPrecision(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh = Mesh([Axis1d(size=10, upper_limit=10), Axis1d(size=10, upper_limit=10)])
+
+    def tearDown(self):
+        precision.set_default_dtype(np.float64)
+
+    def test__default_dtype(self):
+        precision.set_default_dtype(np.float32)
+        self.assertEqual(detectors.line_intersect(self.mesh, (-1, 2), (11, 7), 1).dtype, np.float32)
+        self.assertEqual(detectors.parallel_detector(self.mesh, (-1, 2), (11, 7), 1, 3, 1).dtype, np.float32)
+        self.assertEqual(objects2d.ellipse(self.mesh, (5, 5), (2, 3)).dtype, np.float32)
+        with self.assertRaises(TypeError):
+            precision.set_default_dtype(int)
+
+    def test__float32_equals_float64(self):
+        geometry = np.array([detectors.line_intersect(self.mesh, (-1, y), (11, 10 - y), 1) for y in range(11)]
+                            + [detectors.line_intersect(self.mesh, (x, -1), (10 - x, 11), 1) for x in range(11)])
+        y = signal.get_signal(objects2d.ellipse(self.mesh, center=(4, 5), ax_len=(2, 3)), geometry)
+        for iterator in (ml.ML, lambda: algebraic.SIRT(alpha=1), lambda: fista.FISTA(), lambda: krylov.CGLS(1e-3)):
+            res = []
+            for dtype in (np.float64, np.float32):
+                mod = Model(mesh=self.mesh, detector_geometry=geometry, detector_signal=y)
+                mod.dtype = dtype
+                Solver(iterator()).solve(mod, 10, verbose=False)
+                self.assertEqual(mod.solution.dtype, dtype)
+                self.assertEqual(mod.detector_geometry.dtype, dtype)
+                res.append(mod.solution)
+            np.testing.assert_allclose(res[1], res[0], rtol=1e-3, atol=1e-4 * np.max(res[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import warnings
+import numpy as np
+from tomomak.model import Model
+from tomomak.solver.solver import Solver
+from tomomak.solver.direct import DirectSolver
+from tomomak.iterators import ml
+from tomomak.util.reduction import Reduction
+
+
+def _model():
+    rng = np.random.default_rng(0)
+    geometry = rng.random((6, 3, 4))
+    geometry[:, 1, 2] = 0
+    geometry[2] = 0
+    geometry[4] = geometry[1]
+    geometry[5] = geometry[1]
+    return Model(detector_geometry=geometry, detector_signal=rng.random(6) + 1)
+
+
+class TestReduction(unittest.TestCase):
+
+    def test__reduction(self):
+        mod = _model()
+        red = Reduction(mod.detector_geometry)
+        self.assertEqual((red.zero_columns, red.zero_rows, red.duplicate_rows), (1, 1, 2))
+        np.testing.assert_equal(red.row_map, [0, 1, -1, 2, 1, 1])
+        np.testing.assert_allclose(red.geometry[1], 3 * mod.detector_geometry[1].ravel()[red.columns])
+        reduced = mod.reduced()
+        self.assertEqual(reduced.detector_geometry.shape, (3, 11))
+        self.assertIn("Removed: 1 invisible cells, 1 zero detectors; merged: 2 duplicate detectors", str(reduced))
+
+    def test__ml_equals_full(self):
+        mod = _model()
+        reduced = mod.reduced()
+        Solver(ml.ML()).solve(reduced, 10, verbose=False)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            Solver(ml.ML()).solve(mod, 10, verbose=False)
+        np.testing.assert_allclose(reduced.expand(), mod.solution)
+
+    def test__least_squares_equals_full(self):
+        mod = _model()
+        reduced = mod.reduced(duplicates='scale')
+        DirectSolver(0.1, 'tikhonov', 'dense').solve(reduced)
+        DirectSolver(0.1, 'tikhonov', 'dense').solve(mod)
+        np.testing.assert_allclose(reduced.expand(), mod.solution, atol=1e-12)
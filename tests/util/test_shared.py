@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from tomomak.model import Model
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml, algebraic
+from tomomak.detectors import signal
+from tomomak.util.shared import share_model
+
+
+def _signal_in_worker(handle):
+    model = handle.open()
+    return signal.get_signal(np.ones(model.shape), model.detector_geometry)
+
+
+_SPAWN_SCRIPT = """
+import multiprocessing
+import numpy as np
+from tomomak.model import Model
+from tomomak.util.shared import share_model
+from tests.util.test_shared import _signal_in_worker
+
+if __name__ == '__main__':
+    model = Model(detector_geometry=np.ones((5, 4, 3)), detector_signal=np.ones(5))
+    with share_model(model) as handle:
+        with multiprocessing.get_context('spawn').Pool(2) as pool:
+            pool.map(_signal_in_worker, [handle] * 3)
+"""
+
+
+def _cav_in_worker(handle):
+    model = handle.open()
+    Solver(algebraic.CAV(n_slices=2)).solve(model, 2, verbose=False)
+    return model.solution
+
+
+class TestShared(unittest.TestCase):
+
+    def setUp(self):
+        mesh = Mesh([Axis1d(size=20, upper_limit=10), Axis1d(size=30, upper_limit=10)])
+        geometry = np.random.default_rng(0).random((50, 20, 30))
+        self.model = Model(mesh=mesh, detector_geometry=geometry, detector_signal=np.ones(50))
+
+    def test__shared_memory_open(self):
+        with share_model(self.model, iterators=[ml.ML(), algebraic.ART()]) as handle:
+            self.assertLess(len(pickle.dumps(handle)), self.model.detector_geometry.nbytes / 10)
+            opened = handle.open()
+            self.assertFalse(opened.detector_geometry.flags.owndata)
+            np.testing.assert_array_equal(opened.detector_geometry, self.model.detector_geometry)
+            self.assertIn('column_sum', handle.derived_names)
+            self.assertIs(ml.ML().precompute(opened), opened._derived['column_sum'])
+
+    def test__memmap_open(self):
+        with tempfile.TemporaryDirectory() as path:
+            with share_model(self.model, path=path) as handle:
+                opened = pickle.loads(pickle.dumps(handle)).open()
+                self.assertIsInstance(opened.detector_geometry, np.memmap)
+                np.testing.assert_array_equal(opened.detector_geometry, self.model.detector_geometry)
+                del opened
+
+    def test__pool(self):
+        expected = signal.get_signal(np.ones(self.model.shape), self.model.detector_geometry)
+        with share_model(self.model) as handle:
+            with multiprocessing.get_context('fork').Pool(2) as pool:
+                results = pool.map(_signal_in_worker, [handle] * 4)
+        for res in results:
+            np.testing.assert_allclose(res, expected)
+
+    def test__non_array_derived(self):
+        model = self.model
+        model.detector_signal = signal.get_signal(np.ones(model.shape), model.detector_geometry)
+        model.reduced()
+        for iterator in (algebraic.CAV(n_slices=2), algebraic.SIRT(n_slices=2, sparse=True)):
+            iterator.init(model, 1)
+        self.assertTrue(any(name.startswith('reduction') for name in model._derived))
+        with share_model(model, iterators=[ml.ML()]) as handle:
+            # only numeric arrays are published, other quantities are recalculated by workers
+            self.assertEqual(sorted(handle.derived_names), ['column_sum', 'row_square_sum'])
+            with multiprocessing.get_context('spawn').Pool(1) as pool:
+                results = pool.map(_cav_in_worker, [handle] * 2)
+        Solver(algebraic.CAV(n_slices=2)).solve(model, 2, verbose=False)
+        for res in results:
+            np.testing.assert_allclose(res, model.solution)
+
+    def test__spawn_resource_tracker(self):
+        """Test that workers don't remove registration of the block in the resource tracker of the publisher.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+        res = subprocess.run([sys.executable, '-c', _SPAWN_SCRIPT], cwd=root, env=env, capture_output=True,
+                             text=True, timeout=120)
+        self.assertEqual(res.returncode, 0, res.stderr)
+        self.assertNotIn('Traceback', res.stderr)
+        self.assertNotIn('leaked', res.stderr)
@@ -0,0 +1,36 @@
+import unittest
+import pickle
+import numpy as np
+from tomomak.solver.solver import Solver
+from tomomak.iterators import ml
+from tomomak.util import support
+from tests.solver.test_direct import _model
+
+
+class TestSupport(unittest.TestCase):
+
+    def setUp(self):
+        self.model = _model()
+        t = np.linspace(0, 2 * np.pi, 50)
+        self.circle = np.column_stack((5 + 4.5 * np.cos(t), 5 + 4.5 * np.sin(t)))
+
+    def test__polygon_support(self):
+        sup = support.polygon_support(self.model.mesh, self.circle)
+        self.assertTrue(sup[5, 5])
+        self.assertFalse(sup[0, 0])
+        np.testing.assert_equal(sup, sup.T)
+        np.testing.assert_equal(support.polygon_support(self.model.mesh, self.circle[:, ::-1], (1, 0)), sup)
+
+    def test__compact_ml_equals_full(self):
+        """Test that ML in compact model is equal to ML in full model with zero initial solution outside support.
+        """
+        self.model.support = support.polygon_support(self.model.mesh, self.circle)
+        compact = self.model.compact()
+        self.assertEqual(compact.detector_geometry.shape, (22, np.count_nonzero(self.model.support)))
+        Solver(ml.ML()).solve(compact, 20, verbose=False)
+        self.model.solution = self.model.support.astype(float)
+        Solver(ml.ML()).solve(self.model, 20, verbose=False)
+        np.testing.assert_allclose(compact.expand(), self.model.solution)
+        self.assertIs(self.model.compact().detector_geometry, compact.detector_geometry)
+        full = pickle.loads(pickle.dumps(compact)).full_model()
+        np.testing.assert_allclose(full.solution, self.model.solution)
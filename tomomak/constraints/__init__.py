@@ -0,0 +1,3 @@
+from tomomak.constraints.total_variation import TotalVariation
+
+__all__ = ['basic', 'proximal', 'schedule', 'smoothing', 'total_variation', 'TotalVariation']
@@ -1,14 +1,17 @@
 from ..iterators import abstract_iterator
 import numpy as np
+from tomomak.util import backend
 
 
 class Positive(abstract_iterator.AbstractSolverClass):
+    """Remove negative values. Solution is changed in place.
+    """
 
     def __init__(self):
         pass
 
     def init(self, model, steps, *args, **kwargs):
-        pass
+        float_solution(model)
 
     def finalize(self, model):
         pass
@@ -17,7 +20,15 @@ class Positive(abstract_iterator.AbstractSolverClass):
         return "Remove negative values"
 
     def step(self, model, step_num):
-        model.solution = model.solution.clip(min=0)
+        solution = writable_solution(model)
+        solution[solution < 0] = 0
+
+    def prox(self, solution, step, model):
+        """Proximal operator of the non-negativity constraint, i.e. projection to non-negative values.
+
+        See tomomak.constraints.proximal.
+        """
+        return backend.namespace(solution).clip(solution, 0, None)
 
 
 class ApplyAlongAxis(abstract_iterator.AbstractIterator):
@@ -32,18 +43,19 @@ class ApplyAlongAxis(abstract_iterator.AbstractIterator):
         self.arg_dict.update(kwargs)
 
     def init(self, model, steps, *args, **kwargs):
-        super().init(model, steps, *args, **kwargs)
+        float_solution(model)
+        return super().init(model, steps, *args, **kwargs)
 
-    def finalize(self, model):
+    def finalize(self, model, state):
         pass
 
     def __str__(self):
         return "Apply 1d function {} to axis {}.".format(self.func.__name__, self.axis)
 
-    def step(self, model, step_num):
-        alpha = self.get_alpha(model, step_num)
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
         new_solution = np.apply_along_axis(self.func, self.axis, model.solution, **self.arg_dict)
-        model.solution = model.solution + alpha * (new_solution - model.solution)
+        blend(model.solution, np.asarray(new_solution, dtype=model.solution.dtype), alpha)
 
 
 class ApplyFunction(abstract_iterator.AbstractIterator):
@@ -59,15 +71,56 @@ class ApplyFunction(abstract_iterator.AbstractIterator):
         self.arg_dict.update(kwargs)
 
     def init(self, model, steps, *args, **kwargs):
-        super().init(model, steps, *args, **kwargs)
+        float_solution(model)
+        return super().init(model, steps, *args, **kwargs)
 
-    def finalize(self, model):
+    def finalize(self, model, state):
         pass
 
     def __str__(self):
         return "Apply function {}.".format(self.func.__name__)
 
-    def step(self, model, step_num):
-        alpha = self.get_alpha(model, step_num)
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
         new_solution = self.func(model.solution, **self.arg_dict)
-        model.solution = model.solution + alpha * (new_solution - model.solution)
+        blend(model.solution, np.asarray(new_solution, dtype=model.solution.dtype), alpha)
+
+
+def float_solution(model):
+    """Replace model solution with its copy, so it may be changed in place during reconstruction.
+
+    Integer solutions are converted to float. Copy also protects arrays, given by user, or read-only shared arrays.
+    """
+    if model.solution is not None:
+        xp = backend.namespace(model.solution)
+        dtype = model.solution.dtype if backend.is_floating(model.solution) else backend.dtype(xp, model.dtype)
+        model.solution = xp.asarray(model.solution, dtype=dtype, copy=True)
+
+
+def writable_solution(model):
+    """Get model solution, which may be changed in place.
+
+    If solution was replaced by integer or read-only array since init, it is replaced with float copy.
+    """
+    solution = model.solution
+    if not backend.is_floating(solution) or (isinstance(solution, np.ndarray) and not solution.flags.writeable):
+        float_solution(model)
+    return model.solution
+
+
+def blend(solution, new_solution, alpha):
+    """Calculate solution + alpha * (new_solution - solution) in place.
+
+    Args:
+        solution(ndarray): float array, where the result is stored.
+        new_solution(ndarray): array of the same shape. It is used as buffer and is overwritten.
+        alpha(float): weight of the new solution.
+    """
+    if np.may_share_memory(solution, new_solution):
+        new_solution = new_solution.copy()
+    if alpha == 1:
+        solution[...] = new_solution
+        return
+    np.subtract(new_solution, solution, out=new_solution)
+    new_solution *= alpha
+    solution += new_solution
@@ -0,0 +1,67 @@
+"""Constraints, which may be used as proximal operators.
+
+Proximal operator of the function g with step t is prox(x) = argmin_u (g(u) + ||u - x||^2 / (2t)).
+Each class implements prox(solution, step, model) method, used by proximal-gradient iterators
+(see tomomak.iterators.fista), and may also be used as usual constraint in the Solver.
+In the latter case proximal operator with step = alpha is applied at every step.
+tomomak.constraints.basic.Positive and tomomak.constraints.total_variation.TotalVariation
+(available here as TotalVariation) also implement prox method.
+"""
+from ..iterators import abstract_iterator
+from . import basic
+from .total_variation import TotalVariation
+import numpy as np
+
+
+class Box(abstract_iterator.AbstractSolverClass):
+    """Limit solution values to the [lower, upper] range.
+
+    Proximal operator is the projection to the box. As a constraint it changes solution in place.
+    """
+
+    def __init__(self, lower=0, upper=None):
+        self.lower = lower
+        self.upper = upper
+
+    def init(self, model, steps, *args, **kwargs):
+        basic.float_solution(model)
+
+    def finalize(self, model):
+        pass
+
+    def __str__(self):
+        return "Limit values to [{}, {}]".format(self.lower, self.upper)
+
+    def step(self, model, step_num):
+        solution = basic.writable_solution(model)
+        np.clip(solution, self.lower, self.upper, out=solution)
+
+    def prox(self, solution, step, model):
+        return np.clip(solution, self.lower, self.upper)
+
+
+class L1(abstract_iterator.AbstractSolverClass):
+    """L1 norm regularization: weight * sum(|solution|).
+
+    Proximal operator is the soft thresholding. Promotes sparse solution.
+    """
+
+    def __init__(self, weight, alpha=1):
+        self.weight = weight
+        self.alpha = alpha
+
+    def init(self, model, steps, *args, **kwargs):
+        pass
+
+    def finalize(self, model):
+        pass
+
+    def __str__(self):
+        return "L1 regularization with weight {}".format(self.weight)
+
+    def step(self, model, step_num):
+        model.solution = self.prox(model.solution, self.alpha, model)
+
+    def prox(self, solution, step, model):
+        threshold = step * self.weight
+        return np.sign(solution) * np.maximum(np.abs(solution) - threshold, 0)
@@ -0,0 +1,61 @@
+from ..iterators import abstract_iterator
+import numpy as np
+
+
+class Schedule(abstract_iterator.AbstractSolverClass):
+    """Wrapper, which applies constraint (or iterator) only at the scheduled steps.
+
+    Constraint is applied at steps start, start + every, start + 2 * every, ... before stop.
+    It is useful for the expensive constraints, e.g. smoothing, when occasional application is enough.
+    If decay is given, alpha of the wrapped object at step n is multiplied by decay ** n,
+    so constraint strength decreases during reconstruction.
+    Decay works only with objects, which have alpha list (see tomomak.iterators.abstract_iterator.AbstractIterator).
+
+    Args:
+        constraint(tomomak constraint or iterator): wrapped object.
+        every(int, optional): apply constraint every k-th step. Default: 1.
+        start(int, optional): first step. Default: 0.
+        stop(int, optional): constraint is not applied at this and later steps. If None, it is applied till the end.
+            Default: None.
+        decay(float, optional): alpha decay factor per step. Default: None.
+    """
+
+    def __init__(self, constraint, every=1, start=0, stop=None, decay=None):
+        if every < 1:
+            raise ValueError("every should be positive integer.")
+        self.constraint = constraint
+        self.every = every
+        self.start = start
+        self.stop = stop
+        self.decay = decay
+
+    def init(self, model, steps, *args, **kwargs):
+        state = self.constraint.init(model, steps, *args, **kwargs)
+        if self.decay is not None:
+            if getattr(state, 'alpha', None) is None:
+                raise ValueError("Decay may be used only with constraints with alpha list, and {} has none."
+                                 .format(self.constraint))
+            state.alpha = np.asarray(state.alpha, dtype=float) * self.decay ** np.arange(len(state.alpha))
+        return abstract_iterator.IteratorState(inner=state)
+
+    def finalize(self, model, state):
+        abstract_iterator.call_with_state(self.constraint.finalize, state.inner, model)
+
+    def __str__(self):
+        res = "{} every {} steps from step {}".format(self.constraint, self.every, self.start)
+        if self.stop is not None:
+            res += " to step {}".format(self.stop)
+        if self.decay is not None:
+            res += " with alpha decay {}".format(self.decay)
+        return res
+
+    def active(self, step_num):
+        """Check if constraint is applied at the given step.
+        """
+        if step_num < self.start or (self.stop is not None and step_num >= self.stop):
+            return False
+        return (step_num - self.start) % self.every == 0
+
+    def step(self, model, step_num, state):
+        if self.active(step_num):
+            abstract_iterator.call_with_state(self.constraint.step, state.inner, model=model, step_num=step_num)
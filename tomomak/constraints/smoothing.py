@@ -0,0 +1,153 @@
+"""Vectorized smoothing constraints.
+
+Filters are applied to the whole solution array at once, results are written to the buffer, preallocated in init(),
+and blended with the solution in place: solution + alpha * (filtered - solution).
+Filter sizes are given in cells.
+"""
+from ..iterators import abstract_iterator
+from .basic import float_solution, writable_solution, blend
+import numpy as np
+import scipy.ndimage
+import scipy.signal
+
+
+class _Smoothing(abstract_iterator.AbstractIterator):
+    """Base class for the smoothing constraints. Subclasses implement _filter(model, state).
+    """
+
+    def init(self, model, steps, *args, **kwargs):
+        float_solution(model)
+        state = super().init(model, steps, *args, **kwargs)
+        state.buffer = np.empty_like(model.solution)
+        return state
+
+    def finalize(self, model, state):
+        pass
+
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
+        writable_solution(model)
+        if model.solution.shape != state.buffer.shape or model.solution.dtype != state.buffer.dtype:
+            state.buffer = np.empty_like(model.solution)
+        self._filter(model, state)
+        blend(model.solution, state.buffer, alpha)
+
+    def _filter(self, model, state):
+        raise NotImplementedError
+
+
+class GaussianFilter(_Smoothing):
+    """Gaussian filter, see scipy.ndimage.gaussian_filter. It is separable, so it is applied axis by axis.
+
+    Args:
+        sigma(float or sequence of floats): standard deviation of the Gaussian kernel in cells for each axis.
+        mode(str, optional): how the array is extended beyond its boundaries. Default: 'nearest'.
+        alpha(float or iterable of floats, optional): blending weight for each step. Default: 0.1.
+        alpha_calc(optional): alpha calculator. Default: None.
+    """
+
+    def __init__(self, sigma, mode='nearest', alpha=0.1, alpha_calc=None):
+        super().__init__(alpha, alpha_calc)
+        self.sigma = sigma
+        self.mode = mode
+
+    def __str__(self):
+        return "Gaussian filter with sigma {}".format(self.sigma)
+
+    def _filter(self, model, state):
+        scipy.ndimage.gaussian_filter(model.solution, self.sigma, output=state.buffer, mode=self.mode)
+
+
+class MedianFilter(_Smoothing):
+    """Median filter, see scipy.ndimage.median_filter. Removes outliers and preserves edges.
+
+    Args:
+        size(int or sequence of ints): filter size in cells for each axis.
+        mode(str, optional): how the array is extended beyond its boundaries. Default: 'nearest'.
+        alpha(float or iterable of floats, optional): blending weight for each step. Default: 0.1.
+        alpha_calc(optional): alpha calculator. Default: None.
+    """
+
+    def __init__(self, size, mode='nearest', alpha=0.1, alpha_calc=None):
+        super().__init__(alpha, alpha_calc)
+        self.size = size
+        self.mode = mode
+
+    def __str__(self):
+        return "Median filter with size {}".format(self.size)
+
+    def _filter(self, model, state):
+        scipy.ndimage.median_filter(model.solution, size=self.size, output=state.buffer, mode=self.mode)
+
+
+class SavitzkyGolay(_Smoothing):
+    """Savitzky-Golay filter along one axis.
+
+    Filter coefficients are calculated once with scipy.signal.savgol_coeffs,
+    and filter is applied as 1D correlation along the axis (scipy.ndimage.correlate1d).
+
+    Args:
+        window_length(int): odd filter window length in cells.
+        polyorder(int): order of the fitted polynomial. Should be less than window_length.
+        axis(int, optional): axis index. Default: 0.
+        mode(str, optional): how the array is extended beyond its boundaries. Default: 'nearest'.
+        alpha(float or iterable of floats, optional): blending weight for each step. Default: 0.1.
+        alpha_calc(optional): alpha calculator. Default: None.
+    """
+
+    def __init__(self, window_length, polyorder, axis=0, mode='nearest', alpha=0.1, alpha_calc=None):
+        super().__init__(alpha, alpha_calc)
+        self.window_length = window_length
+        self.polyorder = polyorder
+        self.axis = axis
+        self.mode = mode
+        self.coefficients = scipy.signal.savgol_coeffs(window_length, polyorder, use='dot')
+
+    def __str__(self):
+        return "Savitzky-Golay filter with window {} and order {} along axis {}".format(
+            self.window_length, self.polyorder, self.axis)
+
+    def _filter(self, model, state):
+        scipy.ndimage.correlate1d(model.solution, self.coefficients, axis=self.axis,
+                                  output=state.buffer, mode=self.mode)
+
+
+class LaplacianDiffusion(_Smoothing):
+    """Diffusion with the sparse Laplace operator of the mesh (see tomomak.mesh.mesh.Mesh.laplacian).
+
+    Works with any mesh, including irregular and 2D axes. At each step n_iter explicit diffusion steps
+    x = x - tau * L x are performed with tau = strength / (2 * max(diag(L))),
+    which is stable for 0 < strength <= 1.
+
+    Args:
+        strength(float, optional): diffusion strength. Default: 0.5.
+        n_iter(int, optional): number of diffusion steps at each solver step. Default: 1.
+        coefficients(iterable of floats, optional): diffusion coefficient for each axis, e.g. (1, 0)
+            to smooth only along the first axis. Default: None.
+        alpha(float or iterable of floats, optional): blending weight for each step. Default: 1.
+        alpha_calc(optional): alpha calculator. Default: None.
+    """
+
+    def __init__(self, strength=0.5, n_iter=1, coefficients=None, alpha=1, alpha_calc=None):
+        super().__init__(alpha, alpha_calc)
+        self.strength = strength
+        self.n_iter = n_iter
+        self.coefficients = coefficients
+
+    def __str__(self):
+        return "Laplacian diffusion with strength {}".format(self.strength)
+
+    def init(self, model, steps, *args, **kwargs):
+        state = super().init(model, steps, *args, **kwargs)
+        if model.mesh is None:
+            raise ValueError("Mesh should be defined for Laplacian diffusion.")
+        state.laplacian = model.mesh.laplacian(self.coefficients)
+        max_diag = np.max(state.laplacian.diagonal(), initial=0)
+        state.tau = self.strength / (2 * max_diag) if max_diag > 0 else 0
+        return state
+
+    def _filter(self, model, state):
+        flat = state.buffer.reshape(-1)
+        flat[...] = model.solution.reshape(-1)
+        for _ in range(self.n_iter):
+            flat -= state.tau * (state.laplacian @ flat)
@@ -0,0 +1,123 @@
+"""Total variation regularization on the mesh with the primal-dual algorithm.
+
+See A. Chambolle and T. Pock, "A first-order primal-dual algorithm for convex problems
+with applications to imaging", 2011.
+"""
+from ..iterators import abstract_iterator
+from .basic import float_solution, writable_solution
+from tomomak.mesh.mesh import Mesh
+from tomomak.mesh.cartesian import Axis1d
+import numpy as np
+import scipy.sparse
+
+
+class TotalVariation(abstract_iterator.AbstractIterator):
+    """Total variation denoising: solution = argmin_x (||x - solution||^2 / 2 + alpha * weight * TV(x)).
+
+    TV is calculated using mesh gradient operators (see tomomak.mesh.mesh.Mesh.gradient_operators).
+    For meshes with 1D axes only isotropic TV sum(|grad(x)|) is used by default.
+    For meshes with 2D axes (e.g. SpiderWeb2dAxis) anisotropic TV, i.e. sum of absolute differences
+    between all neighbouring cells, is used.
+    If volume_weighted is True, each term is multiplied by the cell volume (mean volume of the neighbouring cells
+    for anisotropic TV), so TV approximates integral of |grad(x)| over irregular mesh.
+
+    At each solver step n_iter Chambolle-Pock iterations are performed. Dual variables are kept between steps
+    (warm start), so few iterations per step are enough. Edges of the solution are preserved,
+    while noise and small oscillations are removed.
+    The class also implements prox(solution, step, model) method (see tomomak.constraints.proximal),
+    which is started from zero dual variables. If model has no mesh, prox uses cartesian mesh with unit cells.
+
+    Args:
+        weight(float): regularization weight.
+        n_iter(int, optional): number of primal-dual iterations per step. Default: 5.
+        isotropic(bool, optional): use isotropic TV. If None, isotropic TV is used if all axes are 1D.
+            Default: None.
+        volume_weighted(bool, optional): weight TV with cell volumes. Default: False.
+        alpha(float or iterable of floats, optional): step multiplier for each step. Default: 1.
+        alpha_calc(optional): alpha calculator. Default: None.
+    """
+
+    def __init__(self, weight, n_iter=5, isotropic=None, volume_weighted=False, alpha=1, alpha_calc=None):
+        super().__init__(alpha, alpha_calc)
+        self.weight = weight
+        self.n_iter = n_iter
+        self.isotropic = isotropic
+        self.volume_weighted = volume_weighted
+
+    def init(self, model, steps, *args, **kwargs):
+        if model.mesh is None:
+            raise ValueError("Mesh should be defined for total variation constraint.")
+        float_solution(model)
+        state = super().init(model, steps, *args, **kwargs)
+        state.operator = self._operator(model.mesh)
+        state.dual = np.zeros(state.operator.matrix.shape[0])
+        return state
+
+    def finalize(self, model, state):
+        pass
+
+    def __str__(self):
+        return "Total variation denoising with weight {}".format(self.weight)
+
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
+        solution = writable_solution(model)
+        res = self._denoise(solution.ravel(), alpha * self.weight, state.operator, state.dual)
+        solution[...] = res.reshape(solution.shape)
+
+    def prox(self, solution, step, model):
+        if model is None or model.mesh is None:
+            mesh = Mesh([Axis1d(size=n, upper_limit=n) for n in np.shape(solution)])
+        else:
+            mesh = model.mesh
+        op = self._operator(mesh)
+        res = self._denoise(np.ravel(solution).astype(float), step * self.weight, op, np.zeros(op.matrix.shape[0]))
+        return res.reshape(np.shape(solution))
+
+    def _operator(self, mesh):
+        isotropic = self.isotropic
+        if isotropic is None:
+            isotropic = all(ax.dimension == 1 for ax in mesh.axes)
+        grads = mesh.gradient_operators(padded=isotropic)
+        if self.volume_weighted:
+            volumes = mesh.cell_volumes()
+            if isotropic:
+                bounds = volumes
+            else:
+                bounds = np.concatenate([(abs(d) @ volumes) / np.asarray(abs(d).sum(axis=1)).ravel() for d in grads])
+        else:
+            bounds = np.ones(grads[0].shape[0] if isotropic else sum(d.shape[0] for d in grads))
+        matrix = scipy.sparse.vstack(grads, format='csr')
+        # ||K||^2 <= max row sum of |K^T K|
+        norm2 = np.max(np.asarray(abs(matrix.T @ matrix).sum(axis=1)), initial=0)
+        step = 0.99 / np.sqrt(norm2) if norm2 > 0 else 1
+        return abstract_iterator.IteratorState(matrix=matrix, transposed=matrix.T.tocsr(), bounds=bounds,
+                                               n_axes=len(grads) if isotropic else None, step=step)
+
+    def _denoise(self, f, lam, op, dual):
+        """Chambolle-Pock iterations for min_x(||x - f||^2 / 2 + lam * TV(x)). Dual variables are updated in place.
+        """
+        if lam <= 0:
+            return f.copy()
+        tau = sigma = op.step
+        bounds = lam * op.bounds
+        x = f - op.transposed @ dual
+        x_bar = x.copy()
+        for _ in range(self.n_iter):
+            dual += sigma * (op.matrix @ x_bar)
+            if op.n_axes is None:
+                np.clip(dual, -bounds, bounds, out=dual)
+            else:
+                components = dual.reshape(op.n_axes, -1)
+                norm = np.sqrt(np.sum(components ** 2, axis=0))
+                components /= np.maximum(1, norm / bounds)
+            x_new = (x - tau * (op.transposed @ dual) + tau * f) / (1 + tau)
+            # data term is strongly convex, so step sizes are accelerated (algorithm 2 of Chambolle and Pock)
+            theta = 1 / np.sqrt(1 + 2 * tau)
+            tau *= theta
+            sigma /= theta
+            np.subtract(x_new, x, out=x_bar)
+            x_bar *= theta
+            x_bar += x_new
+            x = x_new
+        return x
@@ -0,0 +1,113 @@
+"""Out-of-core detector geometry.
+
+Geometry, which doesn't fit in memory, is stored on disk, e.g. as .npy file, opened as memmap.
+Projections stream blocks of detectors sequentially. Next block is read by the background thread,
+while current block is processed, so speed is limited by the disk bandwidth.
+Geometry larger than memory may be created with numpy.lib.format.open_memmap and filled detector by detector.
+"""
+import concurrent.futures
+import numpy as np
+from tomomak.detectors.operators import AbstractOperator, RowSubset
+
+
+class ChunkedGeometry(AbstractOperator):
+    """Geometry, which is processed in blocks of detectors.
+
+    Block size is chosen so that two blocks (processed and prefetched) fit in memory_budget.
+    Geometry may be any array-like object, supporting slicing along the first axis,
+    e.g. numpy.memmap or h5py dataset.
+
+    Args:
+        geometry(array-like): geometry with shape (number of detectors, *solution shape).
+        memory_budget(int, optional): memory for the geometry blocks in bytes. Default: 256 MB.
+        prefetch(bool, optional): read next block in the background thread. Default: True.
+    """
+
+    def __init__(self, geometry, memory_budget=2 ** 28, prefetch=True):
+        self.geometry = geometry
+        self.memory_budget = memory_budget
+        self.prefetch = prefetch
+        row_bytes = max(int(np.prod(geometry.shape[1:])) * np.dtype(geometry.dtype).itemsize, 1)
+        self.chunk_size = int(max(1, memory_budget // (2 * row_bytes)))
+
+    @classmethod
+    def open(cls, filename, memory_budget=2 ** 28, prefetch=True):
+        """Open geometry, saved with numpy.save, as memmap.
+
+        Args:
+            filename(str): .npy file name.
+            memory_budget(int, optional): see ChunkedGeometry. Default: 256 MB.
+            prefetch(bool, optional): see ChunkedGeometry. Default: True.
+
+        Returns:
+            ChunkedGeometry: geometry.
+        """
+        return cls(np.load(filename, mmap_mode='r'), memory_budget, prefetch)
+
+    @property
+    def shape(self):
+        return tuple(self.geometry.shape)
+
+    @property
+    def dtype(self):
+        return np.dtype(self.geometry.dtype)
+
+    def project(self, solution):
+        x = np.ravel(solution)
+        res = np.empty(len(self), dtype=np.result_type(self.dtype, x))
+        for i1, i2, block in self.blocks():
+            res[i1:i2] = block @ x
+        return res
+
+    def back_project(self, values):
+        res = np.zeros(int(np.prod(self.shape[1:])), dtype=np.result_type(self.dtype, values))
+        for i1, i2, block in self.blocks():
+            res += values[i1:i2] @ block
+        return res.reshape(self.shape[1:])
+
+    def toarray(self):
+        return np.array(self.geometry)
+
+    def row_square_sum(self):
+        res = np.empty(len(self))
+        for i1, i2, block in self.blocks():
+            res[i1:i2] = np.einsum('ij,ij->i', block, block)
+        return res
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return np.asarray(self.geometry[item])
+        if isinstance(item, slice) and item.step in (None, 1):
+            i1, i2, _ = item.indices(len(self))
+            # slices of memmap are not read, so new geometry is out-of-core too
+            return ChunkedGeometry(self.geometry[i1:max(i1, i2)], self.memory_budget, self.prefetch)
+        return super().__getitem__(item)
+
+    def _take(self, rows):
+        if rows.size <= self.chunk_size:
+            return ChunkedGeometry(np.asarray(self.geometry[np.sort(rows)])[np.argsort(np.argsort(rows))],
+                                   self.memory_budget, self.prefetch)
+        return RowSubset(self, rows)
+
+    def blocks(self):
+        """Iterate over blocks of detectors.
+
+        Yields:
+            tuple: first and last + 1 detector indexes and ndarray block with shape (detectors, solution size).
+        """
+        n = len(self)
+        ranges = [(i, min(i + self.chunk_size, n)) for i in range(0, n, self.chunk_size)]
+        if not self.prefetch or len(ranges) < 2:
+            for i1, i2 in ranges:
+                yield i1, i2, self._read(i1, i2)
+            return
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            future = pool.submit(self._read, *ranges[0])
+            for k, (i1, i2) in enumerate(ranges):
+                block = future.result()
+                if k + 1 < len(ranges):
+                    future = pool.submit(self._read, *ranges[k + 1])
+                yield i1, i2, block
+
+    def _read(self, i1, i2):
+        return np.array(self.geometry[i1:i2]).reshape(i2 - i1, -1)
@@ -8,6 +8,8 @@ import tomomak.util.geometry.AbstractGeometry
 from tomomak.util.geometry.geometry2d import Geometry2d
 import numpy as np
 from tomomak.util.array_routines import broadcast_object
+from tomomak.detectors.operators import FactorizedGeometry, KroneckerOperator
+from tomomak.util import precision
 
 
 def line_intersect(mesh, p1, p2, width, divergence=0, index=(0, 1), response=1, radius_dependence=True,
@@ -35,7 +37,8 @@ def line_intersect(mesh, p1, p2, width, divergence=0, index=(0, 1), response=1,
         geometry: geometry for making N dimestion intersection
 
     Returns:
-         ndarray: numpy array, representing one detector on a given mesh.
+         ndarray: numpy array with default dtype (see tomomak.util.precision), representing one detector
+             on a given mesh.
     """
     points = geometry.line_to_polygon(p1, p2, width, divergence)
     if isinstance(index, int):
@@ -46,12 +49,13 @@ def line_intersect(mesh, p1, p2, width, divergence=0, index=(0, 1), response=1,
         r = 4 * np.pi * np.square(r)
         res /= r
     res *= response
+    res = res.astype(precision.get_default_dtype(), copy=False)
     if broadcast:
         res = tomomak.util.array_routines.broadcast_object(res, index, mesh.shape)
     return res
 
 
-def fan_detector(mesh, p1, p2, width,  number, index=(0, 1), angle=np.pi/2, *args, **kwargs):
+def fan_detector(mesh, p1, p2, width,  number, index=(0, 1), angle=np.pi/2, *args, factorized=False, **kwargs):
     """ Creates one fan of detectors.
 
     Args:
@@ -62,10 +66,12 @@ def fan_detector(mesh, p1, p2, width,  number, index=(0, 1), angle=np.pi/2, *arg
         index(tuple of two ints, optional): axes to build object at. Default: (0,1).
         number(integer): number of detector lines in the fan.
         angle(float): total angle of fan in Rad. Default: pi/2.
+        factorized(bool): If True, geometry is returned as FactorizedGeometry, which stores only
+            geometry over the index axes (see tomomak.detectors.operators). Default: False.
         *args, **kwarg - line2d arguments.
 
     Returns:
-        ndarray: numpy array, representing fan of detectors on a given mesh.
+        ndarray or FactorizedGeometry: numpy array, representing fan of detectors on a given mesh.
     """
     if angle < 0 or angle >= np.pi:
         raise ValueError("angle value is {}. < pi.".format(angle))
@@ -78,22 +84,19 @@ def fan_detector(mesh, p1, p2, width,  number, index=(0, 1), angle=np.pi/2, *arg
     r = r / np.cos(angle / 2)
     p2 = p1 + r
     line = shapely.geometry.LineString([p1, p2])
-    line = shapely.affinity.rotate(line, -angle / 2, origin=p1, use_radians=True)
+    line = shapely.affinity.rotate(line, -angle / 2, origin=tuple(p1), use_radians=True)
     rot_angle = angle / (number - 1)
     # start scanning
-    shape = [0]
-    shape.extend(mesh.shape)
-    res = np.zeros(shape)
+    res = _detector_array(mesh, number, index, factorized)
     for i in range(number):
         p1, p2 = line.coords
-        addition = np.array([line_intersect(mesh, p1, p2, width, index=index,  *args, **kwargs)])
-        res = np.append(res, addition, axis=0)
+        res[i] = line_intersect(mesh, p1, p2, width, *args, index=index, broadcast=not factorized, **kwargs)
         line = shapely.affinity.rotate(line, rot_angle, origin=p1, use_radians=True)
-    return res
+    return _detector_result(mesh, res, index, factorized)
 
 
 def fan_detector_array(mesh, focus_point, radius, fan_num, line_num, width,
-                       incline=0,  *args, **kwargs):
+                       incline=0, *args, factorized=False, **kwargs):
     """ Creates array of fan detectors around focus points.
 
       Args:
@@ -104,30 +107,31 @@ def fan_detector_array(mesh, focus_point, radius, fan_num, line_num, width,
           line_num(integer): number of lines.
           width: width of each line.
           incline(float): incline of first detector fan in Rad from the (1, 0) direction. Default: 0.
+          factorized(bool): see fan_detector. Default: False.
           *args, **kwarg - fan_detector arguments.
 
       Returns:
-          ndarray: numpy array, representing fan of detectors on a given mesh.
+          ndarray or FactorizedGeometry: numpy array, representing fan of detectors on a given mesh.
       """
-    shape = [0]
-    shape.extend(mesh.shape)
-    res = np.zeros(shape)
+    res = []
     d_incline = np.pi * 2 / fan_num
     focus_point = np.array(focus_point)
     for i in range(fan_num):
         p1 = np.array([focus_point[0] + radius * np.cos(incline), focus_point[1] + radius * np.sin(incline)])
         r = (focus_point - p1) * 10
         p2 = p1 + r
-        res = np.append(res, fan_detector(mesh, p1, p2, width, line_num,  *args, **kwargs), axis=0)
+        res.append(fan_detector(mesh, p1, p2, width, line_num, *args, factorized=factorized, **kwargs))
         print('\r', end='' )
         print("Generating array of fan detectors: ", str(i*100 // fan_num) + "% complete", end='')
         incline += d_incline
     print('\r \r ', end='')
     print('\r \r ', end='')
-    return res
+    if factorized:
+        return FactorizedGeometry(np.concatenate([f.kernel for f in res]), res[0].index, mesh.shape)
+    return np.concatenate(res)
 
 
-def parallel_detector(mesh, p1, p2, width, number, shift, index=(0, 1), *args, **kwargs):
+def parallel_detector(mesh, p1, p2, width, number, shift, index=(0, 1), *args, factorized=False, **kwargs):
     """ Creates array of parallel detectors.
 
        Args:
@@ -138,10 +142,11 @@ def parallel_detector(mesh, p1, p2, width, number, shift, index=(0, 1), *args, *
            number(int): number of detectors.
            shift(float): shift of each line as compared to previous.
            index(tuple of two ints, optional): axes to build object at. Default: (0,1).
+           factorized(bool): see fan_detector. Default: False.
            *args, **kwarg - additional line2d arguments.
 
        Returns:
-           ndarray: numpy array, representing detectors on a given mesh.
+           ndarray or FactorizedGeometry: numpy array, representing detectors on a given mesh.
        """
     # finding first sightline of the detector
     p1 = np.array(p1)
@@ -153,12 +158,50 @@ def parallel_detector(mesh, p1, p2, width, number, shift, index=(0, 1), *args, *
     p2 = p1 + r
     line = shapely.geometry.LineString([p1, p2])
     # start scanning
-    shape = [0]
-    shape.extend(mesh.shape)
-    res = np.zeros(shape)
+    res = _detector_array(mesh, number, index, factorized)
     for i in range(number):
         p1, p2 = line.coords
-        addition = np.array([line_intersect(mesh, p1, p2, width, index=index,  *args, **kwargs)])
-        res = np.append(res, addition, axis=0)
+        res[i] = line_intersect(mesh, p1, p2, width, *args, index=index, broadcast=not factorized, **kwargs)
         line = line.parallel_offset(shift, 'left')
+    return _detector_result(mesh, res, index, factorized)
+
+
+def _detector_array(mesh, number, index, factorized):
+    """Preallocated array for the geometry of number detectors. Broadcasted views are written directly to it.
+    """
+    if factorized:
+        return np.zeros([number] + [mesh.shape[i] for i in index], dtype=precision.get_default_dtype())
+    return np.zeros([number] + list(mesh.shape), dtype=precision.get_default_dtype())
+
+
+def _detector_result(mesh, res, index, factorized):
+    if factorized:
+        return FactorizedGeometry(res, index, mesh.shape)
     return res
+
+
+def kronecker_detector(mesh, responses, index):
+    """Create detectors with separable response: Kronecker product of the responses along groups of axes.
+
+    E.g. for (x, y, energy) mesh responses may be [fan_detector(..., factorized=True).kernel, energy_response]
+    with index [(0, 1), 2]. Number of detectors is product of the numbers of rows of the responses,
+    see tomomak.detectors.operators.KroneckerOperator.
+
+    Args:
+        mesh(tomomak.main_structures.Mesh): mesh to work with.
+        responses(list): response along each group of axes. Response is ndarray with shape
+            (number of rows, *sizes of the group axes) or, for one 1D axis, function,
+            which takes coordinates of the axis cells and returns array with shape (number of rows, axis size).
+        index(list of ints or tuples of ints): axes of each response.
+
+    Returns:
+        KroneckerOperator: detector geometry.
+    """
+    factors = []
+    for response, ind in zip(responses, index):
+        if callable(response):
+            if not isinstance(ind, int):
+                raise TypeError("Response function may be used only for one 1D axis.")
+            response = np.atleast_2d(response(np.asarray(mesh.axes[ind].coordinates)))
+        factors.append(response)
+    return KroneckerOperator(factors, index, mesh.shape)
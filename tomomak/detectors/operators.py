@@ -0,0 +1,336 @@
+"""Structured detector geometry, which is not stored as dense array.
+
+Operators may be used as model.detector_geometry. Projection (see tomomak.detectors.signal.get_signal)
+and back projection (see tomomak.detectors.signal.back_project) use operator structure directly.
+Operators also support indexing of the detectors, sum over detectors and conversion to the dense array
+(np.asarray(operator)), so code, which needs dense geometry, still works.
+"""
+from abc import ABC, abstractmethod
+import functools
+import numpy as np
+import scipy.sparse.linalg
+
+
+class AbstractOperator(ABC):
+    """Base class for the detector geometry operators.
+
+    Operator represents array with shape (number of detectors, *solution shape).
+    Subclasses implement project, back_project and toarray. Subclasses may also implement
+    efficient _take and row_square_sum.
+    """
+
+    @property
+    @abstractmethod
+    def shape(self):
+        """tuple of ints: shape of the equivalent dense geometry array.
+        """
+
+    @abstractmethod
+    def project(self, solution):
+        """Get detector signals.
+
+        Args:
+            solution(ndarray): solution with shape self.shape[1:].
+
+        Returns:
+            ndarray: 1D array of signals.
+        """
+
+    @abstractmethod
+    def back_project(self, values):
+        """Get sum of detector geometries, weighted by given values.
+
+        Args:
+            values(ndarray): 1D array of value for each detector.
+
+        Returns:
+            ndarray: array of solution shape.
+        """
+
+    @abstractmethod
+    def toarray(self):
+        """Get equivalent dense geometry array.
+
+        Returns:
+            ndarray: dense geometry.
+        """
+
+    def _take(self, rows):
+        """Get operator, consisting of the given detectors.
+
+        Args:
+            rows(ndarray of ints): detector indexes.
+
+        Returns:
+            AbstractOperator: new operator.
+        """
+        return RowSubset(self, rows)
+
+    def row_square_sum(self):
+        """Squared norm of each detector geometry.
+
+        Returns:
+            ndarray: 1D array.
+        """
+        return np.sum(np.square(self.toarray()).reshape(len(self), -1), axis=1)
+
+    def linear_operator(self):
+        """Get operator, acting on the flattened solution.
+
+        Returns:
+            scipy.sparse.linalg.LinearOperator: operator with shape (number of detectors, solution size).
+        """
+        shape = self.shape[1:]
+        return scipy.sparse.linalg.LinearOperator(
+            (len(self), int(np.prod(shape))), matvec=lambda x: self.project(np.reshape(x, shape)),
+            rmatvec=lambda v: np.ravel(self.back_project(np.ravel(v))), dtype=self.dtype)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def dtype(self):
+        return np.dtype(float)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        res = self.toarray()
+        return res if dtype is None else res.astype(dtype, copy=False)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += len(self)
+            one = np.zeros(len(self))
+            one[item] = 1
+            return self.back_project(one)
+        rows = np.atleast_1d(np.arange(len(self))[item])
+        if rows.size == len(self) and np.all(rows == np.arange(len(self))):
+            return self
+        return self._take(rows)
+
+    def reshape(self, *shape):
+        """Reshape equivalent dense array. Dense array is created, so it is a fallback for the code,
+        which can't work with operators.
+        """
+        return self.toarray().reshape(*shape)
+
+    def sum(self, axis=None, dtype=None, out=None):
+        """Sum of the equivalent dense array. Sum over detectors (axis=0) is calculated with back projection.
+        """
+        if axis == 0:
+            res = self.back_project(np.ones(len(self)))
+        elif axis is None:
+            res = np.sum(self.back_project(np.ones(len(self))))
+        else:
+            res = np.sum(self.toarray(), axis=axis)
+        if dtype is not None:
+            res = np.asarray(res, dtype=dtype)
+        if out is not None:
+            out[...] = res
+            return out
+        return res
+
+
+class FactorizedGeometry(AbstractOperator):
+    """Geometry, which depends on several mesh axes only, multiplied by the separable weights along other axes.
+
+    Geometry of the detector i is kernel[i] over the index axes times w_1 x w_2 x ... over other axes,
+    where w_k are weight vectors (ones by default). E.g. line of sight geometry on the (x, y, energy) mesh
+    is 2D chord length map times energy response. Only kernel is stored, so memory and projection cost
+    are reduced by the product of the other axes sizes.
+
+    Args:
+        kernel(ndarray): geometry with shape (number of detectors, *sizes of the index axes).
+        index(int or tuple of ints): mesh axes of the kernel.
+        shape(tuple of ints): solution shape.
+        weights(dict, optional): weight vector for some of the other axes {axis: 1D array}. Default: None.
+    """
+
+    def __init__(self, kernel, index, shape, weights=None):
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        self.kernel = np.asarray(kernel)
+        self.index = tuple(index)
+        self._shape = tuple(shape)
+        self.weights = {} if weights is None else dict(weights)
+        if self.kernel.shape[1:] != tuple(self._shape[i] for i in self.index):
+            raise ValueError("Kernel shape {} is inconsistent with solution shape {} and index {}."
+                             .format(self.kernel.shape, self._shape, self.index))
+        self._other = tuple(i for i in range(len(self._shape)) if i not in self.index)
+        # outer product of the weights over other axes
+        outer = np.ones(())
+        for ax in self._other:
+            w = self.weights.get(ax)
+            w = np.ones(self._shape[ax]) if w is None else np.asarray(w, dtype=float)
+            if w.shape != (self._shape[ax],):
+                raise ValueError("Weight of axis {} should have shape {}.".format(ax, (self._shape[ax],)))
+            outer = np.multiply.outer(outer, w)
+        self._outer = outer
+
+    @property
+    def shape(self):
+        return (self.kernel.shape[0],) + self._shape
+
+    @property
+    def dtype(self):
+        return np.result_type(self.kernel, self._outer)
+
+    def project(self, solution):
+        k = len(self.index)
+        x = np.moveaxis(solution, self.index, range(k))
+        x = np.tensordot(x, self._outer, axes=len(self._other))
+        return np.tensordot(self.kernel, x, axes=k)
+
+    def back_project(self, values):
+        res = np.multiply.outer(np.tensordot(values, self.kernel, axes=1), self._outer)
+        return np.moveaxis(res, range(len(self.index)), self.index)
+
+    def toarray(self):
+        res = np.multiply.outer(self.kernel, self._outer)
+        return np.moveaxis(res, range(1, len(self.index) + 1), [i + 1 for i in self.index])
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)) and not self.weights:
+            # zero-stride view, no memory is allocated
+            row = self.kernel[item].reshape(self.kernel.shape[1:] + (1,) * len(self._other))
+            return np.broadcast_to(np.moveaxis(row, range(len(self.index)), self.index), self._shape)
+        return super().__getitem__(item)
+
+    def _take(self, rows):
+        return FactorizedGeometry(self.kernel[rows], self.index, self._shape, self.weights)
+
+    def row_square_sum(self):
+        k = np.square(self.kernel).reshape(len(self), -1)
+        return np.sum(k, axis=1) * np.sum(np.square(self._outer))
+
+
+class KroneckerOperator(AbstractOperator):
+    """Geometry, which is Kronecker product of the responses along groups of mesh axes: A_1 x A_2 x ... x A_K.
+
+    E.g. spectrometer lines of sight on (x, y, energy) mesh: A_1 is chord length map of each line with shape
+    (lines, x, y) and A_2 is energy response of each spectrometer channel with shape (channels, energy).
+    Detector (i_1, ..., i_K) sees A_1[i_1] x ... x A_K[i_K]. Detectors are ordered as in
+    numpy.ravel_multi_index((i_1, ..., i_K), (m_1, ..., m_K)), where m_k is number of rows in A_k.
+    Operator is applied to the solution by contraction with each factor in turn,
+    so the full operator is never formed.
+
+    Args:
+        factors(list of ndarrays): responses with shapes (m_k, *sizes of the factor axes).
+        index(list of ints or tuples of ints): mesh axes of each factor. All axes should be used once.
+        shape(tuple of ints): solution shape.
+    """
+
+    def __init__(self, factors, index, shape):
+        if len(factors) != len(index):
+            raise ValueError("Number of factors should be equal to the number of index groups.")
+        self.factors = [np.asarray(f) for f in factors]
+        self.index = [(i,) if isinstance(i, (int, np.integer)) else tuple(i) for i in index]
+        self._shape = tuple(shape)
+        axes = [i for group in self.index for i in group]
+        if sorted(axes) != list(range(len(self._shape))):
+            raise ValueError("Each of {} solution axes should belong to exactly one factor. Index: {}."
+                             .format(len(self._shape), self.index))
+        for f, group in zip(self.factors, self.index):
+            if f.shape[1:] != tuple(self._shape[i] for i in group):
+                raise ValueError("Factor shape {} is inconsistent with solution shape {} and index {}."
+                                 .format(f.shape, self._shape, group))
+        self._axes = axes
+        self._flat = [f.reshape(f.shape[0], -1) for f in self.factors]
+        self._rows = tuple(f.shape[0] for f in self.factors)
+        self._cells = tuple(f.shape[1] for f in self._flat)
+
+    @property
+    def shape(self):
+        return (int(np.prod(self._rows)),) + self._shape
+
+    @property
+    def dtype(self):
+        return np.result_type(*self.factors)
+
+    def project(self, solution):
+        x = np.moveaxis(solution, self._axes, range(len(self._axes))).reshape(self._cells)
+        for k, f in enumerate(self._flat):
+            x = np.moveaxis(np.tensordot(f, x, axes=(1, k)), 0, k)
+        return x.ravel()
+
+    def back_project(self, values):
+        x = np.reshape(values, self._rows)
+        for k, f in enumerate(self._flat):
+            x = np.moveaxis(np.tensordot(f, x, axes=(0, k)), 0, k)
+        x = x.reshape([self._shape[i] for i in self._axes])
+        return np.moveaxis(x, range(len(self._axes)), self._axes)
+
+    def toarray(self):
+        res = functools.reduce(np.kron, self._flat)
+        res = res.reshape([len(self)] + [self._shape[i] for i in self._axes])
+        return np.moveaxis(res, range(1, len(self._axes) + 1), [i + 1 for i in self._axes])
+
+    def row_square_sum(self):
+        sums = [np.sum(np.square(f), axis=1) for f in self._flat]
+        return functools.reduce(np.multiply.outer, sums).ravel()
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            # outer product of the factor rows, full back projection is not needed
+            i = np.unravel_index(item % len(self), self._rows)
+            res = functools.reduce(np.multiply.outer, [f[k] for f, k in zip(self._flat, i)])
+            res = res.reshape([self._shape[ax] for ax in self._axes])
+            return np.moveaxis(res, range(len(self._axes)), self._axes)
+        return super().__getitem__(item)
+
+    def _take(self, rows):
+        # Kronecker product of the factor rows, which are used by given detectors,
+        # e.g. block of the consecutive detectors mostly uses a few rows of the first factor
+        multi = np.unravel_index(rows, self._rows)
+        used = [np.unique(i) for i in multi]
+        sub = KroneckerOperator([f[u] for f, u in zip(self.factors, used)], self.index, self._shape)
+        local = np.ravel_multi_index([np.searchsorted(u, i) for u, i in zip(used, multi)], sub._rows)
+        if local.size == len(sub) and np.all(local == np.arange(len(sub))):
+            return sub
+        return RowSubset(sub, local)
+
+
+class RowSubset(AbstractOperator):
+    """Operator, consisting of the given detectors of other operator.
+
+    Args:
+        operator(AbstractOperator): full operator.
+        rows(ndarray of ints): detector indexes.
+    """
+
+    def __init__(self, operator, rows):
+        self.operator = operator
+        self.rows = np.asarray(rows)
+
+    @property
+    def shape(self):
+        return (self.rows.size,) + self.operator.shape[1:]
+
+    @property
+    def dtype(self):
+        return self.operator.dtype
+
+    def project(self, solution):
+        return self.operator.project(solution)[self.rows]
+
+    def back_project(self, values):
+        full = np.zeros(len(self.operator), dtype=np.result_type(values, float))
+        np.add.at(full, self.rows, values)
+        return self.operator.back_project(full)
+
+    def toarray(self):
+        return np.asarray(self.operator)[self.rows]
+
+    def row_square_sum(self):
+        return self.operator.row_square_sum()[self.rows]
+
+    def _take(self, rows):
+        return RowSubset(self.operator, self.rows[rows])
@@ -0,0 +1,224 @@
+"""Matrix-free projector for the lines of sight on cartesian meshes.
+
+Detector geometry is not stored. Intersection of each line with the mesh cells is recalculated
+during each projection with the grid traversal (R. L. Siddon, "Fast calculation of the exact radiological path
+for a three-dimensional CT array", 1985), so memory is O(cells + detectors).
+"""
+import concurrent.futures
+import copy
+import functools
+import os
+import numpy as np
+import scipy.sparse
+from tomomak.detectors.operators import AbstractOperator
+from tomomak.util import precision
+
+
+class LineProjector(AbstractOperator):
+    """Lines of sight with the parameters of tomomak.detectors.detectors.line_intersect, calculated on the fly.
+
+    Line width and divergence are taken into account with n_rays sub-rays, uniformly distributed
+    over the line width at the detector origin and over the divergence angle.
+    Weight of the sub-ray segment in the cell is segment length times the local line width divided by n_rays,
+    so geometry approximates intersection area of the line with the cell (see line_intersect with calc_area=True).
+    If radius_dependence is True, weight is divided by 4 * pi * r^2, where r is distance from the origin
+    to the cell center. Geometry is broadcasted over the mesh axes, which are not in index.
+    Detectors are processed in chunks of chunk_size detectors by the thread pool.
+    Sparse matrix of each chunk is built during projection and is not stored.
+    Line parameters are traced in float64, geometry values have default dtype at the moment of creation
+    (see tomomak.util.precision), so float32 projector halves memory and bandwidth of the chunk matrices.
+
+    Args:
+        mesh(tomomak.main_structures.Mesh): mesh with 1D cartesian axes at index.
+        p1(ndarray): detector origins with shape (number of detectors, 2).
+        p2(ndarray): second points, characterizing central axis of each line, with same shape.
+            Lines end at these points.
+        width(float or ndarray): width of each line.
+        divergence(float or ndarray, optional): divergence of each line in Rad. Default: 0.
+        index(tuple of two ints, optional): axes of the detector plane. Default: (0, 1).
+        response(float or ndarray, optional): response of each detector. Default: 1.
+        radius_dependence(bool, optional): divide signal by 4 * pi * r^2. Default: True.
+        n_rays(int, optional): number of sub-rays per detector. Default: 5.
+        chunk_size(int, optional): number of detectors in one chunk. Default: 64.
+        n_threads(int, optional): number of threads. If None, number of CPUs is used. Default: None.
+    """
+
+    def __init__(self, mesh, p1, p2, width, divergence=0, index=(0, 1), response=1, radius_dependence=True,
+                 n_rays=5, chunk_size=64, n_threads=None):
+        self.index = tuple(index)
+        if len(self.index) != 2 or any(mesh.axes[i].dimension != 1 for i in self.index):
+            raise TypeError("Line projector works with two 1D cartesian axes only.")
+        self.edges = [np.asarray(mesh.axes[i].cell_edges1d, dtype=float) for i in self.index]
+        self.centers = [np.asarray(mesh.axes[i].coordinates, dtype=float) for i in self.index]
+        self._shape = tuple(mesh.shape)
+        self.p1 = np.atleast_2d(np.asarray(p1, dtype=float))
+        self.p2 = np.atleast_2d(np.asarray(p2, dtype=float))
+        if self.p1.shape != self.p2.shape or self.p1.shape[1] != 2:
+            raise ValueError("p1 and p2 should have shape (number of detectors, 2).")
+        n = self.p1.shape[0]
+        self.width = np.broadcast_to(np.asarray(width, dtype=float), (n,))
+        self.divergence = np.broadcast_to(np.asarray(divergence, dtype=float), (n,))
+        if np.any(self.divergence < 0) or np.any(self.divergence >= np.pi):
+            raise ValueError("Divergence should be >= 0 and < pi.")
+        self.response = np.broadcast_to(np.asarray(response, dtype=float), (n,))
+        self.radius_dependence = radius_dependence
+        self.n_rays = n_rays
+        self.chunk_size = chunk_size
+        self.n_threads = n_threads or os.cpu_count() or 1
+        self._dtype = precision.get_default_dtype()
+
+    @property
+    def shape(self):
+        return (self.p1.shape[0],) + self._shape
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def _plane_shape(self):
+        return tuple(self._shape[i] for i in self.index)
+
+    def project(self, solution):
+        plane = self._to_plane(solution).ravel()
+        return np.concatenate(self._map(lambda m: m @ plane))
+
+    def back_project(self, values):
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.floating):
+            values = values.astype(self._dtype)
+        size = int(np.prod(self._plane_shape))
+
+        def accumulate(chunks):
+            # one plane per thread, so memory doesn't grow with the number of chunks
+            plane = np.zeros(size, dtype=np.result_type(self._dtype, values))
+            for rows in chunks:
+                plane += self.chunk_matrix(rows).T @ values[rows]
+            return plane
+        chunks = self._chunks()
+        n_threads = max(1, min(self.n_threads, len(chunks)))
+        if n_threads == 1:
+            plane = accumulate(chunks)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(n_threads) as pool:
+                plane = functools.reduce(np.add, pool.map(accumulate, [chunks[i::n_threads]
+                                                                       for i in range(n_threads)]))
+        return self._from_plane(plane.reshape(self._plane_shape))
+
+    def toarray(self):
+        plane = np.concatenate(self._map(lambda m: m.toarray()))
+        res = plane.reshape((len(self),) + self._plane_shape)
+        other = [i for i in range(len(self._shape)) if i not in self.index]
+        res = res.reshape(res.shape + (1,) * len(other))
+        res = np.moveaxis(res, (1, 2), [i + 1 for i in self.index])
+        return np.array(np.broadcast_to(res, self.shape))
+
+    def row_square_sum(self):
+        other = int(np.prod([s for i, s in enumerate(self._shape) if i not in self.index]))
+        return np.concatenate(self._map(lambda m: np.asarray(
+            m.multiply(m).sum(axis=1, dtype=precision.accumulation_dtype)).ravel())) * other
+
+    def _take(self, rows):
+        res = copy.copy(self)
+        res.p1, res.p2 = self.p1[rows], self.p2[rows]
+        res.width, res.divergence, res.response = self.width[rows], self.divergence[rows], self.response[rows]
+        return res
+
+    def _to_plane(self, solution):
+        other = tuple(i for i in range(len(self._shape)) if i not in self.index)
+        x = np.sum(solution, axis=other) if other else np.asarray(solution)
+        # remaining axes are sorted, so transpose if index is not
+        return x.T if self.index[0] > self.index[1] else x
+
+    def _from_plane(self, plane):
+        if self.index[0] > self.index[1]:
+            plane = plane.T
+        shape = [1] * len(self._shape)
+        for i in self.index:
+            shape[i] = self._shape[i]
+        return np.array(np.broadcast_to(plane.reshape(shape), self._shape))
+
+    def _chunks(self):
+        n = len(self)
+        return [np.arange(i, min(i + self.chunk_size, n)) for i in range(0, n, self.chunk_size)]
+
+    def _map(self, func):
+        """Apply func to the sparse matrix of each chunk in the thread pool.
+        """
+        def task(rows):
+            return func(self.chunk_matrix(rows))
+        chunks = self._chunks()
+        if self.n_threads == 1 or len(chunks) < 2:
+            return [task(rows) for rows in chunks]
+        with concurrent.futures.ThreadPoolExecutor(self.n_threads) as pool:
+            return list(pool.map(task, chunks))
+
+    def chunk_matrix(self, rows):
+        """Calculate geometry of the given detectors over the detector plane.
+
+        Args:
+            rows(ndarray of ints): detector indexes.
+
+        Returns:
+            scipy.sparse.csr_matrix: matrix with shape (len(rows), number of cells in the plane) and dtype self.dtype.
+        """
+        shape = (len(rows), int(np.prod(self._plane_shape)))
+        ny = self._plane_shape[1]
+        # sub-rays of all detectors in the chunk
+        u = (np.arange(self.n_rays) + 0.5) / self.n_rays - 0.5
+        r = self.p2[rows] - self.p1[rows]
+        length = np.hypot(r[:, 0], r[:, 1])
+        valid = length > 0
+        direction = np.divide(r, length[:, np.newaxis], out=np.zeros_like(r), where=valid[:, np.newaxis])
+        normal = np.column_stack((-direction[:, 1], direction[:, 0]))
+        angle = np.multiply.outer(self.divergence[rows], u)
+        c, s = np.cos(angle), np.sin(angle)
+        d = np.stack((c * direction[:, 0, np.newaxis] - s * direction[:, 1, np.newaxis],
+                      s * direction[:, 0, np.newaxis] + c * direction[:, 1, np.newaxis]), axis=-1).reshape(-1, 2)
+        start = (self.p1[rows, np.newaxis] + np.multiply.outer(self.width[rows], u)[..., np.newaxis]
+                 * normal[:, np.newaxis]).reshape(-1, 2)
+        det = np.repeat(np.arange(len(rows)), self.n_rays)
+        length = np.where(valid, length, 0)[det]
+        t, ray, ix, iy, seg = _trace(start, d, length, self.edges[0], self.edges[1])
+        if not t.size:
+            return scipy.sparse.csr_matrix(shape, dtype=self._dtype)
+        det = det[ray]
+        spread = np.tan(self.divergence[rows] / 2)[det]
+        cells = ix * ny + iy
+        factor = seg * (self.width[rows][det] + 2 * t * spread) / self.n_rays * self.response[rows][det]
+        if self.radius_dependence:
+            origin = self.p1[rows][det]
+            r2 = (self.centers[0][ix] - origin[:, 0]) ** 2 + (self.centers[1][iy] - origin[:, 1]) ** 2
+            factor = factor / (4 * np.pi * r2)
+        return scipy.sparse.csr_matrix((factor.astype(self._dtype, copy=False), (det, cells)), shape=shape)
+
+
+def _trace(start, direction, length, x_edges, y_edges):
+    """Grid traversal of the rays. All rays are processed together.
+
+    Args:
+        start(ndarray): ray origins with shape (number of rays, 2).
+        direction(ndarray): unit direction vectors with same shape.
+        length(ndarray): length of each ray.
+        x_edges, y_edges(ndarray): cell edges along both axes.
+
+    Returns:
+        tuple: distance from the start to the middle of each segment, ray index, cell indexes along both axes
+            and length of each segment.
+    """
+    params = [np.zeros((length.size, 1)), length[:, np.newaxis]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for edges, k in ((x_edges, 0), (y_edges, 1)):
+            a = (edges[np.newaxis] - start[:, k, np.newaxis]) / direction[:, k, np.newaxis]
+            # crossings outside the ray give zero length segments
+            params.append(np.where((a > 0) & (a < length[:, np.newaxis]), a, length[:, np.newaxis]))
+    a = np.sort(np.concatenate(params, axis=1), axis=1)
+    mid = (a[:, :-1] + a[:, 1:]) / 2
+    seg = np.diff(a, axis=1)
+    ray = np.broadcast_to(np.arange(length.size)[:, np.newaxis], seg.shape)
+    nonzero = seg > 0
+    mid, seg, ray = mid[nonzero], seg[nonzero], ray[nonzero]
+    ix = np.searchsorted(x_edges, start[ray, 0] + mid * direction[ray, 0], side='right') - 1
+    iy = np.searchsorted(y_edges, start[ray, 1] + mid * direction[ray, 1], side='right') - 1
+    inside = (ix >= 0) & (ix < x_edges.size - 1) & (iy >= 0) & (iy < y_edges.size - 1)
+    return mid[inside], ray[inside], ix[inside], iy[inside], seg[inside]
@@ -1,24 +1,66 @@
 import numpy as np
 from scipy import interpolate
+import scipy.sparse
+from tomomak.detectors import operators
+from tomomak.util import backend
 
 
-def get_signal(solution, detector_geometry):
+def get_signal(solution, detector_geometry, channel_mask=None):
     """Get detector signals from known object and geometry.
 
     To find out about solution and detector_geometry see tomomak.model description.
+    Geometry may be given as operator (see tomomak.detectors.operators), scipy sparse matrix
+    with shape (number of detectors, number of cells) or array of any array API namespace
+    (see tomomak.util.backend). Solution is converted to the geometry dtype, e.g. float32
+    (see tomomak.util.precision).
+
+    Batch of solutions with shape (batch size, *solution shape) may be given (see tomomak.model.Model.batch_size).
+    In this case signals are calculated with one matrix-matrix product.
 
     Args:
         solution(ndarray): known solution.
-        detector_geometry(ndarray): known detector geometry.
+        detector_geometry(ndarray, AbstractOperator or sparse matrix): known detector geometry.
+        channel_mask(ndarray of bools, optional): used detectors, see tomomak.model.Model.channel_mask.
+            Signals of the disabled detectors are set to zero. Default: None.
 
     Returns:
-        ndarray: calculated signals.
+        ndarray: calculated signals. For the batch of solutions shape is (batch size, number of detectors).
 
     """
-    signal = np.zeros(detector_geometry.shape[0])
-    for i, ar in enumerate(detector_geometry):
-        signal[i] = get_signal_one_det(solution, ar)
-    return signal
+    solution = _geometry_dtype(solution, detector_geometry)
+    batch = solution.ndim == detector_geometry.ndim
+    if isinstance(detector_geometry, operators.AbstractOperator):
+        if batch:
+            res = np.stack([detector_geometry.project(s) for s in solution])
+        else:
+            res = detector_geometry.project(solution)
+    elif scipy.sparse.issparse(detector_geometry):
+        if batch:
+            res = (detector_geometry @ np.reshape(solution, (solution.shape[0], -1)).T).T
+        else:
+            res = detector_geometry @ np.reshape(solution, -1)
+    else:
+        xp = backend.namespace(detector_geometry, solution)
+        if batch:
+            # geometry is not transposed, so it is not copied
+            cells = list(range(1, solution.ndim))
+            res = xp.tensordot(detector_geometry, solution, axes=(cells, cells)).T
+        else:
+            res = xp.tensordot(detector_geometry, solution, axes=solution.ndim)
+    if channel_mask is not None:
+        backend.set_zero(res, ~np.asarray(channel_mask, dtype=bool))
+    return res
+
+
+def _geometry_dtype(ar, detector_geometry):
+    """Cast array to the namespace and floating dtype of the geometry, so that large geometry array
+    is not converted to higher precision during multiplication.
+    """
+    xp = backend.namespace(detector_geometry)
+    ar = backend.asarray(ar, xp)
+    if backend.is_floating(detector_geometry) and ar.dtype != detector_geometry.dtype:
+        return backend.astype(ar, detector_geometry.dtype)
+    return ar
 
 
 def get_signal_one_det(solution, one_detector_geometry):
@@ -36,19 +78,76 @@ def get_signal_one_det(solution, one_detector_geometry):
     return np.sum(one_detector_geometry * solution)
 
 
-def add_noise(signal, st_div):
-    """Add gaussian noise to signal.
+def back_project(values, detector_geometry):
+    """Get sum of detector geometries, weighted by given values (transposed projection).
+
+    To find out about detector_geometry see tomomak.model description.
+
+    Args:
+        values(ndarray): 1D array of value for each detector, e.g. signal or residual,
+            or 2D array with shape (batch size, number of detectors) for the batch of solutions.
+        detector_geometry(ndarray, AbstractOperator or sparse matrix): known detector geometry.
+
+    Returns:
+        ndarray: array of solution shape (or (batch size, *solution shape)).
+            For sparse geometry solution is 1D.
+    """
+    values = _geometry_dtype(values, detector_geometry)
+    if isinstance(detector_geometry, operators.AbstractOperator):
+        if values.ndim == 2:
+            return np.stack([detector_geometry.back_project(v) for v in values])
+        return detector_geometry.back_project(values)
+    if scipy.sparse.issparse(detector_geometry):
+        if values.ndim == 2:
+            return (detector_geometry.T @ values.T).T
+        return detector_geometry.T @ values
+    return backend.namespace(detector_geometry, values).tensordot(values, detector_geometry, axes=1)
+
+
+def operator_norm(detector_geometry, n_iter=100, tol=1e-6, seed=0):
+    """Estimate spectral norm (largest singular value) of the projection operator using power iteration.
+
+    Args:
+        detector_geometry(ndarray): known detector geometry.
+        n_iter(int, optional): maximum number of iterations. Default: 100.
+        tol(float, optional): relative tolerance of the norm estimation. Default: 1e-6.
+        seed(int, optional): random generator seed for the initial vector. Default: 0.
+
+    Returns:
+        float: operator norm.
+    """
+    v = np.random.default_rng(seed).random(detector_geometry.shape[1:])
+    v /= np.linalg.norm(v)
+    norm = 0
+    for _ in range(n_iter):
+        w = back_project(get_signal(v, detector_geometry), detector_geometry)
+        new_norm = np.sqrt(np.linalg.norm(w))
+        if new_norm == 0:
+            return 0.
+        v = w / new_norm ** 2
+        if abs(new_norm - norm) <= tol * new_norm:
+            break
+        norm = new_norm
+    return new_norm
+
+
+def add_noise(signal, st_div, rng=None):
+    """Add gaussian noise to signal. Signal is changed in place.
+
+    Standard deviation of the noise is proportional to the absolute value of each signal.
+    To generate many noisy realizations at once see tomomak.solver.uncertainty.noisy_signals.
 
     Args:
-        signal(float): original signal.
+        signal(ndarray): original signal.
         st_div(float): Standard deviation in percent.
+        rng(numpy.random.Generator, optional): random generator. If None, numpy.random module is used,
+            so numpy.random.seed() makes noise reproducible. Default: None.
 
     Returns:
         ndarray: numpy array of signal with noise.
     """
-    st_div = st_div / 100
-    for x in np.nditer(signal, op_flags=['readwrite']):
-        x[...] = np.random.normal(x, st_div * x)
+    rng = np.random if rng is None else rng
+    signal[...] = rng.normal(signal, st_div / 100 * np.abs(signal))
     return signal
 
 
@@ -0,0 +1,4 @@
+from tomomak.iterators.acceleration import Accelerated
+
+
+__all__ = ['abstract_iterator', 'acceleration', 'algebraic', 'fista', 'krylov', 'ml', 'statistics', 'Accelerated']
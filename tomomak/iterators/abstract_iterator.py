@@ -1,8 +1,81 @@
 from abc import ABC, abstractmethod
+import copy
 import warnings
 import numbers
 import numpy as np
 import matplotlib.pyplot as plt
+from tomomak.util import backend
+
+
+class IteratorState:
+    """Per-solve state of an iterator.
+
+    State is created by init() and is passed to step() and finalize() by Solver,
+    so that one iterator object may serve several simultaneous reconstructions.
+    Each iterator stores its own attributes, e.g. alpha or geometry normalizations.
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def call_with_state(method, state, *args, **kwargs):
+    """Call step or finalize method, passing per-solve state if the object has it.
+
+    Used by Solver and by the wrappers of iterators and constraints, e.g. tomomak.constraints.schedule.Schedule.
+
+    Args:
+        method(callable): step or finalize method.
+        state(IteratorState): state, created by init(). None if object has no state.
+        *args, **kwargs: method arguments.
+
+    Returns:
+        result of the method.
+    """
+    if state is None:
+        return method(*args, **kwargs)
+    return method(*args, state=state, **kwargs)
+
+
+def solution_changed(model, x):
+    """Check if model solution differs from the private copy x of the iterator.
+
+    Constraints change solution in place (see tomomak.constraints.basic.writable_solution), so identity
+    of the solution array can't be used to detect changes. Iterators, which keep information about
+    current solution, e.g. residual or momentum, give copy of x to the model and compare content.
+
+    Args:
+        model(tomomak.model.Model): model.
+        x(ndarray): copy of the solution, kept by iterator.
+
+    Returns:
+        bool: True if solution was changed.
+    """
+    solution = model.solution
+    if solution is x:
+        return False
+    if tuple(solution.shape) != tuple(x.shape):
+        return True
+    xp = backend.namespace(solution, x)
+    return not bool(xp.all(solution == x))
+
+
+def solution_shape(model):
+    """Shape of the initial solution, created by iterator. Batch axis is added if model.batch_size is not None.
+    """
+    if model.batch_size is None:
+        return model.shape
+    return (model.batch_size,) + tuple(model.shape)
+
+
+def expand_batch(model):
+    """Repeat single initial solution for each signal in the batch (see tomomak.model.Model.batch_size).
+    """
+    batch = model.batch_size
+    if batch is not None and model.solution is not None and model.solution.ndim < model.detector_geometry.ndim:
+        xp = backend.namespace(model.solution)
+        model.solution = xp.asarray(xp.broadcast_to(model.solution, (batch,) + tuple(model.solution.shape)),
+                                    copy=True)
 
 
 class AbstractSolverClass(ABC):
@@ -11,7 +84,10 @@ class AbstractSolverClass(ABC):
 
     @abstractmethod
     def init(self, model, steps, *args, **kwargs):
-        """
+        """Prepare object for the reconstruction.
+
+        If init returns state object (see IteratorState), Solver passes it to step() and finalize()
+        as state argument. Objects, which don't need per-solve state, return None.
 
         :return:
         """
@@ -27,7 +103,7 @@ class AbstractSolverClass(ABC):
 
     @abstractmethod
     def step(self, model, step_num):
-        """Use this (alpha = super().step(model, step_num)) to get alpha/
+        """Use this (alpha = self.get_alpha(model, step_num, state)) to get alpha/
 
         Args:
             model:
@@ -50,40 +126,77 @@ class AbstractSolverClass(ABC):
 
 class AbstractIterator(AbstractSolverClass):
     """
+    Attributes:
+        supports_batch(bool): True if iterator reconstructs batch of solutions (see tomomak.model.Model.batch_size).
     """
+    supports_batch = False
+
     def __init__(self, alpha=0.1, alpha_calc=None):
         self.alpha = alpha
         self.alpha_calc = alpha_calc
-        self._alpha = None
 
     @abstractmethod
     def init(self, model, steps, *args, **kwargs): ###NEED test for this
-        """Use this (super().init(model, steps, *args, **kwargs)) to enable adding list of alphas.
+        """Use this (state = super().init(model, steps, *args, **kwargs)) to enable adding list of alphas.
+
+        Iterator object itself is not changed: all data, needed during reconstruction, is stored in the returned state.
+        alpha_calc is copied for each solve, so calculators, which keep data in their attributes, may also be used
+        in concurrent reconstructions. If alpha_calc.init() returns state, it is passed to alpha_calc.step().
+
+        Returns:
+            IteratorState: per-solve state with alpha attribute.
         """
+        alpha = None
+        alpha_calc = alpha_calc_state = None
         if self.alpha_calc is not None:
             if self.alpha is not None:
-                self._alpha = None
                 warnings.warn("Since alpha_calc is defined in {}, alpha is Ignored.".format(self))
-            self.alpha_calc.init(model, steps, *args, **kwargs)
+            alpha_calc = copy.deepcopy(self.alpha_calc)
+            alpha_calc_state = alpha_calc.init(model, steps, *args, **kwargs)
         else:
             if isinstance(self.alpha, numbers.Number):
-                self._alpha = np.full(steps, self.alpha)
+                alpha = np.full(steps, self.alpha)
             else:
-                self._alpha = self.alpha
-            if len(self._alpha) < steps:
+                alpha = self.alpha
+            if len(alpha) < steps:
                 raise ValueError("Alpha len in {} should be equal or greater than number of steps.".format(self))
+        return IteratorState(alpha=alpha, alpha_calc=alpha_calc, alpha_calc_state=alpha_calc_state)
+
+    def precompute(self, model):
+        """Calculate solution-independent quantities, needed by iterator, e.g. geometry normalizations.
+
+        Quantities should be stored using model.derived, so they are calculated once for given detector_geometry
+        and may be published together with geometry (see tomomak.util.shared).
+        Default implementation does nothing.
         """
 
-        :return:
+    @abstractmethod
+    def step(self, model, step_num, state):
+        """Perform one iteration.
+
+        Args:
+            model(tomomak.Model): model to work with.
+            step_num(int): step number.
+            state(IteratorState): per-solve state, returned by init().
+        """
+
+    @abstractmethod
+    def finalize(self, model, state):
+        """Finish reconstruction.
+
+        Args:
+            model(tomomak.Model): model to work with.
+            state(IteratorState): per-solve state, returned by init().
         """
 
-    def get_alpha(self, model, step_num):
+    def get_alpha(self, model, step_num, state):
         """Use this to get alpha.
         """
-        if self.alpha_calc is not None:
-            alpha = self.alpha_calc.step(model=model)
+        alpha_calc = getattr(state, 'alpha_calc', None)
+        if alpha_calc is not None:
+            alpha = call_with_state(alpha_calc.step, state.alpha_calc_state, model=model)
         else:
-            alpha = self._alpha[step_num]
+            alpha = state.alpha[step_num]
         return alpha
 
 
@@ -0,0 +1,150 @@
+from . import abstract_iterator
+import numpy as np
+
+
+class Accelerated(abstract_iterator.AbstractIterator):
+    """Wrapper, accelerating convergence of any iterator or chain of iterators and constraints.
+
+    Step of the wrapped objects is considered as fixed-point map x -> G(x).
+    Instead of x_(k+1) = G(x_k) the next solution is extrapolated using last memory iterates.
+
+    Methods:
+        'anderson': Anderson mixing, see H. F. Walker and P. Ni, "Anderson acceleration for fixed-point iterations".
+        'rre': reduced rank extrapolation, which is performed every memory + 1 steps.
+            See A. Sidi, "Vector extrapolation methods with applications".
+
+    Safeguards: if the fixed-point residual |G(x) - x| grows more than safeguard times, history is cleared.
+    If extrapolated solution is not finite or has negative values while plain step solution is non-negative
+    (e.g. in ML method), plain step is used. Number of such fallbacks is stored in the state.
+
+    History is stored in the preallocated buffers, so the overhead is O(memory x cells) per step.
+
+    Args:
+        iterator(tomomak iterator or constraint, or list of them): wrapped objects, applied one by one at each step.
+        memory(int, optional): number of stored iterates. Default: 5.
+        method(str, optional): 'anderson' or 'rre'. Default: 'anderson'.
+        safeguard(float, optional): allowed growth of the fixed-point residual. Default: 1.
+        regularization(float, optional): relative Tikhonov regularization of the least squares problem.
+            Default: 1e-10.
+    """
+    methods = ('anderson', 'rre')
+
+    def __init__(self, iterator, memory=5, method='anderson', safeguard=1., regularization=1e-10):
+        super().__init__(None, None)
+        if method not in self.methods:
+            raise ValueError("Method {} is not supported. Supported methods: {}.".format(method, self.methods))
+        if isinstance(iterator, (list, tuple)):
+            self.iterators = list(iterator)
+        else:
+            self.iterators = [iterator]
+        self.memory = memory
+        self.method = method
+        self.safeguard = safeguard
+        self.regularization = regularization
+
+    def init(self, model, steps, *args, **kwargs):
+        states = [it.init(model, steps, *args, **kwargs) for it in self.iterators]
+        size = model.solution.size
+        m = self.memory
+        state = abstract_iterator.IteratorState(states=states, shape=model.solution.shape, fallbacks=0,
+                                                x=np.zeros(size), f_prev=np.zeros(size), g_prev=np.zeros(size),
+                                                norm_prev=None, count=0, position=0)
+        if self.method == 'anderson':
+            state.df = np.zeros((m, size))
+            state.dg = np.zeros((m, size))
+            state.gram = np.zeros((m, m))
+        else:
+            state.iterates = np.zeros((m + 1, size))
+        return state
+
+    def finalize(self, model, state):
+        for it, s in zip(self.iterators, state.states):
+            abstract_iterator.call_with_state(it.finalize, s, model)
+
+    def precompute(self, model):
+        for it in self.iterators:
+            if hasattr(it, 'precompute'):
+                it.precompute(model)
+
+    def __str__(self):
+        return "{} accelerated with {} (memory {})".format(', '.join(str(it) for it in self.iterators),
+                                                         self.method, self.memory)
+
+    def step(self, model, step_num, state):
+        state.x[...] = model.solution.ravel()
+        for it, s in zip(self.iterators, state.states):
+            abstract_iterator.call_with_state(it.step, s, model=model, step_num=step_num)
+        g = model.solution.ravel()
+        if self.method == 'anderson':
+            new = self._anderson(g, state)
+        else:
+            new = self._rre(g, state)
+        if new is not g:
+            if not np.all(np.isfinite(new)) or (np.any(new < 0) and np.all(g >= 0)):
+                state.fallbacks += 1
+                state.count = 0
+                new = g
+        model.solution = new.reshape(state.shape)
+
+    def _restart_needed(self, f, state):
+        norm = np.linalg.norm(f)
+        restart = state.norm_prev is not None and norm > self.safeguard * state.norm_prev
+        state.norm_prev = norm
+        return restart
+
+    def _anderson(self, g, state):
+        f = g - state.x
+        has_previous = state.norm_prev is not None
+        if self._restart_needed(f, state):
+            state.count = 0
+        elif has_previous:
+            j = state.position
+            np.subtract(f, state.f_prev, out=state.df[j])
+            np.subtract(g, state.g_prev, out=state.dg[j])
+            state.count = min(state.count + 1, self.memory)
+            state.position = (j + 1) % self.memory
+            active = _active(state.count, state.position, self.memory)
+            row = state.df[active] @ state.df[j]
+            state.gram[active, j] = row
+            state.gram[j, active] = row
+        state.f_prev[...] = f
+        state.g_prev[...] = g
+        if state.count == 0:
+            state.position = 0
+            return g
+        active = _active(state.count, state.position, self.memory)
+        gram = state.gram[np.ix_(active, active)]
+        gram = gram + self.regularization * np.trace(gram) * np.eye(len(active))
+        try:
+            gamma = np.linalg.solve(gram, state.df[active] @ f)
+        except np.linalg.LinAlgError:
+            state.count = 0
+            return g
+        return g - gamma @ state.dg[active]
+
+    def _rre(self, g, state):
+        f = g - state.x
+        if self._restart_needed(f, state):
+            state.count = 0
+        state.iterates[state.count] = g
+        state.count += 1
+        if state.count <= self.memory:
+            return g
+        state.count = 0
+        u = np.diff(state.iterates, axis=0)
+        gram = u @ u.T
+        gram += self.regularization * np.trace(gram) * np.eye(self.memory)
+        try:
+            gamma = np.linalg.solve(gram, np.ones(self.memory))
+        except np.linalg.LinAlgError:
+            return g
+        gamma /= np.sum(gamma)
+        return gamma @ state.iterates[:-1]
+
+
+def _active(count, position, memory):
+    """Indexes of filled columns of the circular history buffer.
+    """
+    if count < memory:
+        return np.arange(position - count, position) % memory
+    return np.arange(memory)
@@ -1,52 +1,137 @@
 from . import abstract_iterator
+import warnings
 import numpy as np
-from tomomak.detectors import signal
+import scipy.sparse
+from tomomak.detectors import signal, operators
+from tomomak.util import backend, precision
+
+
+def _row_square_sum(detector_geometry):
+    if isinstance(detector_geometry, operators.AbstractOperator):
+        return detector_geometry.row_square_sum()
+    if scipy.sparse.issparse(detector_geometry):
+        g = scipy.sparse.csr_matrix(detector_geometry, dtype=precision.accumulation_dtype)
+        return np.asarray(g.multiply(g).sum(axis=1)).ravel()
+    xp = backend.namespace(detector_geometry)
+    return xp.sum(detector_geometry * detector_geometry, axis=tuple(range(1, detector_geometry.ndim)),
+                  dtype=backend.dtype(xp, precision.accumulation_dtype))
 
 
 class ART(abstract_iterator.AbstractIterator):
     """A set of iterative algebraic algorithms for image reconstruction
     see E.F. Oliveira et. al., "Comparison among tomographic reconstruction algorithms with limited data".
     in the case of ART correction is applied after calculations of single ray
+    If geometry is an operator (see tomomak.detectors.operators), geometry of each ray is obtained by indexing.
+    Operators without efficient indexing calculate it with full back projection, so ART is slow for them.
     """
     iter_types = ('ART', 'MART')
 
     def __init__(self, alpha=0.1, alpha_calc=None, iter_type='ART'):
         super().__init__(alpha, alpha_calc)
-        self.shape = None
-        self.wi = None
         if iter_type not in self.iter_types:
             raise ValueError(" Iterator type {} is not supported. Supported iterator types: {}."
                              .format(iter_type, self.iter_types))
         self.iter_type = self.iter_types.index(iter_type)
 
     def init(self, model, steps, *args, **kwargs):
-        super().init(model, steps, *args, **kwargs)
+        state = super().init(model, steps, *args, **kwargs)
         if model.solution is None:
-            shape = model.mesh.shape
-            model.solution = np.zeros(shape)
-        self.shape = model.solution.shape
-        self.wi = np.sum(np.square(model.detector_geometry), axis=tuple(range(1, model.detector_geometry.ndim)))
+            shape = abstract_iterator.solution_shape(model)
+            xp = backend.namespace(model.detector_geometry)
+            model.solution = xp.zeros(shape, dtype=backend.dtype(xp, model.dtype))
+        abstract_iterator.expand_batch(model)
+        state.shape = model.solution.shape
+        state.wi = self.precompute(model)
+        state.rows = model.active_channels
+        if state.rows is None:
+            state.rows = range(model.detector_geometry.shape[0])
+        return state
+
+    def precompute(self, model):
+        """Squared norm of each detector geometry row.
+        """
+        return model.derived('row_square_sum', _row_square_sum)
 
-    def finalize(self, model):
+    def finalize(self, model, state):
         pass
 
     def __str__(self):
         return self.iter_types[self.iter_type]
 
-    def step(self, model, step_num):
-        alpha = self.get_alpha(model, step_num)
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
         # multiplication
-        for i in range(model.detector_signal.shape[0]):
+        for i in state.rows:
             y = signal.get_signal_one_det(model.solution, model.detector_geometry[i])
             dp = model.detector_signal[i] - y
-            if self.wi[i] != 0:
-                ai = dp / self.wi[i]
+            if state.wi[i] != 0:
+                ai = dp / state.wi[i]
             else:
                 ai = 0
             if self.iter_type == 1:  # MART
                 if model.detector_signal[i] != 0:
                     ai = ai / np.abs(model.detector_signal.y[i])
-            model.solution = model.solution + ai * model.detector_geometry[i] * alpha
+            model.solution = (model.solution + ai * model.detector_geometry[i] * alpha).astype(model.dtype, copy=False)
+
+
+class RandomizedKaczmarz(ART):
+    """Randomized Kaczmarz method: ART with random order of detectors.
+
+    see T. Strohmer and R. Vershynin, "A randomized Kaczmarz algorithm with exponential convergence".
+    At each step n_rows detectors are sampled with probability, proportional to squared norm of the detector geometry.
+    Random order avoids slow convergence of the cyclic ART when neighbouring lines of sight are nearly parallel.
+    If batch_size > 1, rows are processed in mini-batches and the averaged correction of the batch is applied.
+
+    Args:
+        alpha(float, optional): relaxation parameter. Default: 1.
+        alpha_calc(optional): see tomomak.iterators.abstract_iterator.AbstractIterator.
+        n_rows(int, optional): number of sampled rows per step. If None, number of detectors is used,
+            so one step costs the same as one ART step. Default: None.
+        batch_size(int, optional): number of rows, processed together. Default: 1.
+        seed(int, optional): seed of the random generator. Each solve starts with the same seed,
+            so results are reproducible. Default: None.
+    """
+    iter_types = ('RK',)
+
+    def __init__(self, alpha=1, alpha_calc=None, n_rows=None, batch_size=1, seed=None):
+        super().__init__(alpha, alpha_calc, 'RK')
+        self.n_rows = n_rows
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def __str__(self):
+        return 'Randomized Kaczmarz'
+
+    def init(self, model, steps, *args, **kwargs):
+        state = super().init(model, steps, *args, **kwargs)
+        weights = model.masked_residual(np.array(state.wi, dtype=float))
+        total = np.sum(weights)
+        if total == 0:
+            raise ValueError("All used detectors have zero geometry.")
+        state.probabilities = weights / total
+        state.inverse_wi = np.divide(1, state.wi, out=np.zeros(state.wi.shape), where=state.wi != 0)
+        state.operator = model.detector_geometry.reshape(model.detector_geometry.shape[0], -1)
+        state.rng = np.random.default_rng(self.seed)
+        return state
+
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
+        det_num = state.operator.shape[0]
+        n_rows = det_num if self.n_rows is None else self.n_rows
+        rows = state.rng.choice(det_num, size=n_rows, p=state.probabilities)
+        x = model.solution.reshape(-1).astype(model.dtype)
+        y = model.detector_signal
+        g = state.operator
+        if self.batch_size == 1:
+            for i in rows:
+                x += (alpha * (y[i] - g[i] @ x) * state.inverse_wi[i]) * g[i]
+        else:
+            for k in range(0, n_rows, self.batch_size):
+                batch = rows[k:k + self.batch_size]
+                gb = g[batch]
+                a = (y[batch] - gb @ x) * state.inverse_wi[batch]
+                x += alpha / len(batch) * (gb.T @ a.astype(x.dtype, copy=False))
+        model.solution = x.reshape(state.shape)
 
 
 class SIRT(ART):
@@ -54,31 +139,165 @@ class SIRT(ART):
         see E.F. Oliveira et. al., "Comparison among tomographic reconstruction algorithms with limited data."
         in case of SIRT averaged correction is applied at the end of iteration.
         In the case of several projections in SIRT averaged correction is applied after iteration over each slide
+
+        Slices (blocks of detectors) and their normalizations are calculated once in init().
+        Corrections are calculated as matrix-vector products with flattened detector geometry.
+        If sparse is True, geometry blocks are converted to scipy CSR matrices, which is faster
+        for the line-of-sight geometries, since each line intersects only small part of the cells.
+        Prepared blocks are cached for given geometry (see tomomak.model.Model.derived).
+        If geometry is an operator (see tomomak.detectors.operators), blocks are applied with its
+        projection and back projection, so dense geometry is not created. Operators without efficient
+        detector selection (see tomomak.detectors.operators.RowSubset) calculate full projection and
+        back projection for each block, so n_slices > 1 multiplies cost of the step.
+        Geometry may also be scipy sparse matrix or array of any array API namespace
+        (see tomomak.util.backend).
+        Batch of solutions (see tomomak.model.Model.batch_size) is reconstructed together: solutions are columns
+        of the matrix, so each correction is one matrix-matrix product.
         """
     iter_types = ('SIRT', 'SMART')
+    supports_batch = True
 
-    def __init__(self, alpha=0.1, alpha_calc=None, iter_type='SIRT', n_slices=1):
+    def __init__(self, alpha=0.1, alpha_calc=None, iter_type='SIRT', n_slices=1, sparse=False):
         super().__init__(alpha, alpha_calc, iter_type)
         self.n_slices = n_slices
+        self.sparse = sparse
 
-    def step(self, model, step_num):
-        alpha = self.get_alpha(model, step_num)
-        # multiplication
-        det_num = model.detector_signal.shape[0]
-        for i in range(self.n_slices):
-            # get slice
-            # ############## may be speeded up if all slices are calc. once out of for cycle
-            i1 = int(i * np.ceil(det_num / self.n_slices))
-            i2 = int(min((i + 1) * np.ceil(det_num / self.n_slices), det_num))
-            w_slice = model.detector_geometry[i1:i2]
-            wi_slice = self.wi[i1:i2]
-            y_slice = model.detector_signal[i1:i2]
-            # calculating  correction
-            p = signal.get_signal(model.solution, w_slice)
-            dp = y_slice - p
-            a = np.divide(dp, wi_slice, out=np.zeros_like(dp), where=wi_slice != 0)
+    def init(self, model, steps, *args, **kwargs):
+        state = super().init(model, steps, *args, **kwargs)
+        det_num = model.detector_geometry.shape[0]
+        state.blocks = _blocks(det_num, self.n_slices)
+        state.operators = self._operators(model)
+        xp = backend.namespace(model.detector_geometry)
+        state.row_weights = [backend.asarray(w, xp) for w in self._row_weights(model, state)]
+        state.signal = backend.asarray(model.detector_signal, xp, backend.dtype(xp, float))
+        state.batch = model.batch_size
+        if state.batch is not None:
+            # columns of the signal and solution matrices correspond to the solutions in the batch
+            state.row_weights = [xp.reshape(w, (-1, 1)) for w in state.row_weights]
+            state.signal = xp.reshape(state.signal, (-1, det_num)).T
+        state.solution = backend.asarray(model.solution, xp)
+        state.dtype = backend.dtype(xp, model.dtype)
+        return state
+
+    def _operators(self, model):
+        """Flattened geometry of each block.
+        """
+        n_slices = self.n_slices
+        geometry = model.detector_geometry
+        if isinstance(geometry, operators.AbstractOperator):
+            blocks = [geometry[i1:i2] for i1, i2 in _blocks(geometry.shape[0], n_slices)]
+            if n_slices > 1 and any(isinstance(g, operators.RowSubset) for g in blocks):
+                warnings.warn("{} can't select detectors efficiently, so each of {} slices uses full projection "
+                              "and back projection. Use n_slices=1 or dense geometry."
+                              .format(type(geometry).__name__, n_slices))
+            return [g.linear_operator() for g in blocks]
+        if scipy.sparse.issparse(geometry):
+            g = scipy.sparse.csr_matrix(geometry)
+            return [g[i1:i2] for i1, i2 in _blocks(g.shape[0], n_slices)]
+        if not self.sparse:
+            return _flat_blocks(geometry, n_slices)
 
+        def csr_blocks(geometry):
+            g = geometry.reshape(geometry.shape[0], -1)
+            return [scipy.sparse.csr_matrix(g[i1:i2]) for i1, i2 in _blocks(g.shape[0], n_slices)]
+        return model.derived('csr_blocks_{}'.format(n_slices), csr_blocks)
+
+    def _row_weights(self, model, state):
+        """Weight of each detector residual in the correction. Weights of the disabled channels are zero.
+        """
+        res = []
+        mask = model.channel_mask
+        row_square_sum = backend.to_numpy(state.wi)
+        for i1, i2 in state.blocks:
+            wi = row_square_sum[i1:i2]
+            w = np.divide(1, wi, out=np.zeros(wi.shape), where=wi != 0)
+            if mask is None:
+                res.append(w / (i2 - i1))
+            else:
+                res.append(w * mask[i1:i2] / max(np.count_nonzero(mask[i1:i2]), 1))
+        return res
+
+    def step(self, model, step_num, state):
+        alpha = float(self.get_alpha(model, step_num, state))
+        xp = backend.namespace(state.signal)
+        if model.solution is not state.solution:
+            state.solution = backend.asarray(model.solution, xp)
+        if state.batch is None:
+            x = backend.astype(xp.reshape(state.solution, (-1,)), state.dtype)
+        else:
+            x = backend.astype(xp.reshape(state.solution, (state.batch, -1)).T, state.dtype)
+        for (i1, i2), g, w in zip(state.blocks, state.operators, state.row_weights):
+            y_slice = state.signal[i1:i2, ...]
+            # calculating  correction
+            a = (y_slice - g @ x) * w
             if self.iter_type == 1:  # SMART
-                a = np.divide(a, np.abs(y_slice), out=np.zeros_like(a), where=y_slice > 1E-20)
-            correction = alpha / (i2 - i1) * np.sum(np.multiply(np.moveaxis(w_slice, 0, -1), a), axis=-1)
-            model.solution = model.solution + correction
+                a = backend.divide(a, xp.abs(y_slice), where=y_slice > 1E-20)
+            # geometry block is not converted to float64
+            x = x + alpha * (g.T @ backend.astype(a, x.dtype))
+        state.solution = xp.reshape(x if state.batch is None else x.T, state.shape)
+        model.solution = state.solution
+
+
+class CAV(SIRT):
+    """Component averaging and block-iterative component averaging algorithms.
+
+    see Y. Censor et. al., "Component averaging: an efficient iterative parallel algorithm
+    for large and sparse unstructured problems" and "BICAV: a block-iterative parallel algorithm
+    for sparse systems with pixel-related weighting".
+    Residual of each detector is normalized by sum_j (s_j * w_ij^2), where s_j is number of detectors
+    in the block, which see cell j. Algorithm is CAV if n_slices = 1 and BICAV otherwise.
+    For the sparse geometry convergence is much faster than in SIRT, so alpha ~ 1 is usually used.
+    """
+    iter_types = ('CAV',)
+
+    def __init__(self, alpha=1, alpha_calc=None, n_slices=1, sparse=False):
+        super().__init__(alpha, alpha_calc, 'CAV', n_slices, sparse)
+
+    def __str__(self):
+        if self.n_slices == 1:
+            return 'CAV'
+        return 'BICAV'
+
+    def _row_weights(self, model, state):
+        n_slices = self.n_slices
+
+        def cav_weights(geometry):
+            if scipy.sparse.issparse(geometry):
+                g = scipy.sparse.csr_matrix(geometry)
+                blocks = [g[i1:i2] for i1, i2 in _blocks(g.shape[0], n_slices)]
+            else:
+                blocks = _flat_blocks(geometry, n_slices)
+            res = []
+            for block in blocks:
+                if scipy.sparse.issparse(block):
+                    s = np.asarray((block != 0).sum(axis=0)).ravel()
+                    norm = block.multiply(block) @ s
+                else:
+                    xp = backend.namespace(block)
+                    s = xp.astype(xp.count_nonzero(block, axis=0), backend.dtype(xp, precision.accumulation_dtype))
+                    norm = (block * block) @ s
+                res.append(backend.divide(1., norm))
+            return res
+        res = model.derived('cav_weights_{}'.format(n_slices), cav_weights)
+        mask = model.channel_mask
+        if mask is not None:
+            # cell counts s_j still include disabled channels, which only makes steps slightly more conservative
+            xp = backend.namespace(*res)
+            res = [xp.where(backend.asarray(mask[i1:i2], xp), w, xp.zeros_like(w))
+                   for (i1, i2), w in zip(state.blocks, res)]
+        return res
+
+
+def _flat_blocks(geometry, n_slices):
+    """Flattened dense geometry of each slice.
+    """
+    xp = backend.namespace(geometry)
+    g = xp.reshape(geometry, (geometry.shape[0], -1))
+    return [g[i1:i2, :] for i1, i2 in _blocks(g.shape[0], n_slices)]
+
+
+def _blocks(det_num, n_slices):
+    """Detector index ranges of each non-empty slice.
+    """
+    size = int(np.ceil(det_num / n_slices))
+    return [(i * size, min((i + 1) * size, det_num)) for i in range(n_slices) if i * size < det_num]
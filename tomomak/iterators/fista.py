@@ -0,0 +1,76 @@
+from . import abstract_iterator
+import numpy as np
+from tomomak.detectors import signal
+
+
+def _operator_norm(detector_geometry):
+    return signal.operator_norm(detector_geometry)
+
+
+class FISTA(abstract_iterator.AbstractIterator):
+    """Fast iterative shrinkage-thresholding algorithm: accelerated proximal gradient method for the least squares.
+
+    Minimizes 0.5 * ||detector_geometry * solution - detector_signal||^2 + sum of regularization functions,
+    given by their proximal operators (see tomomak.constraints.proximal and tomomak.constraints.basic.Positive).
+    If several operators are given, they are applied one by one.
+    see A. Beck and M. Teboulle, "A fast iterative shrinkage-thresholding algorithm for linear inverse problems".
+    Adaptive restart of the momentum is performed with the gradient scheme,
+    see B. O'Donoghue and E. Candes, "Adaptive restart for accelerated gradient schemes".
+    Step size is alpha / L, where L is squared norm of the projection operator, estimated with power iteration.
+    The estimation is cached for given geometry, so alpha=1 is a safe choice.
+    Norm of the full geometry is used for the masked models (see tomomak.model.Model.channel_mask), so step is still safe.
+    If solution is changed between steps, e.g. by constraints (also in place), momentum is restarted
+    from the new solution. Constraints may also be given as prox, then they are a part of the proximal step
+    and momentum is kept.
+    """
+
+    def __init__(self, prox=(), alpha=1, alpha_calc=None, restart=True):
+        super().__init__(alpha, alpha_calc)
+        self.prox = list(prox)
+        self.restart = restart
+
+    def init(self, model, steps, *args, **kwargs):
+        state = super().init(model, steps, *args, **kwargs)
+        if model.solution is None:
+            model.solution = np.zeros(model.shape, dtype=model.dtype)
+        norm = self.precompute(model)
+        state.lipschitz = norm ** 2
+        state.x = np.array(model.solution)
+        state.y = state.x
+        state.t = 1
+        state.restarts = 0
+        return state
+
+    def precompute(self, model):
+        """Norm of the projection operator.
+        """
+        return model.derived('operator_norm', _operator_norm)
+
+    def finalize(self, model, state):
+        pass
+
+    def __str__(self):
+        return "FISTA"
+
+    def step(self, model, step_num, state):
+        alpha = self.get_alpha(model, step_num, state)
+        if abstract_iterator.solution_changed(model, state.x):
+            state.x = state.y = np.array(model.solution)
+            state.t = 1
+        step = alpha / state.lipschitz if state.lipschitz else 0
+        residual = signal.get_signal(state.y, model.detector_geometry) - model.detector_signal
+        model.masked_residual(residual)
+        x_new = (state.y - step * signal.back_project(residual, model.detector_geometry)).astype(model.dtype,
+                                                                                                 copy=False)
+        for p in self.prox:
+            x_new = p.prox(x_new, step, model)
+        t = state.t
+        if self.restart and np.vdot(state.y - x_new, x_new - state.x) > 0:
+            t = 1
+            state.restarts += 1
+        t_new = (1 + np.sqrt(1 + 4 * t ** 2)) / 2
+        state.y = (x_new + (t - 1) / t_new * (x_new - state.x)).astype(model.dtype, copy=False)
+        state.x = x_new
+        state.t = t_new
+        # model gets a copy, so in-place changes by constraints are detected
+        model.solution = x_new.copy()
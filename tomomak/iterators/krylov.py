@@ -0,0 +1,80 @@
+from . import abstract_iterator
+import numpy as np
+from tomomak.detectors import signal
+from tomomak.util import backend
+
+
+def _dot(a, b):
+    xp = backend.namespace(a, b)
+    if backend.is_numpy(xp):
+        return np.vdot(a, b)
+    return xp.vecdot(xp.reshape(a, (-1,)), xp.reshape(b, (-1,)))
+
+
+class CGLS(abstract_iterator.AbstractIterator):
+    """Conjugate gradient method for the least squares: min(||detector_geometry * solution - detector_signal||^2
+    + lam * ||solution||^2).
+
+    see A. Bjorck, "Numerical methods for least squares problems", 1996.
+    Each step is one Krylov iteration, which needs one projection and one back projection,
+    so the method works with any geometry, including operators (see tomomak.detectors.operators),
+    which are never converted to dense arrays. Convergence is much faster than in SIRT or Landweber iteration.
+    Number of steps acts as regularization parameter, so for noisy signals lam may be 0 and iterations
+    should be stopped early.
+    If solution is changed between steps, e.g. by constraints, iterations are restarted from the new solution.
+    Model gets copy of the current iterate, so in-place changes are detected too.
+    Calculations are performed in the array namespace of the detector geometry (see tomomak.util.backend).
+
+    Args:
+        lam(float, optional): Tikhonov regularization parameter. Default: 0.
+    """
+
+    def __init__(self, lam=0):
+        super().__init__(None, None)
+        self.lam = lam
+
+    def init(self, model, steps, *args, **kwargs):
+        xp = backend.namespace(model.detector_geometry)
+        if model.solution is None:
+            model.solution = xp.zeros(model.shape, dtype=backend.dtype(xp, model.dtype))
+        state = abstract_iterator.IteratorState(shape=model.shape, restarts=-1, xp=xp,
+                                                dtype=backend.dtype(xp, model.dtype),
+                                                signal=backend.asarray(model.detector_signal, xp))
+        self._restart(model, state)
+        return state
+
+    def finalize(self, model, state):
+        pass
+
+    def __str__(self):
+        return "CGLS"
+
+    def _restart(self, model, state):
+        state.x = state.xp.asarray(backend.asarray(model.solution, state.xp), dtype=state.dtype, copy=True)
+        state.r = state.signal - signal.get_signal(state.x, model.detector_geometry)
+        model.masked_residual(state.r)
+        state.s = signal.back_project(state.r, model.detector_geometry) - self.lam * state.x
+        state.p = state.xp.asarray(state.s, copy=True)
+        state.gamma = _dot(state.s, state.s)
+        state.restarts += 1
+        model.solution = state.xp.asarray(state.x, copy=True)
+
+    def step(self, model, step_num, state):
+        if abstract_iterator.solution_changed(model, state.x):
+            self._restart(model, state)
+        if state.gamma == 0:
+            return
+        q = signal.get_signal(state.p, model.detector_geometry)
+        model.masked_residual(q)
+        delta = _dot(q, q) + self.lam * _dot(state.p, state.p)
+        if delta == 0:
+            return
+        a = state.gamma / delta
+        x = backend.astype(state.x + a * state.p, state.dtype)
+        state.r -= a * q
+        state.s = signal.back_project(state.r, model.detector_geometry) - self.lam * x
+        gamma = _dot(state.s, state.s)
+        state.p = state.s + gamma / state.gamma * state.p
+        state.gamma = gamma
+        state.x = x
+        model.solution = state.xp.asarray(x, copy=True)
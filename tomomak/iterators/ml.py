@@ -2,6 +2,16 @@ from . import abstract_iterator
 import numpy as np
 import warnings
 from tomomak.detectors import signal
+from tomomak.util import backend, precision
+
+
+def _column_sum(detector_geometry):
+    xp = backend.namespace(detector_geometry)
+    if backend.is_numpy(xp):
+        res = np.sum(detector_geometry, axis=0, dtype=precision.accumulation_dtype)
+        # sum of the sparse matrix is numpy matrix
+        return np.asarray(res).reshape(detector_geometry.shape[1:])
+    return xp.sum(detector_geometry, axis=0, dtype=backend.dtype(xp, precision.accumulation_dtype))
 
 
 class ML(abstract_iterator.AbstractIterator):
@@ -9,41 +19,55 @@ class ML(abstract_iterator.AbstractIterator):
     see  for example G. Kontaxakis and L.G. Strauss
     - Maximum Likelihood Algorithms for Image Reconstruction in Positron Emission Tomography.
     All attributes and methods are used automatically in solver (see tomomak.iterators.abstract_iterator).
+    Calculations are performed in the array namespace of the detector geometry (see tomomak.util.backend),
+    e.g. on GPU if geometry is cupy array.
+    Batch of solutions (see tomomak.model.Model.batch_size) is reconstructed with matrix-matrix products.
     """
+    supports_batch = True
 
     def __init__(self):
         super().__init__(None, None)
-        self.wi = None
-        self.shape = None
-        self.w_det = None
 
     def init(self, model, steps, *args, **kwargs):
         # super().init(model, steps, *args, **kwargs)
+        xp = backend.namespace(model.detector_geometry)
         if model.solution is None:
-            shape = model.mesh.shape
-            model.solution = np.ones(shape)
+            shape = abstract_iterator.solution_shape(model)
+            model.solution = xp.ones(shape, dtype=backend.dtype(xp, model.dtype))
         else:
-            if np.all(model.solution):
+            model.solution = backend.asarray(model.solution, xp)
+            abstract_iterator.expand_batch(model)
+            if not xp.all(model.solution):
                 warnings.warn("Some elements in model solution are zero. They will not be changed.")
-        self.shape = model.solution.shape
-        self.w_det = np.multiply(np.moveaxis(model.detector_geometry, 0, -1), model.detector_signal)
-        self.wi = np.sum(model.detector_geometry, axis=0)
-
-    def finalize(self, model):
+        wi = self.precompute(model)
+        if not xp.all(wi):
+            warnings.warn("Some cells are not seen by detectors. They will be set to zero. "
+                          "Use Model.reduced() to remove them from the reconstruction.")
+        signal_values = backend.asarray(model.detector_signal, xp, backend.dtype(xp, float))
+        return abstract_iterator.IteratorState(shape=model.solution.shape, wi=wi, signal=signal_values,
+                                               dtype=backend.dtype(xp, model.dtype))
+
+    def precompute(self, model):
+        """Sum of detector geometry over all used detectors (see tomomak.model.Model.channel_mask).
+        """
+        return model.masked_sum('column_sum', _column_sum)
+
+    def finalize(self, model, state):
         pass
 
     def __str__(self):
         return 'Maximum Likelihood method'
 
-    def step(self, model, step_num):
+    def step(self, model, step_num, state):
         # expected signal
         y_expected = signal.get_signal(model.solution, model.detector_geometry)
         # multiplication
-        mult = np.sum(np.divide(self.w_det, y_expected, out=np.zeros_like(self.w_det), where=y_expected != 0), axis=-1)
-        mult = mult / self.wi
+        ratio = backend.divide(state.signal, y_expected)
+        model.masked_residual(ratio)
+        mult = signal.back_project(ratio, model.detector_geometry)
+        mult = backend.divide(mult, state.wi)
         # result
-        model.solution = model.solution * mult
-
+        model.solution = backend.astype(model.solution * mult, state.dtype)
 
 
 class MLFlatten(abstract_iterator.AbstractIterator):
@@ -52,40 +76,38 @@ class MLFlatten(abstract_iterator.AbstractIterator):
 
     def __init__(self):
         super().__init__(alpha=0.1, alpha_calc=None)
-        self.w_det = None
-        self.wi = None
-        self.shape = None
-        self.det_shape = None
 
     def init(self, model, *args, **kwargs):  # maybe make this __init__
         if model.solution is None:
-            shape = model.mesh.shape
-            model.solution = np.ones(shape)
+            shape = model.shape
+            model.solution = np.ones(shape, dtype=model.dtype)
         else:
-            if np.all(model.solution):
+            if not np.all(model.solution):
                 warnings.warn("Some elements in model solution are zero. They will not be changed.")
-        self.shape = model.solution.shape
-        self.det_shape = model.detector_geometry.shape
+        state = abstract_iterator.IteratorState(shape=model.solution.shape, det_shape=model.detector_geometry.shape)
+        state.wi = model.masked_sum('column_sum', _column_sum).flatten()
         model._solution = model.solution.flatten()
-        shape2 = np.prod(self.shape)
-        model._detector_geometry = model.detector_geometry.reshape((self.det_shape[0], shape2))
-        self.w_det = np.multiply(np.moveaxis(model.detector_geometry, 0, -1), model.detector_signal)
-        self.wi = np.sum(model.detector_geometry, axis=0)
+        shape2 = np.prod(state.shape)
+        model._detector_geometry = model.detector_geometry.reshape((state.det_shape[0], shape2))
+        state.w_det = np.multiply(np.moveaxis(model.detector_geometry, 0, -1),
+                                  model.masked_residual(np.array(model.detector_signal, dtype=float)))
+        return state
 
-    def finalize(self, model):
-        model._detector_geometry = model.detector_geometry.reshape(self.det_shape)
-        model._solution = model.solution.reshape(self.shape)
+    def finalize(self, model, state):
+        model._detector_geometry = model.detector_geometry.reshape(state.det_shape)
+        model._solution = model.solution.reshape(state.shape)
 
     @property
     def __str__(self):
         return 'Maximum Likelihood method'
 
-    def step(self, model, step_num):
+    def step(self, model, step_num, state):
         # expected signal
         y_expected = signal.get_signal(model.solution, model.detector_geometry)
         # multiplication
-        mult = np.sum(np.divide(self.w_det, y_expected, out=np.zeros_like(self.w_det), where=y_expected != 0), axis=-1)
-        mult = mult / self.wi
+        mult = np.sum(np.divide(state.w_det, y_expected, out=np.zeros_like(state.w_det), where=y_expected != 0),
+                      axis=-1)
+        mult = np.divide(mult, state.wi, out=np.zeros_like(mult), where=state.wi != 0)
         # find delta
-        model.solution = model.solution * mult
+        model.solution = (model.solution * mult).astype(model.dtype, copy=False)
 
@@ -1,8 +1,26 @@
-import numpy as np
 from tomomak.detectors import signal
+from tomomak.util import backend
 from tomomak.iterators.abstract_iterator import AbstractStatistics
 
 
+def _cell_axes(solution, model=None):
+    """Axes of the solution cells. First axis of the batch of solutions (see tomomak.model.Model.batch_size)
+    is not included, so statistics are calculated for each solution.
+    """
+    ndim = solution.ndim
+    if model is not None and model.batch_size is not None and ndim == len(model.shape) + 1:
+        return tuple(range(1, ndim))
+    return tuple(range(ndim))
+
+
+def _value(res):
+    """Convert result to float or, for the batch of solutions, to numpy array.
+    """
+    if getattr(res, 'ndim', 0) == 0:
+        return float(res)
+    return backend.to_numpy(res)
+
+
 class RMS(AbstractStatistics):
     """Calculate normalized root mean square error.
 
@@ -22,14 +40,12 @@ class RMS(AbstractStatistics):
             float: normalized RMS.
 
         """
-        res = solution - real_solution
-        res = np.square(res)
-        res = np.sum(res)
-        tmp = np.sum(np.square(solution))
-        if tmp != 0:
-            res =  np.sqrt(res / tmp) * 100
-        else:
-            res = float("inf")
+        xp = backend.namespace(solution)
+        axes = _cell_axes(solution, model)
+        res = solution - backend.asarray(real_solution, xp)
+        res = xp.sum(res * res, axis=axes)
+        tmp = xp.sum(solution * solution, axis=axes)
+        res = _value(xp.where(tmp != 0, xp.sqrt(backend.divide(res, tmp)) * 100, float("inf")))
         self.data.append(res)
         return res
 
@@ -46,7 +62,8 @@ class RMS(AbstractStatistics):
 class RN(AbstractStatistics):
     """Calculate Residual Norm.
 
-    RN is between calculated and measured signal.
+    RN is between calculated and measured signal. Disabled channels (see tomomak.model.Model.channel_mask)
+    are ignored. For the batch of solutions (see tomomak.model.Model.batch_size) array of norms is calculated.
     """
 
     def step(self, model, solution, real_solution, *args, **kwargs):
@@ -61,9 +78,11 @@ class RN(AbstractStatistics):
             float: residual norm
 
         """
-        norm = model.detector_signal - signal.get_signal(model.solution, model.detector_geometry)
-        norm = np.square(norm)
-        res = np.sqrt(np.sum(norm))
+        y = signal.get_signal(model.solution, model.detector_geometry)
+        xp = backend.namespace(y)
+        norm = backend.asarray(model.detector_signal, xp) - y
+        model.masked_residual(norm)
+        res = _value(xp.sqrt(xp.sum(norm * norm, axis=-1)))
         self.data.append(res)
         return res
 
@@ -98,10 +117,12 @@ class ChiSq(AbstractStatistics):
             float: chi^2.
 
         """
+        xp = backend.namespace(solution)
+        real_solution = backend.asarray(real_solution, xp)
         chi = solution - real_solution
         chi = chi ** 2
-        chi = np.divide(chi, real_solution, out=np.zeros_like(chi), where=real_solution != 0)
-        res = np.sum(chi)
+        chi = backend.divide(chi, real_solution)
+        res = _value(xp.sum(chi, axis=_cell_axes(solution, model)))
         self.data.append(res)
         return res
 
@@ -131,20 +152,22 @@ class CorrCoef(AbstractStatistics):
         Returns:
             float: correlation coefficient.
         """
-        det_num = model.detector_signal.shape[0]
+        det_num = model.detector_signal.shape[-1]
         det_num2 = det_num**2
-        f_s = np.sum(old_solution)
-        f_new_s = np.sum(solution)
-        corr= det_num2 * np.sum(np.multiply(solution, old_solution))
+        xp = backend.namespace(solution, old_solution)
+        axes = _cell_axes(solution, model)
+        f_s = xp.sum(old_solution, axis=axes)
+        f_new_s = xp.sum(solution, axis=axes)
+        corr= det_num2 * xp.sum(solution * old_solution, axis=axes)
         corr = corr - f_s * f_new_s
-        divider = det_num2 * np.sum(np.multiply(solution, solution))
+        divider = det_num2 * xp.sum(solution * solution, axis=axes)
         tmp = f_new_s**2
-        divider = np.sqrt(divider - tmp)
+        divider = xp.sqrt(divider - tmp)
         corr = corr / divider
-        divider = det_num2 * np.sum(np.multiply(old_solution, old_solution))
+        divider = det_num2 * xp.sum(old_solution * old_solution, axis=axes)
         tmp = f_s**2
-        divider = np.sqrt(divider - tmp)
-        res = corr / divider
+        divider = xp.sqrt(divider - tmp)
+        res = _value(corr / divider)
         self.data.append(res)
         return res
 
@@ -162,18 +185,22 @@ class Convergence(AbstractStatistics):
     """calculate d(solution) / solution * 100%.
     """
 
-    def step(self, solution, old_solution, *args, **kwargs):
+    def step(self, solution, old_solution, *args, model=None, **kwargs):
         """calculate d(solution) / solution * 100%.
 
         Args:
             solution(ndarray): supposed solution.
             old_solution(ndarray): solution at previous step
+            model(tomomak.Model, optional): used model. It is needed to distinguish batch of solutions.
+                Default: None.
 
         Returns:
             float: ds/s, %
 
         """
-        res = np.sum(np.abs(solution - old_solution)) / np.abs(np.sum(solution)) * 100
+        xp = backend.namespace(solution, old_solution)
+        axes = _cell_axes(solution, model)
+        res = _value(xp.sum(xp.abs(solution - old_solution), axis=axes) / xp.abs(xp.sum(solution, axis=axes)) * 100)
         self.data.append(res)
         return res
 
@@ -1,4 +1,4 @@
 from tomomak.mesh.cartesian import Axis1d
 
 
-__all__ = ['abstract_axes', 'mesh', 'cartesian']
\ No newline at end of file
+__all__ = ['abstract_axes', 'mesh', 'cartesian', 'operators']
\ No newline at end of file
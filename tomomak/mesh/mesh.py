@@ -1,5 +1,6 @@
 import numpy as np
 from tomomak.util import array_routines
+from tomomak.mesh import operators
 import itertools
 
 class Mesh:
@@ -23,6 +24,7 @@ class Mesh:
         """
         self._axes = []
         self._dimension = 0
+        self._operators = {}
         for axis in axes:
             self.add_axis(axis)
 
@@ -60,10 +62,67 @@ class Mesh:
             index = len(self._axes)
         self._axes.insert(index, axis)
         self._dimension += axis.dimension
+        self._operators = {}
 
     def remove_axis(self, index=-1):
         self._dimension -= self._axes[index].dimension
         del self._axes[index]
+        self._operators = {}
+
+    def _operator(self, key, func):
+        if key not in self._operators:
+            self._operators[key] = func()
+        return self._operators[key]
+
+    def cell_volumes(self):
+        """Get volumes of all cells. See tomomak.mesh.operators.cell_volumes.
+
+        Result is cached until axes are added or removed, so it should not be changed in place.
+
+        Returns:
+            ndarray: flattened array of volumes.
+        """
+        return self._operator('cell_volumes', lambda: operators.cell_volumes(self))
+
+    def adjacency_graph(self):
+        """Get sparse graph of the neighbouring cells. See tomomak.mesh.operators.adjacency_graph.
+
+        Result is cached until axes are added or removed, so it should not be changed in place.
+
+        Returns:
+            scipy.sparse.csr_matrix: symmetric N x N matrix of distances between neighbouring cells.
+        """
+        return self._operator('adjacency_graph', lambda: operators.adjacency_graph(self))
+
+    def gradient_operators(self, padded=False):
+        """Get sparse difference operators along each axis. See tomomak.mesh.operators.gradient_operators.
+
+        Result is cached until axes are added or removed, so it should not be changed in place.
+
+        Args:
+            padded(bool, optional): make operators with N rows for 1D axes. Default: False.
+
+        Returns:
+            list of scipy.sparse.csr_matrix: one operator for each axis.
+        """
+        return self._operator(('gradient_operators', padded), lambda: operators.gradient_operators(self, padded))
+
+    def laplacian(self, coefficients=None, volume_weighted=False):
+        """Get sparse (minus) Laplace operator. See tomomak.mesh.operators.laplacian.
+
+        Result is cached until axes are added or removed, so it should not be changed in place.
+
+        Args:
+            coefficients(iterable of floats, optional): coefficient for each axis. If None, all are 1. Default: None.
+            volume_weighted(bool, optional): weight differences with cell volumes. Default: False.
+
+        Returns:
+            scipy.sparse.csr_matrix: N x N matrix, where N is mesh size.
+        """
+        if coefficients is not None:
+            coefficients = tuple(float(c) for c in coefficients)
+        key = ('laplacian', coefficients, volume_weighted)
+        return self._operator(key, lambda: operators.laplacian(self, coefficients, volume_weighted))
 
     def integrate(self, data, index, integrate_type='integrate'):
         """ Calculates sum of data * dv or sum of data over given axes,
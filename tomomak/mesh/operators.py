@@ -0,0 +1,184 @@
+"""Sparse differential operators on the mesh.
+
+Operators act on the flattened (C-order) solution array and are returned as scipy.sparse matrices.
+"""
+import numpy as np
+import scipy.sparse
+import shapely.geometry
+import shapely.strtree
+
+
+def adjacency(axis):
+    """Find pairs of neighbouring cells and distances between their centers.
+
+    Cells of the 1D axis are neighbours if they have consecutive indexes.
+    Cells of the 2D axis (e.g. SpiderWeb2dAxis) are neighbours if their polygons share a part of the border.
+
+    Args:
+        axis(tomomak axis): 1D or 2D axis.
+
+    Returns:
+        tuple: ndarray of index pairs (i, j), i < j, with shape (M, 2) and ndarray of M distances.
+    """
+    if axis.dimension == 1:
+        pairs = np.stack((np.arange(axis.size - 1), np.arange(1, axis.size)), axis=1)
+        return pairs, np.diff(axis.coordinates)
+    if axis.dimension != 2:
+        raise NotImplementedError("Difference operators are implemented for the 1D and 2D axes only.")
+    polygons = [shapely.geometry.Polygon(np.asarray(c, dtype=float)) for c in axis.cell_edges2d()]
+    index = {id(p): i for i, p in enumerate(polygons)}
+    tree = shapely.strtree.STRtree(polygons)
+    # vertices of neighbouring cells may differ due to rounding errors, so small tolerance is used
+    tol = 1e-7 * np.sqrt(np.max([p.area for p in polygons]))
+    pairs = []
+    for i, p in enumerate(polygons):
+        for q in tree.query(p.buffer(tol)):
+            # shapely < 2.0 returns geometries, newer versions return indexes
+            j = int(q) if isinstance(q, (int, np.integer)) else index[id(q)]
+            if j > i and p.boundary.intersection(polygons[j].buffer(tol)).length > 100 * tol:
+                pairs.append((i, j))
+    pairs = np.array(sorted(pairs), dtype=int).reshape(-1, 2)
+    centers = np.array([p.centroid.coords[0] for p in polygons])
+    return pairs, np.linalg.norm(centers[pairs[:, 1]] - centers[pairs[:, 0]], axis=1)
+
+
+def difference_matrix(axis):
+    """Differences between neighbouring cells of the axis, divided by the distance between cell centers.
+
+    For 1D axis it is forward difference. For 2D axis each row corresponds to the pair of cells with common edge.
+
+    Args:
+        axis(tomomak axis): 1D or 2D axis.
+
+    Returns:
+        scipy.sparse.csr_matrix: M x axis.size matrix, where M is number of neighbouring pairs (see adjacency).
+    """
+    pairs, dist = adjacency(axis)
+    m = len(pairs)
+    rows = np.repeat(np.arange(m), 2)
+    data = np.stack((-1 / dist, 1 / dist), axis=1).ravel()
+    return scipy.sparse.csr_matrix((data, (rows, pairs.ravel())), shape=(m, axis.size))
+
+
+def pair_average(difference):
+    """Matrix, which averages cell values over the pairs of neighbouring cells of the difference operator.
+
+    Args:
+        difference(scipy.sparse matrix): difference operator, e.g. one of the gradient_operators.
+
+    Returns:
+        scipy.sparse.csr_matrix: matrix with the same shape and sparsity pattern.
+    """
+    m = abs(difference)
+    row_sum = np.asarray(m.sum(axis=1)).ravel()
+    return (scipy.sparse.diags(1 / row_sum) @ m).tocsr()
+
+
+def cell_volumes(mesh):
+    """Volumes of all mesh cells.
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh.
+
+    Returns:
+        ndarray: flattened array of volumes.
+    """
+    res = np.ones(1)
+    for ax in mesh.axes:
+        v = np.asarray(ax.volumes, dtype=float)
+        if v.ndim > 1:
+            # SpiderWeb2dAxis stores area of each cell twice
+            v = v[:, 0]
+        res = np.multiply.outer(res, v).ravel()
+    return res
+
+
+def adjacency_graph(mesh):
+    """Graph of the neighbouring mesh cells.
+
+    Cells are neighbours, if they are neighbours along one of the axes and have the same indexes along other axes.
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh.
+
+    Returns:
+        scipy.sparse.csr_matrix: symmetric N x N matrix, where N is mesh size.
+            Non-zero elements are distances between centers of the neighbouring cells.
+    """
+    res = None
+    for before, after, ax in _axes_positions(mesh):
+        pairs, dist = adjacency(ax)
+        a = scipy.sparse.coo_matrix((dist, (pairs[:, 0], pairs[:, 1])), shape=(ax.size, ax.size))
+        a = _kron(before, a + a.T, after)
+        res = a if res is None else res + a
+    return res.tocsr()
+
+
+def gradient_operators(mesh, padded=False):
+    """Difference operators along each mesh axis (see difference_matrix).
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh.
+        padded(bool, optional): if True, each operator has N rows, where N is mesh size,
+            and rows, corresponding to the last cell along the axis, are zero. So components of the gradient
+            along all axes correspond to the same cell, as it is needed e.g. for isotropic total variation.
+            Only 1D axes are supported. Default: False.
+
+    Returns:
+        list of scipy.sparse.csr_matrix: one operator for each axis. Each operator has mesh size columns.
+    """
+    res = []
+    for before, after, ax in _axes_positions(mesh):
+        d = difference_matrix(ax)
+        if padded:
+            if ax.dimension != 1:
+                raise NotImplementedError("Padded difference operators are implemented for the 1D axes only.")
+            d = scipy.sparse.vstack((d, scipy.sparse.csr_matrix((1, ax.size))), format='csr')
+        res.append(_kron(before, d, after))
+    return res
+
+
+def laplacian(mesh, coefficients=None, volume_weighted=False):
+    """Discrete (minus) Laplace operator with Neumann boundary conditions: sum of c_k * D_k^T W_k D_k over all axes.
+
+    Matrix is symmetric and positive semi-definite. Constant solution is in its null space.
+    Different coefficients c_k give anisotropic operator, e.g. to smooth solution stronger along one of the axes.
+    If volume_weighted is True, W_k is diagonal matrix of the mean volume of the neighbouring cells,
+    so x^T L x approximates integral of |grad(x)|^2 over the mesh. Otherwise W_k is identity.
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh.
+        coefficients(iterable of floats, optional): coefficient for each axis. If None, all are 1. Default: None.
+        volume_weighted(bool, optional): weight differences with cell volumes. Default: False.
+
+    Returns:
+        scipy.sparse.csr_matrix: N x N matrix, where N is mesh size.
+    """
+    ops = gradient_operators(mesh)
+    if coefficients is None:
+        coefficients = [1] * len(ops)
+    if len(coefficients) != len(ops):
+        raise ValueError("Number of coefficients should be equal to the number of axes.")
+    volumes = cell_volumes(mesh) if volume_weighted else None
+    res = scipy.sparse.csr_matrix((int(np.prod(mesh.shape)),) * 2)
+    for d, c in zip(ops, coefficients):
+        if volume_weighted:
+            res = res + c * (d.T @ scipy.sparse.diags(pair_average(d) @ volumes) @ d)
+        else:
+            res = res + c * (d.T @ d)
+    return res.tocsr()
+
+
+def _axes_positions(mesh):
+    """Yield sizes of the flattened dimensions before and after each axis and the axis.
+    """
+    shape = mesh.shape
+    for k, ax in enumerate(mesh.axes):
+        yield int(np.prod(shape[:k])), int(np.prod(shape[k + 1:])), ax
+
+
+def _kron(before, matrix, after):
+    """Extend axis operator to the whole mesh: I_before x matrix x I_after.
+    """
+    res = scipy.sparse.kron(scipy.sparse.identity(before, format='csr'), matrix, format='csr')
+    return scipy.sparse.kron(res, scipy.sparse.identity(after, format='csr'), format='csr')
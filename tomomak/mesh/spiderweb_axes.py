@@ -94,7 +94,7 @@ class SpiderWeb2dAxis(Abstract2dAxis):
             for i in range(n):
                 ind, ind1 = get_indices()
                 domains.append(numpy.concatenate((border[ind:ind1 - 1], [border[ind1 - 1], border[ind1], center])))
-        return numpy.array(domains)
+        return numpy.array(domains, dtype=object)
 
     def _get4indices(self, line, radius):
         """Function for getting four indices of points for four support radial lines
@@ -1,5 +1,11 @@
 import numbers
 import pickle
+import copy
+import numpy as np
+from tomomak.util import backend
+from tomomak.util import cache
+from tomomak.util import precision
+from tomomak.util import reduction as reduction_module
 
 
 class Model:
@@ -13,12 +19,34 @@ class Model:
         self._detector_signal = detector_signal
         self._solution = solution
         self._mesh = mesh
+        self._derived = {}
+        self._fingerprint = None
+        self._support = None
+        self._parent = None
+        self._reduction = None
+        self._channel_mask = None
+        self._masked = {}
+        self._dtype = None
         self._check_self_consistency()
 
+    def __getstate__(self):
+        # derived quantities may be large or not picklable (e.g. factorizations), so they are recalculated
+        state = self.__dict__.copy()
+        state['_derived'] = {}
+        state['_masked'] = {}
+        if self._fingerprint is not None and self._fingerprint[0] != 'hash':
+            state['_fingerprint'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(_derived={}, _fingerprint=None, _support=None, _parent=None, _reduction=None,
+                             _channel_mask=None, _masked={}, _dtype=None)
+        self.__dict__.update(state)
+
     @property
     def shape(self):
         if self.detector_geometry is not None:
-            shape = self.detector_geometry[0].shape
+            shape = tuple(self.detector_geometry.shape[1:])
         elif self._solution is not None:
             shape = self._solution.shape
         elif self._mesh is not None:
@@ -26,9 +54,25 @@ class Model:
             for n in self._mesh.axes:
                 shape. append(n.size)
         else:
-            shape = None
+            return None
         return tuple(shape)
 
+    @property
+    def batch_size(self):
+        """int: number of solutions, reconstructed together, or None.
+
+        Several solutions with the same geometry, e.g. different initial guesses or noisy realizations
+        of the signal, may be reconstructed at once. In this case solution has shape (batch size, *shape)
+        and/or detector_signal has shape (batch size, number of detectors). Iterators, which support batches
+        (ML, SIRT, see tomomak.iterators.abstract_iterator.AbstractIterator.supports_batch), replace
+        matrix-vector products with matrix-matrix products. Solver raises ValueError for other iterators.
+        Statistics are calculated for each solution.
+        """
+        if self._solution is not None and self._detector_geometry is not None \
+                and self._solution.ndim == self._detector_geometry.ndim:
+            return self._solution.shape[0]
+        return _signal_batch(self._detector_signal)
+
     @property
     def size(self):
         shape = self.shape
@@ -55,9 +99,16 @@ class Model:
             n_cells = notdef
         else:
             n_cells = str(n_cells)
-        res += "\nNumber of cells: {}\nMesh:\n".format(n_cells)
+        res += "\nNumber of cells: {}\n".format(n_cells)
+        if self._support is not None:
+            res += "Support: {} of {} cells are active.\n".format(np.count_nonzero(self._support), self._support.size)
+        if self._reduction is not None:
+            res += "Reduced model: {}\n".format(self._reduction)
+        res += "Mesh:\n"
         if self._mesh is not None:
             mesh = str(self._mesh)
+        elif self._parent is not None and self._parent.mesh is not None:
+            mesh = str(self._parent.mesh)
         else:
             mesh = notdef
         res += mesh
@@ -76,8 +127,271 @@ class Model:
     @detector_geometry.setter
     def detector_geometry(self, value):
         self._detector_geometry = value
+        self._derived = {}
+        self._masked = {}
+        self._fingerprint = None
         self._check_self_consistency()
 
+    @property
+    def geometry_fingerprint(self):
+        """hashable: key, identifying detector_geometry in the cache of derived quantities.
+
+        By default identity of the detector_geometry object is used, so models, sharing same geometry array,
+        share derived quantities. Call hash_geometry() to use geometry content instead
+        and geometry_changed() after in-place modification of the geometry.
+        """
+        if self._detector_geometry is None:
+            return None
+        if self._fingerprint is not None:
+            return self._fingerprint
+        return 'id', cache.array_token(self._detector_geometry)
+
+    def hash_geometry(self):
+        """Use hash of the detector_geometry content as geometry fingerprint.
+
+        Useful when same geometry is loaded or created several times, e.g. for each shot of the experiment.
+        """
+        self._fingerprint = 'hash', cache.content_hash(self._detector_geometry)
+        self._derived = {}
+
+    def geometry_changed(self):
+        """Notify model, that detector_geometry was changed in-place, so derived quantities should be recalculated.
+        """
+        if self._fingerprint is None:
+            cache.invalidate_token(self._detector_geometry)
+        else:
+            self.hash_geometry()
+        self._derived = {}
+        self._masked = {}
+
+    def derived(self, name, func):
+        """Get quantity, derived from detector_geometry, e.g. normalization used by iterators.
+
+        Quantity is calculated as func(detector_geometry) on the first request. Result is stored in the model and
+        in the LRU cache (tomomak.util.cache.geometry_cache) with geometry fingerprint as a key,
+        so it is shared by all models, solves and iterators with same detector_geometry.
+
+        Args:
+            name(str): quantity name.
+            func(callable): function, calculating quantity from detector_geometry.
+
+        Returns:
+            calculated quantity.
+        """
+        if name not in self._derived:
+            key = (self.geometry_fingerprint, name)
+            self._derived[name] = cache.geometry_cache.get(key, lambda: func(self._detector_geometry))
+        return self._derived[name]
+
+    @property
+    def dtype(self):
+        """numpy.dtype: dtype of the solution and geometry, created by iterators and transforms.
+
+        If not set, default dtype is used (see tomomak.util.precision). Setting of the dtype converts
+        detector_geometry (if it is ndarray) and solution to it. Set to None to use default dtype.
+        """
+        if self._dtype is None:
+            return precision.get_default_dtype()
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, value):
+        if value is None:
+            self._dtype = None
+            return
+        self._dtype = precision.check_dtype(value)
+        if isinstance(self._detector_geometry, np.ndarray) and self._detector_geometry.dtype != self._dtype:
+            self.detector_geometry = self._detector_geometry.astype(self._dtype)
+        if self._solution is not None and self._solution.dtype != self._dtype:
+            self.solution = self._solution.astype(self._dtype)
+
+    @property
+    def channel_mask(self):
+        """ndarray of bools: True for the detectors, used in reconstruction, or None if all detectors are used.
+
+        Disabled channels are ignored by iterators, statistics and solvers, while detector_geometry
+        and detector_signal arrays are not changed. Quantities, which are sums over detectors
+        (see masked_sum()), are updated by subtraction of the disabled rows contribution,
+        so toggling few channels is cheap.
+        """
+        return self._channel_mask
+
+    @channel_mask.setter
+    def channel_mask(self, value):
+        if value is not None:
+            value = np.asarray(value, dtype=bool)
+            if self._detector_geometry is not None and value.shape != (self._detector_geometry.shape[0],):
+                raise Exception("channel_mask length should be equal to the number of detectors. "
+                                "channel_mask shape is {}; number of detectors is {}."
+                                .format(value.shape, self._detector_geometry.shape[0]))
+            if np.all(value):
+                value = None
+        self._channel_mask = value
+        self._masked = {}
+
+    @property
+    def active_channels(self):
+        """ndarray of ints: indexes of the used detectors or None if all detectors are used.
+        """
+        if self._channel_mask is None:
+            return None
+        return np.flatnonzero(self._channel_mask)
+
+    @property
+    def disabled_channels(self):
+        """ndarray of ints: indexes of the disabled detectors.
+        """
+        if self._channel_mask is None:
+            return np.zeros(0, dtype=int)
+        return np.flatnonzero(~self._channel_mask)
+
+    @property
+    def mask_key(self):
+        """str: key, identifying channel mask. May be used in the names of derived quantities. Empty if all
+        channels are used.
+        """
+        if self._channel_mask is None:
+            return ''
+        return 'mask_' + cache.content_hash(self._channel_mask)
+
+    def masked_sum(self, name, func):
+        """Get quantity, which is sum of the contributions of all used detectors, e.g. sum of geometry over detectors.
+
+        Quantity for all detectors is calculated as func(detector_geometry) and cached (see derived()).
+        If some channels are disabled (see channel_mask), func(detector_geometry[disabled_channels])
+        is subtracted, so cost is proportional to the number of disabled channels.
+
+        Args:
+            name(str): quantity name.
+            func(callable): function, calculating sum of contributions of the given geometry rows.
+
+        Returns:
+            calculated quantity.
+        """
+        full = self.derived(name, func)
+        if self._channel_mask is None:
+            return full
+        key = (name, self.mask_key)
+        if key not in self._masked:
+            self._masked[key] = full - func(backend.take_rows(self._detector_geometry, self.disabled_channels))
+        return self._masked[key]
+
+    def masked_residual(self, residual):
+        """Set residual (or any other array over detectors) of the disabled channels to zero in place.
+
+        Args:
+            residual(ndarray): array, which last dimension corresponds to detectors, e.g. batch of residuals
+                with shape (batch size, number of detectors).
+
+        Returns:
+            ndarray: same array.
+        """
+        if self._channel_mask is not None:
+            backend.set_zero(residual, ~self._channel_mask)
+        return residual
+
+    @property
+    def support(self):
+        """ndarray of bools: cells, where solution may be non-zero, or None if all cells are used.
+
+        Support is used to create compact model (see compact()). Support may be created from polygon,
+        magnetic equilibrium boundary or detector sensitivity, see tomomak.util.support.
+        """
+        return self._support
+
+    @support.setter
+    def support(self, value):
+        if value is not None:
+            value = np.asarray(value, dtype=bool)
+            if self.shape is not None and value.shape != self.shape:
+                raise Exception("support shape is inconsistent with model. support shape is {}; model shape is {}."
+                                .format(value.shape, self.shape))
+        self._support = value
+
+    def compact(self):
+        """Create model with active cells only, see support.
+
+        Same as reduced(zero_columns=False, zero_rows=False, duplicates=None).
+
+        Returns:
+            Model: compact model.
+        """
+        if self._support is None:
+            raise Exception("support is not defined.")
+        return self.reduced(zero_columns=False, zero_rows=False, duplicates=None)
+
+    def reduced(self, zero_columns=True, zero_rows=True, duplicates='sum'):
+        """Create model with reduced detector geometry (see tomomak.util.reduction.Reduction).
+
+        Only cells inside support (if it is defined) and used detectors (see channel_mask) are kept.
+        Optionally cells, not seen by any detector, detectors with zero geometry are removed
+        and equal detectors are merged.
+        Detector geometry of the reduced model is 2D array (detector, kept cell), and solution is 1D array,
+        so reconstruction with any iterator or Solver works only with the kept cells and detectors.
+        Reduction is cached (see derived()), so reduction of the models with the same geometry,
+        e.g. different frames of one diagnostic, is cheap. Reduced models with same geometry and reduction
+        also share derived quantities, e.g. normalizations used by iterators.
+        After reconstruction use expand() or full_model() to get solution on the full mesh.
+        Plotting and saving of the reduced model are performed with the full mesh.
+
+        Args:
+            zero_columns(bool, optional): remove cells, not seen by detectors. Default: True.
+            zero_rows(bool, optional): remove detectors with zero geometry. Default: True.
+            duplicates(str, optional): None to keep equal detectors, 'sum' to merge them preserving Poisson
+                likelihood (ML method), 'scale' to merge them preserving least squares residual. Default: 'sum'.
+
+        Returns:
+            Model: reduced model.
+        """
+        if self._detector_geometry is None:
+            raise Exception("detector_geometry should be defined to reduce the model.")
+        support = self._support
+        support_hash = None if support is None else cache.content_hash(support)
+        mask = self._channel_mask
+        name = 'reduction_{}_{}_{}_{}{}'.format(support_hash, zero_columns, zero_rows, duplicates, self.mask_key)
+        reduction = self.derived(name, lambda geom: reduction_module.Reduction(geom, support, zero_columns,
+                                                                               zero_rows, duplicates, mask))
+        res = Model()
+        res._detector_geometry = reduction.geometry
+        res._fingerprint = ('reduced', self.geometry_fingerprint, name)
+        if self._detector_signal is not None:
+            res._detector_signal = reduction.reduce_signal(self._detector_signal)
+        if self._solution is not None:
+            res._solution = reduction.reduce_solution(self._solution)
+        res._parent = self
+        res._reduction = reduction
+        res._check_self_consistency()
+        return res
+
+    def expand(self, data=None):
+        """Place data of the reduced model to the full mesh. Removed cells are set to zero.
+
+        Args:
+            data(ndarray, optional): array of kept cells. Last dimension corresponds to the cells.
+                If None, solution is used. Default: None.
+
+        Returns:
+            ndarray: array with the full model shape.
+        """
+        if self._parent is None:
+            raise Exception("Only reduced model may be expanded.")
+        if data is None:
+            data = self._solution
+        return self._reduction.expand(data, self._parent.shape)
+
+    def full_model(self):
+        """Get copy of the full model with expanded solution of the reduced model.
+
+        Returns:
+            Model: full model.
+        """
+        if self._parent is None:
+            raise Exception("Only reduced model may be expanded.")
+        res = copy.copy(self._parent)
+        if self._solution is not None:
+            res._solution = self.expand()
+        return res
+
     @property
     def detector_signal(self):
         return self._detector_signal
@@ -111,35 +425,51 @@ class Model:
         Self-consistency is checked if an attribute is changed.
         """
         if self._detector_geometry is not None:
-            geometry_len = len(self._detector_geometry)
+            # shape is used instead of len() and indexing, so that any array namespace is supported
+            geometry_len = self._detector_geometry.shape[0]
             if self._detector_signal is not None:
-                if not isinstance(self._detector_signal[0], numbers.Number):
-                    raise TypeError("detector_signal should be 1D iterable of numbers")
-                signal_len = len(self._detector_signal)
+                if hasattr(self._detector_signal, 'shape'):
+                    if len(self._detector_signal.shape) not in (1, 2):
+                        raise TypeError("detector_signal should be 1D array or 2D array with shape "
+                                        "(batch size, number of detectors).")
+                    signal_len = self._detector_signal.shape[-1]
+                else:
+                    if not isinstance(self._detector_signal[0], numbers.Number):
+                        raise TypeError("detector_signal should be 1D iterable of numbers")
+                    signal_len = len(self._detector_signal)
                 if geometry_len != signal_len:
                     raise Exception("detector_signal and detector_geometry should have same length. "
                                     "detector_geometry len is {}; detector signal len is {}."
                                     .format(geometry_len, signal_len))
             if self._solution is not None:
-                if self._solution.shape != self._detector_geometry[0].shape:
+                if _solution_shape(self._solution, self._detector_geometry.ndim - 1) \
+                        != tuple(self._detector_geometry.shape[1:]):
                     raise Exception("Each slice in detector_geometry should have same shape as solution. "
                                     "detector_geometry[0] shape is {}; solution shape is {}."
-                                    .format(self._detector_geometry[0].shape, self._solution.shape))
+                                    .format(tuple(self._detector_geometry.shape[1:]), self._solution.shape))
+        signal_batch = _signal_batch(self._detector_signal)
+        if signal_batch is not None and self._solution is not None and self._detector_geometry is not None:
+            solution_batch = self.batch_size if self._solution.ndim == self._detector_geometry.ndim else None
+            if solution_batch is not None and solution_batch != signal_batch:
+                raise Exception("Batch sizes of detector_signal and solution are different: {} and {}."
+                                .format(signal_batch, solution_batch))
         if self._mesh is not None:
-            def check_shapes(val, name):
-                if self.mesh.shape != val.shape:
+            def check_shapes(shape, name):
+                if tuple(self.mesh.shape) != tuple(shape):
                     raise Exception("mesh shape is inconsistent with {}. mesh shape is {} while {} is {}."
-                                    .format(name, self.mesh.shape, name, val.shape))
+                                    .format(name, self.mesh.shape, name, tuple(shape)))
             if self.detector_geometry is not None:
-                val = self.detector_geometry[0]
+                shape = self.detector_geometry.shape[1:]
                 name = "detector_geometry"
-                check_shapes(val, name)
+                check_shapes(shape, name)
             if self.solution is not None:
-                val = self.solution
+                shape = _solution_shape(self.solution, len(self.mesh.shape))
                 name =  "solution"
-                check_shapes(val, name)
+                check_shapes(shape, name)
 
     def plot1d(self, index=0, data_type="solution", **kwargs):
+        if self._parent is not None:
+            return self.full_model().plot1d(index, data_type, **kwargs)
         if data_type == "solution":
             if self._solution is None:
                 raise Exception("Solution is not defined.")
@@ -154,6 +484,8 @@ class Model:
         return plot
 
     def plot2d(self, index=0, data_type="solution", **kwargs):
+        if self._parent is not None:
+            return self.full_model().plot2d(index, data_type, **kwargs)
         if data_type == "solution":
             if self._solution is None:
                 raise Exception("Solution is not defined.")
@@ -168,6 +500,8 @@ class Model:
         return plot
 
     def plot3d(self, index=0, data_type="solution", **kwargs):
+        if self._parent is not None:
+            return self.full_model().plot3d(index, data_type, **kwargs)
         if data_type == "solution":
             if self._solution is None:
                 raise Exception("Solution is not defined.")
@@ -183,8 +517,9 @@ class Model:
 
 
     def save(self, fn):
+        model = self.full_model() if self._parent is not None else self
         with open(fn, 'wb') as f:
-            pickle.dump(self, f)
+            pickle.dump(model, f)
 
     @staticmethod
     def load(fn):
@@ -196,3 +531,16 @@ def load_model(fn):
         return pickle.load(f)
 
 
+def _signal_batch(detector_signal):
+    """Batch size of the 2D signal or None.
+    """
+    if detector_signal is not None and len(getattr(detector_signal, 'shape', ())) == 2:
+        return detector_signal.shape[0]
+    return None
+
+
+def _solution_shape(solution, ndim):
+    """Shape of each solution in the batch (see Model.batch_size).
+    """
+    shape = tuple(solution.shape)
+    return shape[1:] if len(shape) == ndim + 1 else shape
@@ -0,0 +1,175 @@
+"""Direct solution of the regularized least squares problem.
+
+For mid-size problems direct solution is much faster than thousands of iterative steps.
+Factorization of the problem matrix is cached for given geometry, regularization and lam,
+so reconstruction for each new signal is just a back substitution.
+Factorizations and Gram matrices are large (dense ones have n_cells^2 elements), so they are kept
+in the separate factor_cache, limited by memory, instead of the geometry cache (see tomomak.util.cache).
+"""
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+from tomomak.util import cache
+
+factor_cache = cache.LRUCache(maxsize=8, maxbytes=2 ** 30)
+
+
+class DirectSolver:
+    """Solve min(||G x - y||^2 + lam * ||L x||^2) by factorization of G^T G + lam * L^T L.
+
+    G is the flattened detector geometry, y is the detector signal.
+    Regularization types:
+        'tikhonov': L is identity.
+        'phillips-twomey': L is discrete Laplace operator of the model mesh (see tomomak.mesh.operators),
+            so second derivative of the solution is minimized.
+    Methods:
+        'dense': Cholesky factorization of the dense matrix.
+        'sparse': sparse LU factorization. Effective if geometry is sparse, e.g. lines of sight.
+        'dual': Cholesky factorization of G G^T + lam * I. Only for Tikhonov regularization.
+            Effective if number of detectors is less than number of cells.
+        'auto': 'dual' for Tikhonov regularization with less detectors than cells,
+            'sparse' for geometry with less than 10% non-zero elements, 'dense' otherwise.
+    Factorizations and Gram matrices are stored in factor_cache with geometry fingerprint
+    (see tomomak.model.Model) as a key.
+    Disabled channels (see tomomak.model.Model.channel_mask) are excluded. G^T G is updated by subtraction
+    of the disabled rows contribution, so masking of few channels doesn't require full recalculation.
+
+    Args:
+        lam(float, optional): regularization parameter. Default: 1e-3.
+        regularization(str, optional): 'tikhonov' or 'phillips-twomey'. Default: 'phillips-twomey'.
+        method(str, optional): 'auto', 'dense', 'sparse' or 'dual'. Default: 'auto'.
+    """
+    regularizations = ('tikhonov', 'phillips-twomey')
+    methods = ('auto', 'dense', 'sparse', 'dual')
+
+    def __init__(self, lam=1e-3, regularization='phillips-twomey', method='auto'):
+        if regularization not in self.regularizations:
+            raise ValueError("Regularization {} is not supported. Supported regularizations: {}."
+                             .format(regularization, self.regularizations))
+        if method not in self.methods:
+            raise ValueError("Method {} is not supported. Supported methods: {}.".format(method, self.methods))
+        if method == 'dual' and regularization != 'tikhonov':
+            raise ValueError("Dual method may be used only with Tikhonov regularization.")
+        self.lam = lam
+        self.regularization = regularization
+        self.method = method
+
+    def __str__(self):
+        return "Direct solver with {} regularization, lambda = {}".format(self.regularization, self.lam)
+
+    def solve(self, model, lam=None):
+        """Find solution and write it to model.solution.
+
+        Args:
+            model(tomomak.model.Model): model with defined detector_geometry and detector_signal.
+            lam(float, optional): regularization parameter. If None, self.lam is used. Default: None.
+
+        Returns:
+            ndarray: solution.
+        """
+        if model.detector_signal is None:
+            raise ValueError("detector_signal should be defined to perform reconstruction.")
+        if model.detector_geometry is None:
+            raise ValueError("detector_geometry should be defined to perform reconstruction.")
+        method, factor = self.factorize(model, lam)
+        g = _flat(model.detector_geometry)
+        y = model.masked_residual(np.array(model.detector_signal, dtype=float))
+        if method == 'dual':
+            rows = model.active_channels
+            if rows is not None:
+                g, y = g[rows], y[rows]
+            x = g.T @ scipy.linalg.cho_solve(factor, y)
+        elif method == 'sparse':
+            x = factor.solve(g.T @ y)
+        else:
+            x = scipy.linalg.cho_solve(factor, g.T @ y)
+        model.solution = x.reshape(model.detector_geometry.shape[1:])
+        return model.solution
+
+    def factorize(self, model, lam=None):
+        """Get cached factorization of the problem matrix or calculate it.
+
+        Args:
+            model(tomomak.model.Model): model with defined detector_geometry.
+            lam(float, optional): regularization parameter. If None, self.lam is used. Default: None.
+
+        Returns:
+            tuple: used method and factorization.
+        """
+        if lam is None:
+            lam = self.lam
+        method = self._method(model)
+        name = 'direct_{}_{}_{!r}{}'.format(self.regularization, method, float(lam), model.mask_key)
+        if method != 'dual' and self.regularization == 'phillips-twomey':
+            if model.mesh is None:
+                raise ValueError("Mesh should be defined for Phillips-Twomey regularization.")
+            # regularization operator depends on the mesh
+            name += '_mesh{}'.format(cache.array_token(model.mesh))
+
+        def calc(geometry):
+            g = _flat(geometry)
+            if model.active_channels is not None:
+                g = g[model.active_channels]
+            if method == 'dual':
+                return _cholesky(np.asarray(g @ g.T) + lam * np.eye(g.shape[0]))
+            if self.regularization == 'tikhonov':
+                reg = scipy.sparse.identity(g.shape[1], format='csc')
+            else:
+                lap = model.mesh.laplacian()
+                reg = (lap.T @ lap).tocsc()
+            if method == 'sparse':
+                gram = _masked_gram(model, 'gram_sparse', _gram_sparse)
+                return scipy.sparse.linalg.splu((gram + lam * reg).tocsc())
+            gram = _masked_gram(model, 'gram_dense', _gram_dense)
+            return _cholesky(gram + lam * reg.toarray())
+        key = (model.geometry_fingerprint, name)
+        return method, factor_cache.get(key, lambda: calc(model.detector_geometry))
+
+    def _method(self, model):
+        if self.method != 'auto':
+            return self.method
+        geometry = model.detector_geometry
+        n_det, n_cells = geometry.shape[0], geometry[0].size
+        if self.regularization == 'tikhonov' and n_det < n_cells:
+            return 'dual'
+        density = model.derived('density', lambda geom: np.count_nonzero(geom) / geom.size)
+        if density < 0.1:
+            return 'sparse'
+        return 'dense'
+
+
+def _flat(geometry):
+    return geometry.reshape(geometry.shape[0], -1)
+
+
+def _sparse(geometry):
+    return scipy.sparse.csr_matrix(_flat(geometry))
+
+
+def _masked_gram(model, name, func):
+    """G^T G of the used detectors. Gram matrix of all detectors has n_cells^2 elements, so it is cached
+    in factor_cache instead of the geometry cache. Contribution of the disabled channels is subtracted
+    (see tomomak.model.Model.masked_sum).
+    """
+    full = factor_cache.get((model.geometry_fingerprint, name), lambda: func(model.detector_geometry))
+    if model.channel_mask is None:
+        return full
+    return full - func(model.detector_geometry[model.disabled_channels])
+
+
+def _gram_sparse(geometry):
+    g = _sparse(geometry)
+    return (g.T @ g).tocsc()
+
+
+def _gram_dense(geometry):
+    g = _flat(geometry)
+    return g.T @ g
+
+
+def _cholesky(a):
+    try:
+        return scipy.linalg.cho_factor(a)
+    except np.linalg.LinAlgError:
+        raise ValueError("Problem matrix is singular. Increase regularization parameter lam.")
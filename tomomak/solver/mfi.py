@@ -0,0 +1,118 @@
+"""Minimum Fisher information regularization.
+
+See M. Anton et al., "X-ray tomography on the TCV tokamak", 1996
+and J. Mlynar et al., "Current research into applications of tomography for fusion diagnostics", 2019.
+"""
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+from tomomak.mesh import operators
+from tomomak.solver import direct
+try:
+    from sksparse import cholmod
+except ImportError:
+    cholmod = None
+
+
+class MFISolver:
+    """Minimum Fisher information solver.
+
+    Solves sequence of the regularized least squares problems min(||G x - y||^2 + lam * sum(w * |grad(x)|^2)),
+    where weights w = 1 / x are taken from the previous solution. First iteration is performed with unit weights.
+    Gradient operators of the mesh are used (see tomomak.mesh.mesh.Mesh.gradient_operators), so both cartesian
+    and 2D axes, e.g. SpiderWeb2dAxis, are supported.
+    Sparsity pattern of the problem matrix is the same at all iterations of one solve, so fill-reducing ordering
+    is calculated once per solve. Pattern depends on the mesh and on the used channels, so ordering is not cached
+    for the geometry. If scikit-sparse is installed, CHOLMOD Cholesky
+    factorization is used and symbolic analysis is reused across iterations.
+    Iterations are stopped, when relative change of the solution is less than tol.
+
+    Args:
+        lam(float, optional): regularization parameter. Default: 1e-3.
+        max_iter(int, optional): maximum number of reweighting iterations. Default: 10.
+        tol(float, optional): relative change of the solution norm, at which iterations are stopped. Default: 1e-3.
+        eps(float, optional): weights are calculated as 1 / max(x, eps * max(x)). Default: 1e-3.
+        use_cholmod(bool, optional): use CHOLMOD if it is available. Default: True.
+    """
+
+    def __init__(self, lam=1e-3, max_iter=10, tol=1e-3, eps=1e-3, use_cholmod=True):
+        self.lam = lam
+        self.max_iter = max_iter
+        self.tol = tol
+        self.eps = eps
+        self.use_cholmod = use_cholmod
+
+    def __str__(self):
+        return "Minimum Fisher information solver, lambda = {}".format(self.lam)
+
+    def solve(self, model, lam=None):
+        """Find solution and write it to model.solution.
+
+        Args:
+            model(tomomak.model.Model): model with defined mesh, detector_geometry and detector_signal.
+            lam(float, optional): regularization parameter. If None, self.lam is used. Default: None.
+
+        Returns:
+            tuple: solution and list of relative changes of the solution at each iteration.
+        """
+        if model.detector_signal is None:
+            raise ValueError("detector_signal should be defined to perform reconstruction.")
+        if model.detector_geometry is None:
+            raise ValueError("detector_geometry should be defined to perform reconstruction.")
+        if model.mesh is None:
+            raise ValueError("Mesh should be defined to perform MFI reconstruction.")
+        if lam is None:
+            lam = self.lam
+        gram = direct._masked_gram(model, 'gram_sparse', direct._gram_sparse)
+        rhs = direct._flat(model.detector_geometry).T @ model.masked_residual(np.array(model.detector_signal,
+                                                                                        dtype=float))
+        grads = model.mesh.gradient_operators()
+        # matrices for the averaging of the cell weights to the neighbouring pairs
+        averages = [operators.pair_average(d) for d in grads]
+        weights = np.ones(rhs.size)
+        factor = None
+        x = None
+        changes = []
+        for _ in range(self.max_iter):
+            smooth = sum(d.T @ scipy.sparse.diags(a @ weights) @ d for d, a in zip(grads, averages))
+            matrix = (gram + lam * smooth).tocsc()
+            factor, x_new = self._solve(matrix, rhs, factor)
+            if x is not None:
+                changes.append(float(np.linalg.norm(x_new - x) / np.linalg.norm(x_new)))
+            x = x_new
+            if changes and changes[-1] < self.tol:
+                break
+            floor = self.eps * np.max(x)
+            if floor <= 0:
+                break
+            weights = 1 / np.maximum(x, floor)
+        model.solution = x.reshape(model.detector_geometry.shape[1:])
+        return model.solution, changes
+
+    def _solve(self, matrix, rhs, factor):
+        """Solve system with the problem matrix. factor is CHOLMOD symbolic factorization or fill-reducing
+        ordering from the previous iteration (None at the first iteration). Returns factor and solution.
+        """
+        if self.use_cholmod and cholmod is not None:
+            if factor is None:
+                factor = cholmod.analyze(matrix)
+            factor.cholesky_inplace(matrix)
+            return factor, factor(rhs)
+        order = _ordering(matrix) if factor is None else factor
+        permuted = matrix[order][:, order].tocsc()
+        try:
+            lu = scipy.sparse.linalg.splu(permuted, permc_spec='NATURAL', diag_pivot_thresh=0,
+                                          options=dict(SymmetricMode=True))
+        except RuntimeError:
+            raise ValueError("Problem matrix is singular. Increase regularization parameter lam.")
+        x = np.empty(rhs.size)
+        x[order] = lu.solve(rhs[order])
+        return order, x
+
+
+def _ordering(matrix):
+    """Fill-reducing symmetric ordering of the matrix columns.
+    """
+    lu = scipy.sparse.linalg.splu(matrix, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0,
+                                  options=dict(SymmetricMode=True))
+    return np.argsort(lu.perm_c)
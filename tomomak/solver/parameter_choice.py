@@ -0,0 +1,139 @@
+"""Choice of the Tikhonov regularization parameter using singular value decomposition of the detector geometry.
+
+For the problem min(||G x - y||^2 + lam * ||x||^2) with G = U S V^T the solution is
+x = V diag(s / (s^2 + lam)) U^T y, so after calculation of the SVD residual and solution norms
+for any lam are calculated with O(k) operations, where k is number of singular values.
+SVD is cached for given geometry (see tomomak.model.Model.derived), so it is calculated only once for all frames.
+SVD of the masked model (see tomomak.model.Model.channel_mask) is calculated for the used detectors only.
+See P. C. Hansen, "Discrete inverse problems: insight and algorithms", 2010.
+"""
+import numpy as np
+from tomomak.solver import direct
+
+methods = ('gcv', 'l-curve', 'discrepancy')
+
+
+def svd(model, rank=None, oversampling=10, n_iter=2, seed=0):
+    """Get cached SVD of the flattened detector geometry or calculate it.
+
+    Args:
+        model(tomomak.model.Model): model with defined detector_geometry.
+        rank(int, optional): number of singular values. If None, full SVD is calculated.
+            Otherwise randomized SVD is used (N. Halko et al., "Finding structure with randomness", 2011).
+            Default: None.
+        oversampling(int, optional): additional number of random vectors for randomized SVD. Default: 10.
+        n_iter(int, optional): number of power iterations for randomized SVD. Default: 2.
+        seed(int, optional): random generator seed for randomized SVD. Default: 0.
+
+    Returns:
+        tuple: u, s, vt, so that flattened geometry of the used detectors is approximately u @ diag(s) @ vt.
+    """
+    rows = model.active_channels
+
+    def used(geometry):
+        return geometry if rows is None else geometry[rows]
+    if rank is None:
+        return model.derived('svd' + model.mask_key, lambda geometry: _svd(used(geometry)))
+    name = 'svd_{}_{}_{}_{}{}'.format(rank, oversampling, n_iter, seed, model.mask_key)
+    return model.derived(name, lambda geometry: _randomized_svd(used(geometry), rank, oversampling, n_iter, seed))
+
+
+def choose_lambda(model, method='gcv', lambdas=None, rank=None, sigma=None, tau=1.):
+    """Choose Tikhonov regularization parameter and write corresponding solution to model.solution.
+
+    Methods:
+        'gcv': minimum of the generalized cross-validation function ||r||^2 / (m - trace(influence matrix))^2.
+        'l-curve': maximum curvature of the (log ||r||, log ||x||) curve.
+        'discrepancy': largest lam, for which ||r|| <= tau * ||noise||.
+
+    Args:
+        model(tomomak.model.Model): model with defined detector_geometry and detector_signal.
+        method(str, optional): 'gcv', 'l-curve' or 'discrepancy'. Default: 'gcv'.
+        lambdas(iterable of floats, optional): candidate values. If None, 200 values,
+            logarithmically distributed between s_min^2 and s_max^2, are used. Default: None.
+        rank(int, optional): number of singular values, see svd(). Default: None.
+        sigma(float or ndarray, optional): standard deviation of the noise in each detector.
+            Required for discrepancy principle. Default: None.
+        tau(float, optional): safety factor of the discrepancy principle. Default: 1.
+
+    Returns:
+        tuple: chosen lam, solution and ndarray of the criterion values for each candidate.
+    """
+    if method not in methods:
+        raise ValueError("Method {} is not supported. Supported methods: {}.".format(method, methods))
+    if model.detector_signal is None:
+        raise ValueError("detector_signal should be defined to choose regularization parameter.")
+    if method == 'discrepancy' and sigma is None:
+        raise ValueError("sigma should be defined for the discrepancy principle.")
+    u, s, vt = svd(model, rank)
+    y = np.asarray(model.detector_signal, dtype=float)
+    if model.active_channels is not None:
+        y = y[model.active_channels]
+        if np.ndim(sigma) > 0:
+            sigma = np.asarray(sigma)[model.active_channels]
+    beta = u.T @ y
+    if lambdas is None:
+        s_pos = s[s > 0]
+        lambdas = np.logspace(np.log10(s_pos[-1] ** 2), np.log10(s_pos[0] ** 2), 200)
+    lambdas = np.asarray(lambdas, dtype=float)
+    res_norm, sol_norm, trace = curves(s, beta, np.dot(y, y), lambdas)
+    if method == 'gcv':
+        values = res_norm ** 2 / (y.size - trace) ** 2
+        index = np.argmin(values)
+    elif method == 'l-curve':
+        values = _curvature(np.log(res_norm), np.log(sol_norm), np.log(lambdas))
+        index = np.argmax(values)
+    else:
+        delta = tau * np.sqrt(np.sum(np.broadcast_to(np.square(sigma), y.shape)))
+        values = res_norm - delta
+        admissible = np.nonzero(values <= 0)[0]
+        index = admissible[np.argmax(lambdas[admissible])] if admissible.size else np.argmin(lambdas)
+    lam = lambdas[index]
+    x = vt.T @ (s / (s ** 2 + lam) * beta)
+    model.solution = x.reshape(model.detector_geometry.shape[1:])
+    return lam, model.solution, values
+
+
+def curves(s, beta, y_norm2, lambdas):
+    """Residual norm, solution norm and trace of the influence matrix for each lam.
+
+    Args:
+        s(ndarray): singular values.
+        beta(ndarray): u^T y.
+        y_norm2(float): ||y||^2. Part of the signal, orthogonal to u columns, is added to the residual.
+        lambdas(ndarray): regularization parameters.
+
+    Returns:
+        tuple: three ndarrays with shape of lambdas.
+    """
+    s2 = s ** 2
+    f = s2 / (s2[np.newaxis] + lambdas[:, np.newaxis])
+    outside = max(y_norm2 - np.dot(beta, beta), 0)
+    res_norm = np.sqrt(np.sum(((1 - f) * beta) ** 2, axis=1) + outside)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.where(s > 0, f * beta / s, 0)
+    sol_norm = np.sqrt(np.sum(coef ** 2, axis=1))
+    return res_norm, sol_norm, np.sum(f, axis=1)
+
+
+def _curvature(x, y, t):
+    dx, dy = np.gradient(x, t), np.gradient(y, t)
+    ddx, ddy = np.gradient(dx, t), np.gradient(dy, t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res = (dx * ddy - ddx * dy) / (dx ** 2 + dy ** 2) ** 1.5
+    return np.nan_to_num(res, nan=-np.inf)
+
+
+def _svd(geometry):
+    return np.linalg.svd(direct._flat(geometry), full_matrices=False)
+
+
+def _randomized_svd(geometry, rank, oversampling, n_iter, seed):
+    g = direct._flat(geometry)
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(g @ rng.standard_normal((g.shape[1], min(rank + oversampling, min(g.shape)))))
+    for _ in range(n_iter):
+        q, _ = np.linalg.qr(g.T @ q)
+        q, _ = np.linalg.qr(g @ q)
+    u, s, vt = np.linalg.svd(q.T @ g, full_matrices=False)
+    return (q @ u)[:, :rank], s[:rank], vt[:rank]
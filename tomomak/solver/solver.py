@@ -2,7 +2,9 @@ import numpy as np
 import numbers
 import warnings
 import copy
+import concurrent.futures
 import matplotlib.pyplot as plt
+from tomomak.iterators import abstract_iterator
 
 
 class Solver:
@@ -19,7 +21,7 @@ class Solver:
         self.stop_conditions = stop_condiitons
         self.real_solution = real_solution
 
-    def solve(self, model, steps=20, *args, **kwargs):
+    def solve(self, model, steps=20, *args, verbose=True, **kwargs):
         # Check consistency.
         if model.detector_signal is None:
             raise ValueError("detector_signal should be defined to perform reconstruction.")
@@ -30,15 +32,24 @@ class Solver:
                 raise ValueError("stop_values should be defined since stop_conditions is defined.")
             if len(self.stop_values) != len(self.stop_conditions):
                 raise ValueError("stop_conditions and stop_values have different length.")
+        if model.batch_size is not None and self.iterator is not None \
+                and not getattr(self.iterator, 'supports_batch', False):
+            raise ValueError("{} doesn't support batch of solutions. Model batch size is {}."
+                             .format(self.iterator, model.batch_size))
         # Init iterator and constraints.
-        print("Start calculation with {} iterations using {}.".format(steps, self.iterator))
+        if verbose:
+            print("Start calculation with {} iterations using {}.".format(steps, self.iterator))
+        iterator_state = None
         if self.iterator is not None:
-            self.iterator.init(model, steps, *args, **kwargs)
+            iterator_state = self.iterator.init(model, steps, *args, **kwargs)
+        constraint_states = []
         if self.constraints is not None:
-            print("Used constraints:")
+            if verbose:
+                print("Used constraints:")
             for r in self.constraints:
-                r.init(model, steps, *args, **kwargs)
-                print("  " + str(r))
+                constraint_states.append(r.init(model, steps, *args, **kwargs))
+                if verbose:
+                    print("  " + str(r))
         if self.statistics is not None:
             # print("Calculated statistics:")
             for ind, s in enumerate(self.statistics):
@@ -49,11 +60,11 @@ class Solver:
         for i in range(steps):
             old_solution = copy.copy(model.solution)
             if self.iterator is not None:
-                self.iterator.step(model=model, step_num=i)
+                abstract_iterator.call_with_state(self.iterator.step, iterator_state, model=model, step_num=i)
             # constraints
             if self.constraints is not None:
                 for k, r in enumerate(self.constraints):
-                    r.step(model=model, step_num=i)
+                    abstract_iterator.call_with_state(r.step, constraint_states[k], model=model, step_num=i)
             # statistics
             if self.statistics is not None:
                 for s in self.statistics:
@@ -65,28 +76,58 @@ class Solver:
                 for k, s in enumerate(self.stop_conditions):
                     val = s.step(solution=model.solution, step_num=i, real_solution=self.real_solution,
                                  old_solution=old_solution, model=model)
-                    if val < self.stop_values[k]:
-                        print('\r \r', end='')
-                        print("Early stopping at step {}: {} < {}.".format(i, s, self.stop_values[k]))
+                    # for the batch of solutions all values should be less
+                    if np.all(val < self.stop_values[k]):
+                        if verbose:
+                            print('\r \r', end='')
+                            print("Early stopping at step {}: {} < {}.".format(i, s, self.stop_values[k]))
                         stop = True
                 if stop:
                     break
-            if i % 20 == 0:
+            if verbose and i % 20 == 0:
                 print('\r', end='')
                 print("...", str(i * 100 // steps) + "% complete", end='')
 
-        print('\r \r', end='')
+        if verbose:
+            print('\r \r', end='')
         if self.iterator is not None:
-            self.iterator.finalize(model)
+            abstract_iterator.call_with_state(self.iterator.finalize, iterator_state, model)
         if self.constraints is not None:
-            for r in self.constraints:
-                r.finalize(model)
+            for k, r in enumerate(self.constraints):
+                abstract_iterator.call_with_state(r.finalize, constraint_states[k], model)
         if self.statistics is not None:
             for s in self.statistics:
                 s.finalize(model)
-            print("Statistics summary:")
-            for s in self.statistics:
-                print("  {}: {}".format(s, s.data[-1]))
+            if verbose:
+                print("Statistics summary:")
+                for s in self.statistics:
+                    print("  {}: {}".format(s, s.data[-1]))
+
+    def solve_many(self, models, steps=20, *args, max_workers=None, **kwargs):
+        """Solve several independent models concurrently in the thread pool.
+
+        Iterator and constraints are shared between reconstructions, since their per-solve data
+        is stored in the state objects, returned by init(). Heavy numpy calculations release GIL,
+        so reconstructions are performed in parallel inside one process.
+        Statistics and stop conditions are copied for each model.
+
+        Args:
+            models(iterable of tomomak.Model): models to solve. Each model should be a separate object.
+            steps(int): number of steps. Default: 20.
+            max_workers(int, optional): number of threads. See concurrent.futures.ThreadPoolExecutor. Default: None.
+            *args, **kwargs: passed to solve().
+
+        Returns:
+            list: statistics list of each model (None if statistics is not defined).
+        """
+        def solve_one(model):
+            solver = copy.copy(self)
+            solver.statistics = copy.deepcopy(self.statistics)
+            solver.stop_conditions = copy.deepcopy(self.stop_conditions)
+            solver.solve(model, steps, *args, verbose=False, **kwargs)
+            return solver.statistics
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(solve_one, models))
 
     def plot_statistics(self):
         if self.statistics is not None:
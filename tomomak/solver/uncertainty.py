@@ -0,0 +1,176 @@
+"""Monte Carlo estimation of the reconstruction uncertainty.
+
+Detector signal is perturbed with random noise n_samples times and each noisy signal is reconstructed
+with the same solver. Mean and standard deviation of the reconstructions are accumulated in each cell
+with Welford algorithm, so reconstructions are not stored.
+Noisy signals are reconstructed in batches (see tomomak.model.Model.batch_size) if iterator supports them,
+so each iteration is one matrix-matrix product for the whole batch. Batches may also be distributed
+over the process pool. Detector geometry is shared between processes without copying (see tomomak.util.shared).
+
+Example:
+    stats = monte_carlo(model, Solver(iterator=ml.ML()), n_samples=200, steps=50, st_div=5, seed=0)
+    error_bars = stats.std
+"""
+import concurrent.futures
+import copy
+import numpy as np
+from tomomak.util import backend
+from tomomak.util.shared import share_model
+
+noise_models = ('gaussian', 'poisson')
+
+
+def noisy_signals(detector_signal, n_samples, noise='gaussian', st_div=5, rng=None):
+    """Generate noisy realizations of the signal.
+
+    Args:
+        detector_signal(ndarray): original signal.
+        n_samples(int): number of realizations.
+        noise(str, optional): 'gaussian' - normal noise with standard deviation st_div percents of the signal;
+            'poisson' - signal is number of counts. Default: 'gaussian'.
+        st_div(float, optional): standard deviation of the gaussian noise in percent. Default: 5.
+        rng(numpy.random.Generator or int, optional): random generator or seed. Default: None.
+
+    Returns:
+        ndarray: signals with shape (n_samples, number of detectors).
+    """
+    if noise not in noise_models:
+        raise ValueError("Noise model {} is not supported. Supported models: {}.".format(noise, noise_models))
+    rng = np.random.default_rng(rng)
+    y = np.asarray(detector_signal, dtype=float)
+    size = (n_samples,) + y.shape
+    if noise == 'gaussian':
+        return rng.normal(y, st_div / 100 * np.abs(y), size=size)
+    return rng.poisson(np.clip(y, 0, None), size=size).astype(float)
+
+
+class Welford:
+    """Streaming mean and variance of the samples.
+
+    see B. P. Welford, "Note on a method for calculating corrected sums of squares and products", 1962.
+    Batches of samples are merged with the pairwise formula of T. F. Chan et al., "Updating formulae and
+    a pairwise algorithm for computing sample variances", 1979, which is stable for large numbers of samples.
+
+    Attributes:
+        count(int): number of samples.
+        mean(ndarray): mean of the samples or None if there are no samples.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+
+    def update(self, samples):
+        """Add batch of samples.
+
+        Args:
+            samples(ndarray): samples with shape (number of samples, *sample shape).
+        """
+        samples = np.asarray(samples, dtype=float)
+        n = samples.shape[0]
+        if n == 0:
+            return
+        mean = np.mean(samples, axis=0)
+        m2 = np.sum(np.square(samples - mean), axis=0)
+        if self.count == 0:
+            self.mean, self._m2 = mean, m2
+        else:
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean = self.mean + delta * (n / total)
+            self._m2 = self._m2 + m2 + np.square(delta) * (self.count * n / total)
+        self.count += n
+
+    def add(self, sample):
+        """Add one sample.
+
+        Args:
+            sample(ndarray): sample.
+        """
+        self.update(np.asarray(sample)[np.newaxis])
+
+    @property
+    def variance(self):
+        """ndarray: unbiased sample variance. Zero if there are less than two samples.
+        """
+        if self.count < 2:
+            return None if self._m2 is None else np.zeros_like(self._m2)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """ndarray: sample standard deviation.
+        """
+        variance = self.variance
+        return None if variance is None else np.sqrt(variance)
+
+
+def monte_carlo(model, solver, n_samples=100, steps=20, noise='gaussian', st_div=5, seed=None, batch_size=16,
+                max_workers=None):
+    """Estimate mean and standard deviation of the reconstruction by solving noisy realizations of the signal.
+
+    Model and solver are not changed. Each realization starts from model.solution (or default
+    initial solution of the iterator). If solver.iterator doesn't support batches
+    (see tomomak.iterators.abstract_iterator.AbstractIterator.supports_batch), realizations are solved one by one.
+    Constraints should work with batches too (e.g. tomomak.constraints.basic.Positive).
+
+    Args:
+        model(tomomak.model.Model): model with detector_geometry and detector_signal.
+        solver(tomomak.solver.solver.Solver): solver.
+        n_samples(int, optional): number of noisy realizations. Default: 100.
+        steps(int, optional): number of solver steps. Default: 20.
+        noise(str, optional): noise model, see noisy_signals. Default: 'gaussian'.
+        st_div(float, optional): standard deviation of the gaussian noise in percent. Default: 5.
+        seed(int, optional): seed of the random generator. Default: None.
+        batch_size(int, optional): number of realizations, solved together. Default: 16.
+        max_workers(int, optional): if not None, batches are solved by the pool of max_workers processes.
+            Solver should be picklable. Default: None.
+
+    Returns:
+        Welford: mean and std of the reconstructions in each cell.
+    """
+    if not getattr(solver.iterator, 'supports_batch', False):
+        batch_size = 1
+    rng = np.random.default_rng(seed)
+    sizes = [min(batch_size, n_samples - i) for i in range(0, n_samples, batch_size)]
+    stats = Welford()
+    if max_workers is None:
+        for size in sizes:
+            signals = noisy_signals(model.detector_signal, size, noise, st_div, rng)
+            stats.update(_solve_batch(model, solver, signals, steps))
+        return stats
+    with share_model(model, iterators=[solver.iterator]) as handle:
+        tasks = [(handle, model.channel_mask, model._dtype, solver,
+                  noisy_signals(model.detector_signal, size, noise, st_div, rng), steps) for size in sizes]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for solutions in pool.map(_solve_shared, tasks):
+                stats.update(solutions)
+    return stats
+
+
+def _solve_batch(model, solver, signals, steps):
+    """Solve the batch of signals. Returns solutions with shape (number of signals, *solution shape).
+    """
+    batch = copy.copy(model)
+    if signals.shape[0] == 1:
+        batch.detector_signal = signals[0]
+    else:
+        batch.detector_signal = signals
+    if model.solution is not None:
+        batch.solution = copy.copy(model.solution)
+    solver = copy.copy(solver)
+    solver.statistics = copy.deepcopy(solver.statistics)
+    solver.stop_conditions = copy.deepcopy(solver.stop_conditions)
+    solver.solve(batch, steps, verbose=False)
+    solutions = backend.to_numpy(batch.solution)
+    return solutions.reshape((signals.shape[0],) + tuple(model.shape))
+
+
+def _solve_shared(task):
+    handle, channel_mask, dtype, solver, signals, steps = task
+    model = handle.open()
+    model.channel_mask = channel_mask
+    # shared geometry is read-only, so it is not converted
+    model._dtype = dtype
+    return _solve_batch(model, solver, signals, steps)
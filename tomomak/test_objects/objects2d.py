@@ -1,12 +1,14 @@
 """Functions for creation of different 2d objects.
 
 Synthetic object are usually used to test different tomomak components.
+Objects have default dtype (see tomomak.util.precision).
 """
 import numpy as np
 import shapely.geometry
 import shapely.affinity
 import tomomak.util.array_routines
 import tomomak.util.geometry.geometry2d
+from tomomak.util import precision
 
 
 def polygon(mesh, points=((0, 0), (5, 5), (10, 0)), index=(0, 1), density=1, broadcast=True):
@@ -43,6 +45,7 @@ def polygon(mesh, points=((0, 0), (5, 5), (10, 0)), index=(0, 1), density=1, bro
     ds = tomomak.util.geometry.geometry2d.Geometry2d.cell_areas(mesh, index)
     res /= ds
     res *= density
+    res = res.astype(precision.get_default_dtype(), copy=False)
     if broadcast:
         res = tomomak.util.array_routines.broadcast_object(res, index, mesh.shape)
     return res
@@ -136,7 +139,7 @@ def pyramid(mesh, center=(0, 0), size=(10, 10), index=(0, 1), height=1, broadcas
             mask[i, j] = 1 - max(np.abs((cell_coord[0] - center[0]) / (size[0])),
                                  np.abs((cell_coord[1] - center[1]) / (size[1]))) * 2
     mask = mask.clip(min=0)
-    res = rect * mask
+    res = (rect * mask).astype(precision.get_default_dtype(), copy=False)
     if broadcast:
         res = tomomak.util.array_routines.broadcast_object(res, index, mesh.shape)
     return res
@@ -191,7 +194,7 @@ def cone(mesh, center=(3, 4), ax_len=(4, 3), index=(0, 1), height=1, cone_type='
             else:
                 raise TypeError("Unknown cone type. Correct types are 'cone', 'paraboloid', 'paraboloid_h'.")
     mask = mask.clip(min=0)
-    res = ell * mask
+    res = (ell * mask).astype(precision.get_default_dtype(), copy=False)
     if broadcast:
         res = tomomak.util.array_routines.broadcast_object(res, index, mesh.shape)
     return res
@@ -1,5 +1,6 @@
 import numpy as np
 from tomomak.mesh import mesh
+from tomomak.util import precision
 import copy
 
 class Rescale:
@@ -65,7 +66,7 @@ class NewMesh:
             solution = new_solution
             new_shape = list(solution.shape)
             new_shape[i] = new_mesh.shape[i]
-            new_solution = np.zeros(new_shape)
+            new_solution = np.zeros(new_shape, dtype=precision.float_dtype(data))
             new_solution = np.swapaxes(new_solution, 0, i)
             solution = np.swapaxes(solution, 0, i)
             try:
@@ -99,7 +100,7 @@ class NewMesh:
         if detector_geometry is not None:
             new_shape = [detector_geometry.shape[0]]
             new_shape.extend(self.new_mesh.shape)
-            new_detector_geometry = np.zeros(new_shape)
+            new_detector_geometry = np.zeros(new_shape, dtype=precision.float_dtype(detector_geometry))
             for i, geom in enumerate(detector_geometry):
                 new_detector_geometry[i] = self._new_mesh(self.new_mesh, model, geom, 'detector_geometry')
         else:
@@ -0,0 +1,187 @@
+"""Array backends.
+
+Iterators, statistics, constraints and tomomak.detectors.signal get array namespace from their inputs
+(see Python array API standard, https://data-apis.org/array-api/), so the same code works with numpy,
+cupy or any other library, compatible with the standard. E.g. to reconstruct on GPU,
+set model.detector_geometry to cupy array. Solution is created in the geometry namespace,
+detector_signal may stay numpy array.
+Detector geometry may also be scipy sparse matrix with shape (number of detectors, number of cells).
+"""
+import numbers
+import numpy as np
+import scipy.sparse
+
+
+def namespace(*arrays):
+    """Get array namespace of the arrays.
+
+    numpy is used for numpy arrays, scipy sparse matrices, python scalars and None.
+
+    Args:
+        *arrays: arrays.
+
+    Returns:
+        module: array namespace.
+    """
+    res = None
+    for ar in arrays:
+        if ar is None or isinstance(ar, (numbers.Number, np.ndarray, np.generic)) or scipy.sparse.issparse(ar):
+            continue
+        get_namespace = getattr(ar, '__array_namespace__', None)
+        if get_namespace is None:
+            continue
+        xp = get_namespace()
+        if xp is np:
+            continue
+        if res is not None and xp is not res:
+            raise TypeError("Arrays from different array libraries are given: {} and {}."
+                            .format(res.__name__, xp.__name__))
+        res = xp
+    return np if res is None else res
+
+
+def is_numpy(xp):
+    """Check if namespace is numpy.
+
+    Args:
+        xp(module): array namespace.
+
+    Returns:
+        bool: True if xp is numpy.
+    """
+    return xp is np
+
+
+def dtype(xp, np_dtype):
+    """Get dtype of the namespace, corresponding to the numpy dtype, e.g. model.dtype.
+
+    Args:
+        xp(module): array namespace.
+        np_dtype(numpy dtype): dtype.
+
+    Returns:
+        dtype of the namespace.
+    """
+    if is_numpy(xp):
+        return np.dtype(np_dtype)
+    return getattr(xp, np.dtype(np_dtype).name)
+
+
+def asarray(ar, xp, dtype=None):
+    """Convert array, e.g. numpy detector signal, to the namespace.
+
+    Args:
+        ar(array-like): array.
+        xp(module): array namespace.
+        dtype(optional): dtype of the namespace. Default: None.
+
+    Returns:
+        array of the namespace.
+    """
+    if is_numpy(xp):
+        return np.asarray(ar, dtype=dtype)
+    if not hasattr(ar, '__array_namespace__') or isinstance(ar, np.ndarray):
+        ar = np.asarray(ar)
+    return xp.asarray(ar, dtype=dtype)
+
+
+def is_floating(ar):
+    """Check if array has real floating dtype.
+
+    Args:
+        ar(array): array.
+
+    Returns:
+        bool: True if dtype is real floating.
+    """
+    if isinstance(ar.dtype, np.dtype):
+        return np.issubdtype(ar.dtype, np.floating)
+    return namespace(ar).isdtype(ar.dtype, 'real floating')
+
+
+def astype(ar, dtype):
+    """Cast array to the dtype without copy if dtype is already correct.
+
+    Args:
+        ar(array): array.
+        dtype: dtype of the array namespace.
+
+    Returns:
+        array: array with given dtype.
+    """
+    if ar.dtype == dtype:
+        return ar
+    if isinstance(ar, np.ndarray):
+        return ar.astype(dtype)
+    return namespace(ar).astype(ar, dtype)
+
+
+def take_rows(ar, rows):
+    """Get rows of the array, e.g. geometry of the given detectors.
+
+    Args:
+        ar(array): array, numpy array, scipy sparse matrix or operator (see tomomak.detectors.operators).
+        rows(ndarray of ints): row indexes.
+
+    Returns:
+        array: selected rows.
+    """
+    xp = namespace(ar)
+    if is_numpy(xp):
+        return ar[rows]
+    return xp.take(ar, xp.asarray(np.asarray(rows)), axis=0)
+
+
+def set_zero(ar, mask):
+    """Set elements of the array, where mask along the last axis is True, to zero in place.
+
+    Args:
+        ar(array): array, e.g. signals with shape (number of detectors) or (batch size, number of detectors).
+        mask(ndarray of bools): 1D mask, e.g. disabled detectors.
+    """
+    xp = namespace(ar)
+    mask = asarray(mask, xp)
+    if ar.ndim == 1:
+        ar[mask] = 0
+    elif is_numpy(xp):
+        ar[..., mask] = 0
+    else:
+        # masking is only specified for the sole index
+        ar[...] = xp.where(mask, xp.zeros_like(ar), ar)
+
+
+def divide(a, b, where=None):
+    """Divide a by b. Result is zero, where b is zero (or where condition is False).
+
+    Args:
+        a(array): numerator.
+        b(array): denominator.
+        where(array of bools, optional): where to divide. Default: b != 0.
+
+    Returns:
+        array: result.
+    """
+    xp = namespace(a, b)
+    if where is None:
+        where = b != 0
+    if is_numpy(xp):
+        a, b = np.asarray(a), np.asarray(b)
+        return np.divide(a, b, out=np.zeros(np.broadcast_shapes(a.shape, b.shape), np.result_type(a, b)),
+                         where=where)
+    return xp.where(where, a / xp.where(where, b, xp.ones_like(b)), xp.zeros_like(b))
+
+
+def to_numpy(ar):
+    """Convert array of any namespace to numpy array.
+
+    Args:
+        ar(array): array.
+
+    Returns:
+        ndarray: numpy array.
+    """
+    if isinstance(ar, np.ndarray):
+        return ar
+    if hasattr(ar, 'get'):  # cupy
+        return ar.get()
+    return np.asarray(ar)
@@ -0,0 +1,169 @@
+"""Cache of quantities, derived from detector geometry.
+
+Quantities are stored in the process-wide LRU cache and are keyed by geometry fingerprint,
+so they are shared between models, solves and iterator objects, which use the same geometry.
+Fingerprint is either identity token of the geometry array or hash of its content (see tomomak.model.Model).
+"""
+import collections
+import hashlib
+import itertools
+import threading
+import weakref
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+_token_counter = itertools.count()
+_tokens = {}
+_tokens_lock = threading.Lock()
+
+
+def array_token(ar):
+    """Get identity token of the array.
+
+    Token is the same for the same array object while it is alive and is never reused for other objects.
+
+    Args:
+        ar(ndarray or other object, supporting weak references): array.
+
+    Returns:
+        int: identity token.
+    """
+    with _tokens_lock:
+        entry = _tokens.get(id(ar))
+        if entry is not None and entry[0]() is ar:
+            return entry[1]
+        token = next(_token_counter)
+        key = id(ar)
+        _tokens[key] = (weakref.ref(ar, lambda _, key=key: _tokens.pop(key, None)), token)
+        return token
+
+
+def invalidate_token(ar):
+    """Assign new identity token to the array, e.g. after the array was changed in-place.
+
+    Args:
+        ar(ndarray): array.
+    """
+    with _tokens_lock:
+        _tokens.pop(id(ar), None)
+    array_token(ar)
+
+
+def content_hash(ar):
+    """Get hash of the array content, shape and dtype.
+
+    Args:
+        ar(ndarray): array.
+
+    Returns:
+        str: hex digest.
+    """
+    ar = np.ascontiguousarray(ar)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((ar.shape, ar.dtype.str)).encode())
+    h.update(ar.data)
+    return h.hexdigest()
+
+
+def nbytes(value):
+    """Estimate memory, used by the cache entry.
+
+    Arrays, scipy sparse matrices, sparse LU factorizations and tuples, lists or dicts of them are counted.
+    Other objects are considered small.
+
+    Args:
+        value: cache entry.
+
+    Returns:
+        int: number of bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if scipy.sparse.issparse(value):
+        return sum(getattr(value, a).nbytes for a in ('data', 'indices', 'indptr', 'row', 'col', 'offsets')
+                   if isinstance(getattr(value, a, None), np.ndarray))
+    if isinstance(value, scipy.sparse.linalg.SuperLU):
+        return nbytes((value.L, value.U, value.perm_r, value.perm_c))
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    return 0
+
+
+class LRUCache:
+    """Thread-safe least recently used cache.
+
+    Attributes:
+        maxsize(int): maximum number of stored entries.
+        maxbytes(int): maximum memory of the stored entries (see nbytes) or None if memory is not limited.
+            The most recent entry is kept even if it is larger.
+        hits(int): number of requests, which found stored entry.
+        misses(int): number of requests, which calculated the entry.
+    """
+
+    def __init__(self, maxsize=32, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, func):
+        """Get entry, calculating it with func() if it is not stored.
+
+        Args:
+            key(hashable): entry key.
+            func(callable): function without arguments, calculating the entry.
+
+        Returns:
+            stored or calculated entry.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+        value = func()
+        with self._lock:
+            self.misses += 1
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store entry, removing least recently used entries if cache is full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxbytes is not None:
+                self._sizes[key] = nbytes(value)
+            while len(self._data) > self.maxsize or (len(self._data) > 1 and self.maxbytes is not None
+                                                     and self.nbytes > self.maxbytes):
+                old_key, _ = self._data.popitem(last=False)
+                self._sizes.pop(old_key, None)
+
+    @property
+    def nbytes(self):
+        """int: memory of the stored entries. Counted only if maxbytes is not None.
+        """
+        return sum(self._sizes.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+geometry_cache = LRUCache()
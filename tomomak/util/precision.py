@@ -0,0 +1,59 @@
+"""Floating point precision policy.
+
+Arrays, created by tomomak (detector geometry, solutions, test objects, transformed arrays), have default dtype.
+It may be changed for all models with set_default_dtype() or for one model with tomomak.model.Model.dtype.
+float32 halves memory and bandwidth of geometry-heavy reconstructions, and its accuracy is usually
+much better than accuracy of the measurements.
+Reductions, e.g. sums of the geometry over detectors used for normalization, are accumulated in float64.
+"""
+import numpy as np
+
+accumulation_dtype = np.dtype(np.float64)
+_default_dtype = np.dtype(np.float64)
+
+
+def set_default_dtype(dtype):
+    """Set default dtype of the created arrays.
+
+    Args:
+        dtype(numpy dtype): floating dtype, e.g. numpy.float32.
+    """
+    global _default_dtype
+    _default_dtype = check_dtype(dtype)
+
+
+def get_default_dtype():
+    """Get default dtype of the created arrays.
+
+    Returns:
+        numpy.dtype: default dtype.
+    """
+    return _default_dtype
+
+
+def check_dtype(dtype):
+    """Check that dtype is floating.
+
+    Args:
+        dtype(numpy dtype): dtype.
+
+    Returns:
+        numpy.dtype: dtype.
+    """
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise TypeError("Floating dtype is required, {} is given.".format(dtype))
+    return dtype
+
+
+def float_dtype(ar):
+    """Get dtype of the array if it is floating, otherwise default dtype.
+
+    Args:
+        ar(ndarray): array.
+
+    Returns:
+        numpy.dtype: dtype.
+    """
+    dtype = np.asarray(ar).dtype
+    return dtype if np.issubdtype(dtype, np.floating) else _default_dtype
@@ -0,0 +1,121 @@
+"""Reduction of the detector geometry: removal of invisible cells, dead detectors and duplicate detectors.
+
+See tomomak.model.Model.reduced.
+"""
+import numpy as np
+
+duplicate_modes = (None, 'sum', 'scale')
+
+
+class Reduction:
+    """Mapping between full and reduced detector geometry.
+
+    Reduced geometry contains only selected columns (cells) and rows (detectors), e.g. disabled channels
+    (see tomomak.model.Model.channel_mask) are removed.
+    Each reduced row corresponds to the group of equal full rows. Group of k equal rows g with signals y_i
+    is replaced by:
+        'sum': row k * g with signal sum(y_i). Poisson likelihood (ML method) is not changed.
+        'scale': row sqrt(k) * g with signal sum(y_i) / sqrt(k). Least squares residual is not changed
+            (up to a constant).
+
+    Attributes:
+        columns(ndarray): flat indexes of the kept cells.
+        row_map(ndarray): reduced row index for each full row, -1 for removed rows.
+        counts(ndarray): number of full rows in each reduced row.
+        geometry(ndarray): reduced geometry with shape (reduced rows, kept cells).
+        zero_columns(int): number of removed cells, not seen by any used detector.
+        zero_rows(int): number of removed detectors with zero geometry.
+        duplicate_rows(int): number of merged duplicate detectors.
+        duplicates(str): how duplicate rows are merged.
+    """
+
+    def __init__(self, geometry, columns=None, zero_columns=True, zero_rows=True, duplicates='sum', rows=None):
+        if duplicates not in duplicate_modes:
+            raise ValueError("Duplicates mode {} is not supported. Supported modes: {}."
+                             .format(duplicates, duplicate_modes))
+        flat = geometry.reshape(geometry.shape[0], -1)
+        if columns is None:
+            columns = np.ones(flat.shape[1], dtype=bool)
+        columns = np.asarray(columns, dtype=bool).ravel()
+        full_rows = flat.shape[0]
+        rows = np.arange(full_rows) if rows is None else np.flatnonzero(rows)
+        if rows.size != full_rows:
+            flat = flat[rows]
+        self.zero_columns = 0
+        if zero_columns:
+            seen = np.any(flat != 0, axis=0)
+            self.zero_columns = int(np.count_nonzero(columns & ~seen))
+            columns = columns & seen
+        self.columns = np.flatnonzero(columns)
+        g = flat[:, self.columns]
+        self.zero_rows = 0
+        if zero_rows:
+            nonzero = np.any(g != 0, axis=1)
+            self.zero_rows = int(np.count_nonzero(~nonzero))
+            rows, g = rows[nonzero], g[nonzero]
+        self.row_map = np.full(full_rows, -1)
+        self.duplicates = duplicates
+        if duplicates is not None and rows.size:
+            _, first, inverse, counts = np.unique(g, axis=0, return_index=True, return_inverse=True,
+                                                  return_counts=True)
+            # keep original order of the detectors
+            order = np.argsort(first)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(order.size)
+            self.row_map[rows] = rank[np.ravel(inverse)]
+            self.counts = counts[order]
+            base = g[first[order]]
+            factor = self.counts if duplicates == 'sum' else np.sqrt(self.counts)
+            self.geometry = np.ascontiguousarray(base * factor[:, np.newaxis])
+        else:
+            self.row_map[rows] = np.arange(rows.size)
+            self.counts = np.ones(rows.size, dtype=int)
+            self.geometry = np.ascontiguousarray(g)
+        self.duplicate_rows = int(rows.size - self.counts.size)
+
+    def __str__(self):
+        return ("{} cells and {} detectors are used. Removed: {} invisible cells, {} zero detectors; "
+                "merged: {} duplicate detectors.").format(self.columns.size, self.counts.size, self.zero_columns,
+                                                          self.zero_rows, self.duplicate_rows)
+
+    def reduce_signal(self, detector_signal):
+        """Get signal of the reduced detectors.
+
+        Args:
+            detector_signal(ndarray): signal of the full detectors.
+
+        Returns:
+            ndarray: reduced signal.
+        """
+        detector_signal = np.asarray(detector_signal, dtype=float)
+        valid = self.row_map >= 0
+        res = np.bincount(self.row_map[valid], weights=detector_signal[valid], minlength=self.counts.size)
+        if self.duplicates == 'scale':
+            res /= np.sqrt(self.counts)
+        return res
+
+    def reduce_solution(self, solution):
+        """Get values of the kept cells.
+
+        Args:
+            solution(ndarray): array with full model shape.
+
+        Returns:
+            ndarray: 1D array of kept cells.
+        """
+        return np.array(np.reshape(solution, -1)[self.columns])
+
+    def expand(self, data, shape):
+        """Place data of the kept cells to the full mesh. Other cells are set to zero.
+
+        Args:
+            data(ndarray): array, which last dimension corresponds to the kept cells.
+            shape(tuple of ints): full model shape.
+
+        Returns:
+            ndarray: array with data.shape[:-1] + shape shape.
+        """
+        data = np.asarray(data)
+        res = np.zeros(data.shape[:-1] + (int(np.prod(shape)),), dtype=data.dtype)
+        res[..., self.columns] = data
+        return res.reshape(data.shape[:-1] + tuple(shape))
@@ -0,0 +1,168 @@
+"""Routines to share model between processes without copying detector geometry.
+
+Usually detector_geometry is the largest part of the model, so pickling the model for each process of
+multiprocessing pool multiplies memory consumption by the number of processes.
+share_model publishes detector_geometry and quantities derived from it (see Model.derived)
+to the shared memory or to the memory-mapped files and returns lightweight picklable handle.
+Each process calls handle.open() and gets a Model, which uses published arrays without copying.
+
+Example:
+    handle = share_model(model, iterators=[ml.ML()])
+    with multiprocessing.Pool(4) as pool:
+        solutions = pool.map(reconstruct, [(handle, s) for s in signals])
+    handle.unlink()
+"""
+import os
+import sys
+import uuid
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from tomomak.model import Model
+
+# Shared memory blocks attached in this process. Blocks should live as long as arrays, which use them.
+_attached = {}
+
+
+def _attach(name):
+    if name not in _attached:
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Workers, started by multiprocessing, use resource tracker of the publishing process. It keeps
+            # one registration per block, so it is left to the owner. Otherwise attached block is unregistered,
+            # so resource tracker of this process doesn't unlink it.
+            shared_tracker = getattr(resource_tracker._resource_tracker, '_fd', None) is not None
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == 'posix' and not shared_tracker:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        _attached[name] = shm
+    return _attached[name]
+
+
+class SharedModel:
+    """Picklable handle to the model, which detector_geometry is published in shared memory or memory-mapped files.
+
+    Handle is created with share_model function. Only array locations are pickled, so handle may be
+    passed to the worker processes cheaply. Publishing process owns the memory and should call unlink()
+    when all workers are done. Handle may also be used as context manager.
+    """
+
+    def __init__(self, prefix, arrays, mesh, detector_signal, solution, backend):
+        self._prefix = prefix
+        self._arrays = arrays
+        self._mesh = mesh
+        self._detector_signal = detector_signal
+        self._solution = solution
+        self._backend = backend
+        self._owned = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_owned'] = []
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unlink()
+
+    @property
+    def backend(self):
+        """str: 'shm' for shared memory or 'memmap' for memory-mapped files.
+        """
+        return self._backend
+
+    @property
+    def derived_names(self):
+        """list of str: names of published derived quantities.
+        """
+        return [n for n in self._arrays if n != 'detector_geometry']
+
+    def _array(self, name):
+        location, shape, dtype = self._arrays[name]
+        if self._backend == 'shm':
+            shm = _attach(location)
+            ar = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            ar.flags.writeable = False
+        else:
+            ar = np.load(location, mmap_mode='r')
+        return ar
+
+    def open(self):
+        """Create Model, using published arrays without copying.
+
+        Published arrays are read-only. Detector signal, solution and mesh are copied.
+
+        Returns:
+            tomomak.model.Model: model with shared detector_geometry.
+        """
+        model = Model(detector_geometry=self._array('detector_geometry'), detector_signal=self._detector_signal,
+                      solution=self._solution, mesh=self._mesh)
+        model._fingerprint = 'shared', self._prefix
+        for name in self.derived_names:
+            model._derived[name] = self._array(name)
+        return model
+
+    def unlink(self):
+        """Free published memory. Should be called by publishing process only.
+        """
+        for location in self._owned:
+            if self._backend == 'shm':
+                shm = _attached.pop(location, None) or shared_memory.SharedMemory(name=location)
+                try:
+                    shm.close()
+                except BufferError:
+                    # Arrays of the models, opened in this process, still use the block.
+                    _attached[location] = shm
+                shm.unlink()
+            elif os.path.exists(location):
+                os.remove(location)
+        self._owned = []
+
+
+def share_model(model, iterators=(), path=None):
+    """Publish model detector_geometry and derived quantities for usage in other processes.
+
+    Only derived quantities, which are numeric numpy arrays, are published. Other quantities, e.g. sparse matrices,
+    lists of blocks or reduction of the model, are recalculated by workers on demand.
+
+    Args:
+        model(tomomak.model.Model): model to publish. detector_geometry should be defined.
+        iterators(iterable of tomomak iterators, optional): precompute() of each iterator is called before publishing,
+            so workers don't need to calculate geometry normalizations. Default: ().
+        path(str, optional): If None, arrays are published to the shared memory.
+            Otherwise arrays are saved to the memory-mapped .npy files in the given directory. Default: None.
+
+    Returns:
+        SharedModel: picklable handle. Call handle.open() in the worker process to get the model.
+    """
+    if model.detector_geometry is None:
+        raise ValueError("detector_geometry should be defined in order to share model.")
+    for it in iterators:
+        it.precompute(model)
+    data = {'detector_geometry': np.asarray(model.detector_geometry)}
+    data.update((name, value) for name, value in model._derived.items()
+                if isinstance(value, np.ndarray) and not value.dtype.hasobject)
+    backend = 'shm' if path is None else 'memmap'
+    prefix = 'tmk' + uuid.uuid4().hex[:16]
+    arrays = {}
+    owned = []
+    for i, (name, value) in enumerate(data.items()):
+        if backend == 'shm':
+            shm = shared_memory.SharedMemory(name='{}_{}'.format(prefix, i), create=True,
+                                             size=max(value.nbytes, 1))
+            _attached[shm.name] = shm
+            np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+            location = shm.name
+        else:
+            location = os.path.join(path, '{}_{}.npy'.format(prefix, name))
+            ar = np.lib.format.open_memmap(location, mode='w+', dtype=value.dtype, shape=value.shape)
+            ar[...] = value
+            ar.flush()
+            del ar
+        arrays[name] = (location, value.shape, value.dtype.str)
+        owned.append(location)
+    handle = SharedModel(prefix, arrays, model.mesh, model.detector_signal, model.solution, backend)
+    handle._owned = owned
+    return handle
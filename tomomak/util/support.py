@@ -0,0 +1,71 @@
+"""Functions for creation of the model support, i.e. cells, where solution may be non-zero.
+
+See tomomak.model.Model.support and tomomak.model.Model.compact.
+"""
+import numpy as np
+import matplotlib.path
+from tomomak.util import gfileextractor
+
+
+def polygon_support(mesh, polygon, index=(0, 1)):
+    """Find cells, which centers are inside polygon.
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh.
+        polygon(ndarray): N x 2 array of polygon vertices.
+        index(int or tuple of two ints, optional): index of 2D axis or indexes of two 1D axes,
+            forming the plane of the polygon. Support is extended along other axes. Default: (0, 1).
+
+    Returns:
+        ndarray of bools: support with mesh shape.
+    """
+    if isinstance(index, int):
+        index = (index,)
+    axes = [mesh.axes[i] for i in index]
+    if len(axes) == 1 and axes[0].dimension == 2:
+        centers = np.asarray(axes[0].coordinates, dtype=float)
+        plane_shape = (axes[0].size,)
+    elif len(axes) == 2 and axes[0].dimension == 1 and axes[1].dimension == 1:
+        x, y = np.meshgrid(axes[0].coordinates, axes[1].coordinates, indexing='ij')
+        centers = np.column_stack((x.ravel(), y.ravel()))
+        plane_shape = (axes[0].size, axes[1].size)
+    else:
+        raise TypeError("Polygon support may be created for one 2D axis or two 1D axes only.")
+    inside = matplotlib.path.Path(np.asarray(polygon, dtype=float)).contains_points(centers).reshape(plane_shape)
+    if len(index) == 2 and index[0] > index[1]:
+        inside = inside.T
+    shape = [1] * len(mesh.axes)
+    for i in index:
+        shape[i] = mesh.axes[i].size
+    return np.broadcast_to(inside.reshape(shape), mesh.shape).copy()
+
+
+def gfile_support(mesh, filename, index=(0, 1)):
+    """Find cells inside plasma boundary (separatrix) from the magnetic equilibrium g-file.
+
+    Args:
+        mesh(tomomak.mesh.mesh.Mesh): mesh. Coordinates of the plane axes are (R, Z) in meters.
+        filename(str): g-file name, see tomomak.util.gfileextractor.gfile_extract.
+        index(int or tuple of two ints, optional): see polygon_support. Default: (0, 1).
+
+    Returns:
+        ndarray of bools: support with mesh shape.
+    """
+    border, _ = gfileextractor.gfile_extract(filename)
+    return polygon_support(mesh, border, index)
+
+
+def sensitivity_support(model, threshold=0):
+    """Find cells, seen by detectors: sum of detector_geometry over all detectors is greater than threshold.
+
+    Cells, which are not seen by any detector, can't be reconstructed and only increase problem size.
+
+    Args:
+        model(tomomak.model.Model): model with defined detector_geometry.
+        threshold(float, optional): threshold relative to the maximum sensitivity. Default: 0.
+
+    Returns:
+        ndarray of bools: support with model shape.
+    """
+    sensitivity = model.derived('column_sum', lambda geometry: np.sum(geometry, axis=0))
+    return sensitivity > threshold * np.max(sensitivity)